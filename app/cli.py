@@ -0,0 +1,261 @@
+"""
+Headless command-line runner for the FIR analysis workflow.
+
+Usage:
+    python -m app.cli run --input firs/ --sections ndps,bsa,evidence --jobs 4 --out out/
+    python -m app.cli summary-check --doc-ids 1234567,7654321 --budget 6000
+
+`run` streams every PDF under --input through the compiled graph, appends one
+NDJSON line per finished FIR to out/results.ndjson, records progress in
+out/manifest.json (so an interrupted run resumes where it stopped) and prints
+per-node timing statistics at the end.
+
+`summary-check` summarizes Indian Kanoon judgments from the full text and from
+the extractive key passages, and reports the input reduction and how closely
+the two summaries agree.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import logging
+import threading
+from pathlib import Path
+from statistics import mean, median
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from fastapi.encoders import jsonable_encoder
+
+from app.langgraph.workflow import graph, checkpointer, SECTION_NODES
+from app.routes.utils import format_state_for_display
+from app.components.historical_cases import fetch_full_document, summarize_judgment
+from app.models.openai import get_embedding
+from app.utils.judgment_text import select_key_passages, KEY_PASSAGE_TOKEN_BUDGET
+
+logger = logging.getLogger("app.cli")
+
+MANIFEST_NAME = "manifest.json"
+RESULTS_NAME = "results.ndjson"
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Per-file run status persisted atomically after every update."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.files = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def is_done(self, name: str, sha256: str) -> bool:
+        entry = self.files.get(name)
+        return bool(entry and entry.get("sha256") == sha256 and entry.get("status") == "completed")
+
+    def record(self, name: str, **entry):
+        with self._lock:
+            self.files[name] = entry
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self.files}, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def run_workflow(pdf_path: Path, sections: list) -> tuple:
+    """
+    Run the graph for a single PDF.
+
+    Returns:
+        (final state dict, {node_name: seconds})
+    """
+    thread_id = f"cli-{uuid.uuid4()}"
+    config = {"configurable": {"thread_id": thread_id}}
+    state = {"pdf_path": str(pdf_path), "pdf_filename": pdf_path.name, "sections": sections}
+
+    started = {}
+    node_timings = {}
+    try:
+        for mode, event in graph.stream(state, config=config, stream_mode=["tasks", "updates"]):
+            if mode != "tasks":
+                continue
+            if "input" in event:
+                started[event["id"]] = time.perf_counter()
+            elif event["id"] in started:
+                node_timings[event["name"]] = round(time.perf_counter() - started.pop(event["id"]), 2)
+        result = dict(graph.get_state(config).values)
+    finally:
+        # Checkpoints are not needed once the FIR is written out
+        if hasattr(checkpointer, "delete_thread"):
+            checkpointer.delete_thread(thread_id)
+    result.pop("pdf_bytes", None)
+    return result, node_timings
+
+
+def print_timing_summary(all_timings: list):
+    """Print count/mean/median/max seconds per node."""
+    per_node = {}
+    for timings in all_timings:
+        for node, seconds in timings.items():
+            per_node.setdefault(node, []).append(seconds)
+    if not per_node:
+        return
+    print("\nPer-node timings (seconds)")
+    print(f"{'node':45} {'runs':>5} {'mean':>8} {'median':>8} {'max':>8}")
+    for node, values in sorted(per_node.items(), key=lambda kv: -mean(kv[1])):
+        print(f"{node:45} {len(values):>5} {mean(values):>8.1f} {median(values):>8.1f} {max(values):>8.1f}")
+
+
+def command_run(args) -> int:
+    input_dir = Path(args.input)
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+    unknown = [s for s in sections if s not in SECTION_NODES]
+    if not sections or unknown:
+        print(f"Unknown or missing sections: {unknown or sections}. Choose from: {', '.join(SECTION_NODES)}", file=sys.stderr)
+        return 2
+
+    pdfs = sorted(p for p in input_dir.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+    manifest = Manifest(out_dir / MANIFEST_NAME)
+    pending = []
+    for pdf in pdfs:
+        name = pdf.relative_to(input_dir).as_posix()
+        sha256 = file_sha256(pdf)
+        if manifest.is_done(name, sha256):
+            continue
+        pending.append((name, pdf, sha256))
+
+    print(f"📂 {len(pdfs)} PDFs found, {len(pdfs) - len(pending)} already done, {len(pending)} to process with {args.jobs} jobs")
+
+    results_lock = threading.Lock()
+    all_timings = []
+    failures = 0
+
+    def process(name, pdf, sha256):
+        start = time.perf_counter()
+        try:
+            result, timings = run_workflow(pdf, sections)
+            return name, sha256, "completed", result, timings, None, time.perf_counter() - start
+        except Exception as e:
+            logger.error(f"❌ {name}: {e}", exc_info=True)
+            return name, sha256, "failed", None, {}, str(e), time.perf_counter() - start
+
+    with open(out_dir / RESULTS_NAME, "a", encoding="utf-8") as results_file, \
+            ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [executor.submit(process, *item) for item in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            name, sha256, status, result, timings, error, seconds = future.result()
+            record = {
+                "file": name,
+                "sha256": sha256,
+                "status": status,
+                "seconds": round(seconds, 2),
+                "node_timings": timings,
+                "error": error,
+                "result": jsonable_encoder(format_state_for_display(result)) if result else None,
+            }
+            with results_lock:
+                results_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                results_file.flush()
+            manifest.record(name, sha256=sha256, status=status, seconds=round(seconds, 2),
+                            finished_at=time.time(), error=error)
+            all_timings.append(timings)
+            failures += status == "failed"
+            print(f"[{done}/{len(pending)}] {'✅' if status == 'completed' else '❌'} {name} ({seconds:.1f}s)")
+
+    print_timing_summary(all_timings)
+    return 1 if failures else 0
+
+
+def command_summary_check(args) -> int:
+    doc_ids = [d.strip() for d in args.doc_ids.split(",") if d.strip()]
+    if not doc_ids:
+        print("No --doc-ids given", file=sys.stderr)
+        return 2
+
+    rows = []
+    for doc_id in doc_ids:
+        content, metadata = fetch_full_document(doc_id)
+        if not content:
+            print(f"❌ {doc_id}: could not fetch document", file=sys.stderr)
+            continue
+        title = (metadata or {}).get("title", "")
+        selected = select_key_passages(content, args.budget)
+        full = summarize_judgment(doc_id, title, content, token_budget=0)
+        extractive = summarize_judgment(doc_id, title, content, token_budget=args.budget)
+        vectors = get_embedding([full.case_summary, extractive.case_summary], normalize=True)
+        rows.append({
+            "doc_id": doc_id,
+            "full_chars": len(content),
+            "selected_chars": len(selected),
+            "reduction": round(len(content) / max(len(selected), 1), 1),
+            "similarity": round(float(vectors[0] @ vectors[1]), 3),
+            "relevant_match": full.case_relevant == extractive.case_relevant,
+            "case_number_match": full.case_number == extractive.case_number,
+            "year_match": full.year == extractive.year,
+        })
+
+    if not rows:
+        return 1
+    print(f"{'doc_id':>12} {'full':>9} {'selected':>9} {'reduce':>7} {'similar':>8} relevant number year")
+    for row in rows:
+        print(f"{row['doc_id']:>12} {row['full_chars']:>9} {row['selected_chars']:>9} {row['reduction']:>6}x "
+              f"{row['similarity']:>8} {str(row['relevant_match']):>8} {str(row['case_number_match']):>6} {str(row['year_match']):>4}")
+    print(f"\nMean reduction {mean(r['reduction'] for r in rows):.1f}x, "
+          f"mean summary similarity {mean(r['similarity'] for r in rows):.3f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="FIR legal analysis workflow runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run the workflow over a directory of FIR PDFs")
+    run.add_argument("--input", required=True, help="Directory containing FIR PDFs (searched recursively)")
+    run.add_argument("--sections", required=True, help=f"Comma-separated sections: {','.join(SECTION_NODES)}")
+    run.add_argument("--jobs", type=int, default=2, help="Number of FIRs processed concurrently (default: 2)")
+    run.add_argument("--out", required=True, help="Output directory for results.ndjson and manifest.json")
+    run.set_defaults(func=command_run)
+
+    check = subparsers.add_parser("summary-check",
+                                  help="Compare full-text and key-passage summaries of Indian Kanoon judgments")
+    check.add_argument("--doc-ids", required=True, help="Comma-separated Indian Kanoon document IDs")
+    check.add_argument("--budget", type=int, default=KEY_PASSAGE_TOKEN_BUDGET,
+                       help=f"Key-passage token budget (default: {KEY_PASSAGE_TOKEN_BUDGET})")
+    check.add_argument("--out", help="Optional NDJSON file for the per-document results")
+    check.set_defaults(func=command_summary_check)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+    )
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
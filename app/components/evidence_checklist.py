@@ -5,6 +5,7 @@ from typing import List
 from app.rag.query_all import query_forensic
 from app.utils.retry import exponential_backoff_retry
 from app.utils.format_cases import format_historical_cases_for_prompt
+from app.utils.segmentation import get_node_content
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,7 +30,7 @@ def generate_evidence_checklist(state: WorkflowState) -> dict:
     if not state.get("pdf_content_in_english"):
         raise ValueError("pdf_content_in_english is required for evidence checklist generation")
     
-    pdf_content = state["pdf_content_in_english"]
+    pdf_content = get_node_content(state, "generate_evidence_checklist")
     logger.debug(f"FIR content length: {len(pdf_content)} characters")
     
     # Get historical cases if available
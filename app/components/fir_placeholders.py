@@ -0,0 +1,30 @@
+from app.langgraph.state import WorkflowState
+from app.utils.document_generator import request_fir_placeholders, PLACEHOLDER_CONTEXT_CHARS
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def extract_fir_placeholders(state: WorkflowState) -> dict:
+    """
+    Extract the report template placeholders (accused, case title, FIR date, sections) once per workflow.
+
+    Runs alongside extract_fir_fact, so it only reads the FIR text (fir_facts
+    do not exist yet). The LLM call is paid while the workflow runs instead of
+    on every document download. A continued workflow keeps the placeholders it
+    already has. On failure nothing is stored, and generate_document extracts
+    them (with fir_facts available by then) at download time.
+    """
+    if state.get("fir_placeholders"):
+        return {}
+
+    pdf_content = state.get("pdf_content_in_english") or ""
+    if not pdf_content:
+        return {}
+    try:
+        placeholders = request_fir_placeholders(pdf_content[:PLACEHOLDER_CONTEXT_CHARS])
+    except Exception as e:
+        logger.warning(f"⚠️ [extract_fir_placeholders] Left for download time: {e}")
+        return {}
+    logger.info(f"✅ [extract_fir_placeholders] {placeholders.get('case_title')}")
+    return {"fir_placeholders": placeholders}
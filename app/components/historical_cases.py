@@ -54,28 +54,114 @@ import requests
 import json
 import re
 import time
+import hashlib
+import threading
 from urllib.parse import quote
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 import logging
+import numpy as np
 from pydantic import BaseModel, Field
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 
 # Local imports
-from app.models.openai import llm_model
+from app.models.openai import llm_model, small_llm_model, get_embedding
 from app.langgraph.state import WorkflowState
+from app.utils.deadline import current_deadline, report_partial, submit_with_deadline
+from app.utils.disk_cache import get_disk_cache
+from app.utils.http_client import get_http_client
+from app.rag import query_ndps_judgements
+from app.rag.ingest import enqueue_judgement
+from app.utils.judgment_text import split_paragraphs, chunk_paragraphs, select_key_passages, KEY_PASSAGE_TOKEN_BUDGET
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# On-disk cache of Indian Kanoon responses: search results expire, cleaned documents never change
+SEARCH_CACHE = "kanoon_search"
+DOCUMENT_CACHE = "kanoon_doc"
+DOCUMENT_VERSION = "2"  # Bump when clean_html changes
+KANOON_SEARCH_TTL = int(os.getenv("KANOON_SEARCH_TTL", str(7 * 24 * 3600)))
+
+# FIR-independent case summaries are cached per doc_id; bump the version when
+# CaseSummary or summary_prompt changes so stale summaries are regenerated
+SUMMARY_CACHE = "case_summary"
+CHUNK_SUMMARY_CACHE = "case_chunk_summary"
+SUMMARY_VERSION = "1"
+
+# Judgments longer than this are summarized map-reduce: paragraph-aligned chunks are
+# summarized concurrently by the small model, then reduced into one CaseSummary
+SINGLE_PASS_MAX_CHARS = int(os.getenv("SINGLE_PASS_MAX_CHARS", "60000"))
+SUMMARY_CHUNK_WORKERS = int(os.getenv("SUMMARY_CHUNK_WORKERS", "8"))
+# Separate from _fetch_executor, whose workers wait on these chunk summaries
+_chunk_executor = ThreadPoolExecutor(max_workers=SUMMARY_CHUNK_WORKERS, thread_name_prefix="case-chunk")
+
+# Relevancy to the FIR is the cosine similarity between the FIR (query + facts)
+# and the cached summary embedding, mapped linearly from [floor, ceiling] to 0-10
+RELEVANCY_SIMILARITY_FLOOR = float(os.getenv("RELEVANCY_SIMILARITY_FLOOR", "0.25"))
+RELEVANCY_SIMILARITY_CEILING = float(os.getenv("RELEVANCY_SIMILARITY_CEILING", "0.75"))
+FIR_CONTEXT_CHARS = 4000  # FIR characters embedded alongside the search query
+
+# Local-first retrieval from the bundled ndps_judgements index: Indian Kanoon is only
+# queried when fewer than LOCAL_MIN_CASES local cases reach LOCAL_MIN_SIMILARITY
+LOCAL_MIN_SIMILARITY = float(os.getenv("LOCAL_CASES_MIN_SIMILARITY", "0.4"))
+LOCAL_MIN_CASES = int(os.getenv("LOCAL_CASES_MIN_COUNT", "5"))
+LOCAL_SEARCH_K = 20  # Chunks retrieved; several chunks can belong to one case
+# Oldest judgment year returned, from the local index as well as from Indian Kanoon
+MIN_CASE_YEAR = 2010
+TARGET_CASES = 6
+SPARE_CANDIDATES = 3  # Extra documents queued in case some are off-topic or cannot be fetched
+
+# Search hits considered by prerank_hits; only the best TARGET_CASES + SPARE_CANDIDATES are fetched
+PRERANK_POOL = int(os.getenv("KANOON_PRERANK_POOL", "20"))
+PRERANK_KEYWORD_BONUS = 0.03  # Per FIR keyword in the title/headline
+PRERANK_KEYWORD_BONUS_MAX = 0.12
+PRERANK_SUPREME_COURT_BONUS = 0.05
+PRERANK_HIGH_COURT_BONUS = 0.02
+PRERANK_CITATION_BONUS = 0.01  # Per log(1 + times cited)
+PRERANK_CITATION_BONUS_MAX = 0.05
+
+# Document fetch + summarize workers shared by all concurrent workflows
+# (HTTP concurrency per host is capped separately by the shared HTTP client)
+KANOON_FETCH_WORKERS = int(os.getenv("KANOON_FETCH_WORKERS", "8"))
+_fetch_executor = ThreadPoolExecutor(max_workers=KANOON_FETCH_WORKERS, thread_name_prefix="kanoon")
+
+# Search query workers shared by all concurrent workflows (primary and fallback queries);
+# searches a workflow stops waiting for are cancelled if queued, or finish on a bounded pool
+KANOON_SEARCH_WORKERS = int(os.getenv("KANOON_SEARCH_WORKERS", "8"))
+_search_executor = ThreadPoolExecutor(max_workers=KANOON_SEARCH_WORKERS, thread_name_prefix="kanoon-search")
+
+# Seconds kept in reserve before the node budget runs out, so partial results
+# are returned by the node itself rather than by the deadline wrapper
+DEADLINE_MARGIN = 5
+
+
+def _remaining_budget():
+    """Seconds left in the node budget (minus margin), or None when unbounded"""
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    return max(0.0, deadline.remaining() - DEADLINE_MARGIN)
+
+
+def _request_timeout():
+    """
+    HTTP read timeout for the shared client: its configured read_timeout
+    (HTTP_READ_TIMEOUT) capped by the remaining node budget, or None (the
+    client default) when no deadline applies.
+    """
+    remaining = _remaining_budget()
+    if remaining is None:
+        return None
+    return max(1.0, min(get_http_client().read_timeout, remaining))
+
 class CaseSummary(BaseModel):
     case_relevant: bool = Field(description="Whether the case is about NDPS (Narcotic Drugs and Psychotropic Substances) Act or not")
     case_title: str = Field(description="A concise, descriptive title for the case (7-8 words maximum). Should capture the essence of the case without including names of parties or judges. Focus on the legal issue, substance involved, or key aspect (e.g., 'NDPS Act Ganja Possession Bail Denial Appeal')")
     case_summary: str = Field(description="Concise case summary (200-400 words maximum) covering: sections invoked, crime details, defence arguments, bail status and reasoning, prosecution approach, punishment/outcome, and key legal facts. Do not include names of parties or judges.")
     case_number: str | None = Field(default=None, description="Case number if mentioned in the judgment (e.g., '123', '456/2020', etc.). Return None if not found.")
     year: str | None = Field(default=None, description="Year of the judgment (e.g., '2020', '2021', etc.). Return None if not found.")
-    relevancy_score: int = Field(description="Relevancy score from 0-10 indicating how relevant this case is to the FIR. 10 = highly relevant, 0 = not relevant. Consider: substance match, similar facts, similar legal issues, similar procedural aspects.")
     
 summary_prompt = """Analyze the following legal case judgment and provide a structured summary focusing on legal aspects and facts.
 
@@ -84,9 +170,6 @@ Case Title: {case_title}
 Case Content:
 {case_content}
 
-Search Query (for relevancy scoring):
-{search_query}
-
 INSTRUCTIONS:
 1. First determine if this is an NDPS (Narcotic Drugs and Psychotropic Substances Act) case
 2. Generate a concise, descriptive title (7-8 words maximum) that captures the essence of the case. Focus on the legal issue, substance involved, or key aspect. Do NOT include names of parties or judges. Example: "NDPS Act Ganja Possession Bail Denial Appeal"
@@ -101,12 +184,6 @@ INSTRUCTIONS:
    - **Prosecution Approach**: Describe how prosecution proceeded, evidence presented, and legal arguments made
    - **Punishment/Outcome**: Final judgment, sentence imposed (if any), acquittal reasons (if applicable), and court's reasoning
    - **Key Legal Facts**: Important procedural aspects, compliance with legal requirements (e.g., Section 50 NDPS Act), and significant legal precedents cited
-5. Assign a relevancy score (0-10) based on how relevant this case is to the search query:
-   - 10: Highly relevant - matches search query closely, same substance, similar facts, similar legal issues, similar procedural aspects
-   - 7-9: Very relevant - matches search query well, same substance, some similar facts or legal issues
-   - 4-6: Moderately relevant - partially matches search query, same substance but different facts, or different substance but similar legal issues
-   - 1-3: Low relevance - loosely related to search query, different substance, different facts, but still NDPS case
-   - 0: Not relevant - not an NDPS case or completely unrelated to search query
 
 IMPORTANT:
 - Keep the summary to 200-400 words maximum (be concise but cover all key points)
@@ -115,11 +192,236 @@ IMPORTANT:
 - If information is not available in the content, state "Not mentioned" for that aspect
 - Ensure the summary is comprehensive, covering all the above points within the word limit
 - Extract case_number and year from the content if available
-- Provide relevancy_score as an integer from 0-10
+- "[...]" marks passages left out of the judgment text; do not speculate about them
 """
 
 summarizer_llm = llm_model.with_structured_output(CaseSummary)
 
+chunk_summary_prompt = """You are reading part {part} of {total} of a court judgment in an Indian criminal case.
+
+Write concise notes (at most 250 words) on what this part says about: sections invoked, the offence and
+substance/quantity seized, search/seizure/sampling procedure (e.g. Section 50, 52A NDPS Act), defence arguments,
+prosecution arguments, bail, and the court's findings or final order. Skip recitals and citations that add nothing.
+Do not include names of parties or judges. If this part has nothing relevant, reply "No relevant content".
+
+Judgment part {part} of {total}:
+{chunk}
+"""
+
+
+def _summarize_chunk(doc_id, chunk, part, total):
+    """Notes on one chunk of a judgment from the small model, cached by doc_id and chunk content"""
+    digest = hashlib.sha256(chunk.encode("utf-8")).hexdigest()[:16]
+    cache_key = f"{doc_id}:{digest}:v{SUMMARY_VERSION}"
+    cache = get_disk_cache()
+    cached = cache.get(CHUNK_SUMMARY_CACHE, cache_key)
+    if cached is not None:
+        return cached
+    notes = small_llm_model.invoke(chunk_summary_prompt.format(part=part, total=total, chunk=chunk)).content
+    cache.set(CHUNK_SUMMARY_CACHE, cache_key, notes)
+    return notes
+
+
+def summarize_judgment(doc_id, title, full_content, token_budget=KEY_PASSAGE_TOKEN_BUDGET):
+    """
+    Summarize a judgment into a CaseSummary.
+
+    The judgment is first reduced to its key passages (select_key_passages, up to
+    token_budget tokens; 0 keeps the full text). Text that still exceeds
+    SINGLE_PASS_MAX_CHARS is split into paragraph-aligned chunks, each chunk is
+    summarized concurrently by the small model (cached per doc_id, so
+    re-summarizing only pays for new chunks), and the ordered notes are reduced
+    into the CaseSummary. Unlike truncation, both paths keep the operative
+    order at the end of long judgments.
+    """
+    content = select_key_passages(full_content, token_budget)
+    if len(content) < len(full_content):
+        logger.debug(f"Key passages for document {doc_id}: {len(content):,} of {len(full_content):,} chars "
+                     f"({len(full_content) / max(len(content), 1):.1f}x smaller)")
+    if len(content) <= SINGLE_PASS_MAX_CHARS:
+        return summarizer_llm.invoke(summary_prompt.format(case_title=title, case_content=content))
+
+    chunks = chunk_paragraphs(split_paragraphs(content))
+    total = len(chunks)
+    futures = [submit_with_deadline(_chunk_executor, _summarize_chunk, doc_id, chunk, part, total)
+               for part, chunk in enumerate(chunks, start=1)]
+    notes = [future.result() for future in futures]
+    logger.debug(f"Summarized document {doc_id} in {total} chunks ({len(content):,} chars)")
+
+    case_content = "Notes on consecutive parts of the judgment, in order (the operative order is usually in the last parts):\n\n"
+    case_content += "\n\n".join(f"[Part {part} of {total}]\n{text}" for part, text in enumerate(notes, start=1))
+    return summarizer_llm.invoke(summary_prompt.format(
+        case_title=title,
+        case_content=limit_content_for_llm(case_content, max_content_tokens=80000)
+    ))
+
+
+def get_case_summary(doc_id, title, on_fetch=None):
+    """
+    FIR-independent summary of a judgment, generated once per doc_id and cached on disk.
+
+    The cached entry also holds the normalized embedding of the summary, so relevancy
+    to any later FIR is a dot product instead of another pass over the judgment.
+
+    Args:
+        doc_id: Indian Kanoon document ID
+        title: Title from the search result (used in the prompt)
+        on_fetch: Passed to fetch_full_document; called only when the judgment is downloaded (optional)
+
+    Returns:
+        {"case_relevant", "case_title", "case_summary", "case_number", "year", "embedding"},
+        or None if the document could not be fetched or summarized
+    """
+    cache_key = f"{doc_id}:v{SUMMARY_VERSION}"
+    cached = get_disk_cache().get(SUMMARY_CACHE, cache_key)
+    if cached is not None:
+        return cached
+
+    full_content, metadata = fetch_full_document(doc_id, on_fetch=on_fetch)
+    if not full_content:
+        logger.warning(f"Could not fetch content for document {doc_id}")
+        return None
+
+    summary = summarize_judgment(doc_id, title, full_content).model_dump()
+    summary["embedding"] = get_embedding(
+        f"{summary['case_title']}\n{summary['case_summary']}", normalize=True
+    ).tolist()
+    get_disk_cache().set(SUMMARY_CACHE, cache_key, summary)
+
+    # Grow the local judgements index so later FIRs can find this case without the network
+    if summary["case_relevant"]:
+        enqueue_judgement({
+            "doc_id": doc_id,
+            "text": full_content,
+            "summary": summary["case_summary"],
+            "title": summary["case_title"],
+            "case_number": summary["case_number"],
+            "year": summary["year"],
+            "court": (metadata or {}).get("docsource"),
+            "url": f"https://indiankanoon.org/doc/{doc_id}/",
+        })
+    return summary
+
+
+def relevancy_vector(search_query, fir_context=None):
+    """Normalized embedding of the search query plus the start of the FIR, or None on failure"""
+    text = search_query or ""
+    if fir_context:
+        text = f"{text}\n\n{fir_context[:FIR_CONTEXT_CHARS]}"
+    try:
+        return get_embedding(text, normalize=True)
+    except Exception as e:
+        logger.warning(f"Could not embed FIR for relevancy scoring: {e}")
+        return None
+
+
+def score_relevancy(summary, query_vector):
+    """
+    Relevancy (0-10) of a cached case summary to the current FIR.
+
+    Non-NDPS cases score 0. Without a query vector every NDPS case scores 5.
+    """
+    if not summary.get("case_relevant", True):
+        return 0.0
+    if query_vector is None or not summary.get("embedding"):
+        return 5.0
+    similarity = float(np.dot(query_vector, np.asarray(summary["embedding"], dtype="float32")))
+    return similarity_to_score(similarity)
+
+
+def similarity_to_score(similarity):
+    """Map a cosine similarity linearly from [floor, ceiling] onto a 0-10 relevancy score"""
+    span = RELEVANCY_SIMILARITY_CEILING - RELEVANCY_SIMILARITY_FLOOR
+    score = 10 * (similarity - RELEVANCY_SIMILARITY_FLOOR) / span
+    return round(min(10.0, max(0.0, score)), 1)
+
+
+# Page furniture of the source compendium that ends up inside digest chunks
+DIGEST_NOISE = re.compile(r"=== PAGE \d+ ===|NARCOTICS CONTROL BUREAU|https?://\S+")
+
+
+def _clean_digest(content):
+    """Single-line digest text without page headers"""
+    return " ".join(DIGEST_NOISE.sub(" ", content or "").split())
+
+
+def _local_case_title(content):
+    """Heading of a judgment digest: the text before the holding ("Honourable Supreme Court held ...")"""
+    text = _clean_digest(content)
+    text = re.sub(r"^\d+\.?\s+", "", text)  # Serial number of the digest entry
+    heading = re.split(r"\b(Hon'?ou?rable|The (Hon'?ble )?Supreme Court|The High Court|held)\b", text, maxsplit=1)[0]
+    return heading.strip()[:150] or "NDPS Case"
+
+
+def _case_year(year):
+    """Judgment year as an int, or None when missing or unparseable"""
+    match = re.match(r"\s*(\d{4})", str(year or ""))
+    return int(match.group(1)) if match else None
+
+
+def search_local_judgements(search_query, fir_context=None, min_similarity=LOCAL_MIN_SIMILARITY):
+    """
+    Search the bundled ndps_judgements FAISS index for cases relevant to the FIR.
+
+    Judgments ingested from Indian Kanoon are grouped by (case_number, year), or by
+    doc_id, exactly like Indian Kanoon results. Chunks of the bundled digest are
+    grouped by their digest entry; the entry's serial number is not a court case
+    number, so those cases carry no case_number and are keyed local_<chunk_id>.
+    A case scores by its best chunk; judgments older than MIN_CASE_YEAR are skipped.
+
+    Args:
+        search_query: Search query generated from the FIR
+        fir_context: FIR text; its start is embedded with the query, as for relevancy scoring
+        min_similarity: Cosine similarity a case needs to be returned
+
+    Returns:
+        Cases in the same format as search_indian_kanoon, best first
+    """
+    query = search_query
+    if fir_context:
+        query = f"{search_query}\n\n{fir_context[:FIR_CONTEXT_CHARS]}"
+    try:
+        hits = query_ndps_judgements(query, k=LOCAL_SEARCH_K)
+    except FileNotFoundError as e:
+        logger.warning(f"Local judgements index unavailable: {e}")
+        return []
+
+    cases = {}
+    for hit in hits:
+        chunk = hit["chunk"]
+        if hit["score"] < min_similarity:
+            continue
+        case_number, year = chunk.get("case_number"), chunk.get("year")
+        case_year = _case_year(year)
+        if case_year is not None and case_year < MIN_CASE_YEAR:
+            continue
+        if not chunk.get("doc_id"):
+            # Bundled digest: case_number is the entry's serial number
+            group = ("digest", case_number, year) if case_number else ("chunk", chunk.get("chunk_id"))
+            case_number = None
+            case_id = f"local_{chunk.get('chunk_id')}"
+        elif case_number and year:
+            group = case_id = f"{case_number}_{year}"
+        else:
+            group = case_id = f"doc_{chunk['doc_id']}"
+        case = cases.get(group)
+        if case is None:
+            cases[group] = {
+                "title": chunk.get("title") or _local_case_title(chunk.get("content", "")),
+                "url": chunk.get("url", ""),
+                # Judgements ingested from Indian Kanoon carry their case summary
+                "summary": chunk.get("summary") or _clean_digest(chunk.get("content")),
+                "case_number": case_number,
+                "year": year,
+                "case_id": case_id,
+                "score": similarity_to_score(hit["score"]),
+            }
+        elif not chunk.get("summary") and len(case["summary"]) < 2000:
+            # Hits come best first, so extra chunks only extend the summary
+            case["summary"] += " ... " + _clean_digest(chunk.get("content"))
+    return sorted(cases.values(), key=lambda x: x["score"], reverse=True)
+
+
 def get_headers():
     """Get headers with authentication"""
     api_token = os.getenv("INDIAN_KANOON_API_TOKEN")
@@ -179,27 +481,45 @@ def build_search_url(search_query, pagenum=0, doctypes="judgments", fromdate="01
     return f"https://api.indiankanoon.org/search/?{'&'.join(params)}"
 
 def clean_html(text):
-    """Remove HTML tags and clean up whitespace"""
+    """Remove HTML tags and clean up whitespace, keeping paragraphs separated by a blank line"""
     if not text:
         return ""
+    # Block-level tags end a paragraph
+    text = re.sub(r'(?i)<br\s*/?>|</(p|div|pre|blockquote|h[1-6]|li|tr)>', '\n', text)
     # Remove HTML tags
     text = re.sub(r'<[^>]+>', '', text)
-    # Clean up extra whitespace and newlines
-    text = re.sub(r'\s+', ' ', text)
+    # Clean up extra whitespace within paragraphs, then between them
+    text = re.sub(r'[^\S\n]+', ' ', text)
+    text = re.sub(r' ?\n\s*', '\n\n', text)
     return text.strip()
 
-def fetch_full_document(doc_id):
-    """Fetch full document text from Indian Kanoon API"""
+def fetch_full_document(doc_id, on_fetch=None):
+    """
+    Fetch full document text from Indian Kanoon API (cleaned text is cached on disk by doc_id).
+    
+    on_fetch (optional) is called before each network request, i.e. only on a document cache miss.
+    """
+    cache = get_disk_cache()
+    cache_key = f"{doc_id}:v{DOCUMENT_VERSION}"
+    cached = cache.get(DOCUMENT_CACHE, cache_key)
+    if cached is not None:
+        return cached["text"], cached["metadata"]
+    
+    if on_fetch:
+        on_fetch()
     doc_url = f"https://api.indiankanoon.org/doc/{doc_id}/"
     try:
-        response = requests.post(doc_url, headers=get_headers(), timeout=30)
+        response = get_http_client().post(doc_url, headers=get_headers(), timeout=_request_timeout())
         if response.status_code == 200:
             doc_data = response.json()
             # Extract full document text from 'doc' field
             full_text = doc_data.get('doc', '')
             if not full_text:
                 return None, None
-            return clean_html(full_text), doc_data
+            cleaned = clean_html(full_text)
+            metadata = {k: v for k, v in doc_data.items() if k != 'doc'}
+            cache.set(DOCUMENT_CACHE, cache_key, {"text": cleaned, "metadata": metadata})
+            return cleaned, metadata
         else:
             logger.warning(f"Error fetching document {doc_id}: {response.status_code}")
             return None, None
@@ -266,79 +586,17 @@ def extract_case_title(content):
     
     return case_title
 
-def search_indian_kanoon(search_query, max_results=10, fromdate="01-01-2000", 
-                        doctypes="judgments", todate=None, title_filter=None, 
-                        cite_filter=None, author_filter=None, bench_filter=None, 
-                        maxcites=None, maxpages=None, fir_context=None):
+def collect_search_hits(search_query, max_results=10, fromdate="01-01-2000", doctypes="judgments",
+                        todate=None, title_filter=None, cite_filter=None, author_filter=None,
+                        bench_filter=None, maxcites=None, maxpages=None):
     """
-    Search Indian Kanoon API for cases and return unique results.
+    Collect unique document hits for a query from Indian Kanoon search pages (no documents fetched).
     
-    This function:
-    1. First collects unique document IDs from search results (across multiple pages if needed)
-    2. Then fetches full document content only for unique documents
-    3. Returns data in format compatible with historical_cases.py
-    
-    Reference: https://api.indiankanoon.org/documentation/
-    
-    Args:
-        search_query: Search query string (required)
-        max_results: Maximum number of unique cases to return (default: 10)
-        fromdate: Minimum date filter in DD-MM-YYYY format (default: "01-01-2000")
-        doctypes: Filter by document types (default: "judgments")
-            Examples:
-            - "judgments" - All judgments (SC, HC, District Courts)
-            - "supremecourt" - Supreme Court only
-            - "delhi", "bombay", "kolkata", "chennai" - Specific High Courts
-            - "judgments,supremecourt" - Combine multiple (comma-separated)
-            - "highcourts,cci" - High courts + specific tribunal
-            - "laws" - Central Acts and Rules
-            - "tribunals" - All tribunals
-        todate: Maximum date filter in DD-MM-YYYY format (e.g., "31-12-2024")
-        title_filter: Words/phrases that must appear in document title (e.g., "NDPS")
-            Use this to ensure results have specific keywords in the title
-        cite_filter: Filter by citation (e.g., "1993 AIR")
-            Restrict search to documents with a specific citation
-        author_filter: Filter by judge/author name (e.g., "arijit pasayat")
-            Find judgments written by a particular judge
-        bench_filter: Filter by judge in bench (e.g., "arijit pasayat")
-            Find judgments where a specific judge was on the bench
-        maxcites: Number of citations to return per document (max 50)
-            Get list of citations for matching documents in search results
-        maxpages: Number of pages to fetch in one call (max 1000)
-            Fetch multiple pages in a single API call (only used on first page)
-        fir_context: FIR content context for relevancy scoring (optional)
-            Used by LLM to determine relevancy score of cases
+    Arguments are as for search_indian_kanoon.
     
     Returns:
-        List of dictionaries with case information:
-        [
-            {
-                "title": case_title,
-                "url": f"https://indiankanoon.org/doc/{doc_id}/",
-                "summary": content_preview,
-                "case_number": case_number,
-                "year": year,
-                "case_id": f"{case_number}_{year}",
-                "score": relevance_score,
-                "content": full_document_content
-            }
-        ]
-    
-    Example:
-        # Basic search
-        results = search_indian_kanoon("NDPS bail Ganja", max_results=10)
-        
-        # Advanced search with filters
-        results = search_indian_kanoon(
-            search_query="commercial quantity Cannabis",
-            max_results=10,
-            fromdate="01-01-2020",
-            doctypes="judgments,supremecourt",
-            title_filter="NDPS",
-            author_filter="arijit pasayat"
-        )
+        [{"tid", "title", "headline", "docsource", "docsize", "publishdate", "numcitedby"}] in search order
     """
-    
     logger.info(f"Searching Indian Kanoon with query: {search_query}")
     
     # OPTIMIZATION: Use better defaults for relevance
@@ -378,63 +636,67 @@ def search_indian_kanoon(search_query, max_results=10, fromdate="01-01-2000",
                 maxpages=effective_maxpages if pagenum == 0 else None  # Use maxpages on first page
             )
             
-            response = requests.post(search_url, headers=get_headers(), timeout=30)
-            
-            if response.status_code == 200:
+            # The URL carries the full parameter set, so it is the cache key
+            data = get_disk_cache().get(SEARCH_CACHE, search_url, ttl=KANOON_SEARCH_TTL)
+            from_cache = data is not None
+            if not from_cache:
+                response = get_http_client().post(search_url, headers=get_headers(), timeout=_request_timeout())
+                if response.status_code == 403:
+                    logger.error("Authentication failed. Please check your API token.")
+                    return []
+                if response.status_code != 200:
+                    logger.warning(f"Search API returned status {response.status_code}: {response.text}")
+                    break
                 try:
                     data = response.json()
                 except json.JSONDecodeError as e:
                     logger.error(f"Failed to parse JSON response: {e}")
                     logger.error(f"Response text: {response.text[:500]}")
                     break
-                    
-                docs = data.get('docs', [])
-                
-                # Log response details for debugging
+                get_disk_cache().set(SEARCH_CACHE, search_url, data)
+            
+            docs = data.get('docs', [])
+            
+            # Log response details for debugging
+            if pagenum == 0:
+                logger.debug(f"Search URL: {search_url}")
+                logger.debug(f"API response keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
+                logger.debug(f"Total docs in response: {len(docs) if docs else 0}")
+                if isinstance(data, dict):
+                    logger.debug(f"Response metadata: {json.dumps({k: v for k, v in data.items() if k != 'docs'}, indent=2)[:500]}")
+            
+            if not docs:
+                logger.info(f"No more results found at page {pagenum}")
                 if pagenum == 0:
-                    logger.debug(f"Search URL: {search_url}")
-                    logger.debug(f"API response keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
-                    logger.debug(f"Total docs in response: {len(docs) if docs else 0}")
-                    if isinstance(data, dict):
-                        logger.debug(f"Response metadata: {json.dumps({k: v for k, v in data.items() if k != 'docs'}, indent=2)[:500]}")
-                
-                if not docs:
-                    logger.info(f"No more results found at page {pagenum}")
-                    if pagenum == 0:
-                        logger.warning(f"Initial search returned 0 results. Query: '{search_query}'")
-                    break
+                    logger.warning(f"Initial search returned 0 results. Query: '{search_query}'")
+                break
+            
+            # Collect unique document IDs with docsize filtering
+            for doc in docs:
+                doc_id = doc.get('tid')
+                docsize = doc.get('docsize', 0)  # Get document size from API
                 
-                # Collect unique document IDs with docsize filtering
-                for doc in docs:
-                    doc_id = doc.get('tid')
-                    docsize = doc.get('docsize', 0)  # Get document size from API
-                    
-                    if doc_id and doc_id not in processed_ids:
-                        # Filter out documents that are too large
-                        if docsize > MAX_DOCSIZE:
-                            logger.debug(f"Skipping document {doc_id} - too large ({docsize:,} chars)")
-                            continue
-                            
-                        processed_ids.add(doc_id)
-                        unique_docs.append({
-                            'tid': doc_id,
-                            'title': doc.get('title', 'N/A'),
-                            'headline': doc.get('headline', ''),
-                            'docsource': doc.get('docsource', ''),
-                            'docsize': docsize,
-                        })
+                if doc_id and doc_id not in processed_ids:
+                    # Filter out documents that are too large
+                    if docsize > MAX_DOCSIZE:
+                        logger.debug(f"Skipping document {doc_id} - too large ({docsize:,} chars)")
+                        continue
                         
-                        if len(unique_docs) >= max_results:
-                            break
-                
-                logger.info(f"Found {len(unique_docs)} unique documents so far (searched page {pagenum})")
-                
-            elif response.status_code == 403:
-                logger.error("Authentication failed. Please check your API token.")
-                return []
-            else:
-                logger.warning(f"Search API returned status {response.status_code}: {response.text}")
-                break
+                    processed_ids.add(doc_id)
+                    unique_docs.append({
+                        'tid': doc_id,
+                        'title': doc.get('title', 'N/A'),
+                        'headline': doc.get('headline', ''),
+                        'docsource': doc.get('docsource', ''),
+                        'docsize': docsize,
+                        'publishdate': doc.get('publishdate', ''),
+                        'numcitedby': doc.get('numcitedby', 0),
+                    })
+                    
+                    if len(unique_docs) >= max_results:
+                        break
+            
+            logger.info(f"Found {len(unique_docs)} unique documents so far (searched page {pagenum}{', cached' if from_cache else ''})")
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error at page {pagenum}: {e}")
@@ -444,78 +706,109 @@ def search_indian_kanoon(search_query, max_results=10, fromdate="01-01-2000",
             break
         
         pagenum += 1
-        if pagenum > 0:  # Only delay between pages
+        if not from_cache:  # Only delay between live API calls
             time.sleep(0.2)  # Reduced delay
     
-    logger.info(f"Found {len(unique_docs)} unique documents, now fetching full content in parallel...")
+    return unique_docs
+
+
+def summarize_hits(unique_docs, search_query, fir_context=None, on_result=None, target=None,
+                   query_vector=None, stats=None):
+    """
+    Fetch, summarize (cached per document) and score search hits in parallel.
+    
+    Args:
+        unique_docs: Hits from collect_search_hits, best candidates first
+        search_query: Query used for relevancy scoring together with fir_context
+        fir_context: FIR content for relevancy scoring (optional)
+        on_result: Callback invoked with each case as soon as it is summarized (optional)
+        target: Stop and cancel the remaining documents once this many relevant cases are found (optional)
+        query_vector: Precomputed relevancy_vector(search_query, fir_context) (optional)
+        stats: Dict that receives "documents_fetched" (documents downloaded from Indian
+            Kanoon, i.e. document cache misses) and "documents_cancelled" (optional)
+    
+    Returns:
+        Cases sorted by relevancy score (see search_indian_kanoon)
+    """
+    # Summaries are cached per document; only relevancy depends on this FIR
+    if query_vector is None and unique_docs:
+        query_vector = relevancy_vector(search_query, fir_context)
+    
+    fetch_count = {"documents_fetched": 0}
+    fetch_count_lock = threading.Lock()
+    
+    def count_fetch():
+        with fetch_count_lock:
+            fetch_count["documents_fetched"] += 1
     
-    # STEP 2: Fetch and process documents in parallel for speed
     def fetch_and_process_doc(doc_info):
-        """Fetch and process a single document"""
+        """Summarize a single document (cached) and score it against the FIR"""
         doc_id = doc_info['tid']
         title = doc_info['title']
         
         try:
-            # Fetch full document
-            full_content, doc_metadata = fetch_full_document(doc_id)
-            
-            if not full_content:
-                logger.warning(f"Could not fetch content for document {doc_id}")
+            summary = get_case_summary(doc_id, title, on_fetch=count_fetch)
+            if summary is None:
                 return None
-            
-            # Limit content
-            limited_content = limit_content_for_llm(full_content, max_content_tokens=80000)
-            
-            # Summarize with LLM
-            try:
-                summary_result = summarizer_llm.invoke(
-                    summary_prompt.format(
-                        case_title=title,
-                        case_content=limited_content,
-                        search_query=search_query or "Not provided"
-                    )
-                )
-                
-                case_title_llm = summary_result.case_title if hasattr(summary_result, 'case_title') else title
-                content_preview = summary_result.case_summary if hasattr(summary_result, 'case_summary') else str(summary_result)
-                case_number = summary_result.case_number if hasattr(summary_result, 'case_number') else None
-                year = summary_result.year if hasattr(summary_result, 'year') else None
-                relevancy_score = summary_result.relevancy_score if hasattr(summary_result, 'relevancy_score') else 5
-                
-            except Exception as e:
-                logger.warning(f"Error summarizing case {title}: {e}")
-                content_preview = full_content[:500] + "..." if len(full_content) > 500 else full_content
-                relevancy_score = 5
-                case_title_llm = title
-                case_number = None
-                year = None
-            
-            case_id = f"{case_number}_{year}" if case_number and year else f"doc_{doc_id}"
-            
-            return {
-                "title": case_title_llm,
-                "url": f"https://indiankanoon.org/doc/{doc_id}/",
-                "summary": content_preview,
-                "case_number": case_number,
-                "year": year,
-                "case_id": case_id,
-                "score": float(relevancy_score)
-            }
+            case_title_llm = summary.get('case_title') or title
+            content_preview = summary.get('case_summary', '')
+            case_number = summary.get('case_number')
+            year = summary.get('year')
+            relevancy_score = score_relevancy(summary, query_vector)
             
         except Exception as e:
-            logger.error(f"Error processing document {doc_id}: {e}")
-            return None
+            logger.warning(f"Error summarizing case {title}: {e}")
+            try:
+                # Usually a document cache hit: get_case_summary already fetched it
+                full_content, _ = fetch_full_document(doc_id, on_fetch=count_fetch)
+            except Exception as fetch_error:
+                logger.error(f"Error processing document {doc_id}: {fetch_error}")
+                return None
+            if not full_content:
+                return None
+            content_preview = full_content[:500] + "..." if len(full_content) > 500 else full_content
+            relevancy_score = 5
+            case_title_llm = title
+            case_number = None
+            year = None
+        
+        case_id = f"{case_number}_{year}" if case_number and year else f"doc_{doc_id}"
+        
+        return {
+            "title": case_title_llm,
+            "url": f"https://indiankanoon.org/doc/{doc_id}/",
+            "summary": content_preview,
+            "case_number": case_number,
+            "year": year,
+            "case_id": case_id,
+            "score": float(relevancy_score)
+        }
     
-    # Fetch documents in parallel (5 concurrent workers)
+    # Fetch documents in parallel on the shared executor
+    # Stop waiting when the node budget runs out and keep what is already summarized
     results = []
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_doc = {executor.submit(fetch_and_process_doc, doc_info): doc_info 
-                         for doc_info in unique_docs[:max_results]}
+    future_to_doc = {submit_with_deadline(_fetch_executor, fetch_and_process_doc, doc_info): doc_info 
+                     for doc_info in unique_docs}
+    try:
         
-        for future in as_completed(future_to_doc):
+        for future in as_completed(future_to_doc, timeout=_remaining_budget()):
             result = future.result()
             if result:
                 results.append(result)
+                if on_result:
+                    on_result(result)
+                if target and sum(1 for r in results if r.get('score', 0) > 0) >= target:
+                    logger.info(f"Reached {target} relevant cases, cancelling the remaining {len(future_to_doc) - len(results)} documents")
+                    break
+    except FuturesTimeoutError:
+        logger.warning(f"Time budget exhausted after summarizing {len(results)} of {len(future_to_doc)} documents")
+        current_deadline().mark_truncated()
+    finally:
+        cancelled = sum(future.cancel() for future in future_to_doc)
+        if stats is not None:
+            stats["documents_cancelled"] = cancelled
+            with fetch_count_lock:
+                stats["documents_fetched"] = fetch_count["documents_fetched"]
     
     # Sort by relevancy score (highest first) to get most relevant cases
     results.sort(key=lambda x: x.get('score', 0), reverse=True)
@@ -523,10 +816,215 @@ def search_indian_kanoon(search_query, max_results=10, fromdate="01-01-2000",
     logger.info(f"Successfully fetched {len(results)} cases from Indian Kanoon")
     return results
 
+def search_indian_kanoon(search_query, max_results=10, fromdate="01-01-2000", 
+                        doctypes="judgments", todate=None, title_filter=None, 
+                        cite_filter=None, author_filter=None, bench_filter=None, 
+                        maxcites=None, maxpages=None, fir_context=None, on_result=None):
+    """
+    Search Indian Kanoon API for cases and return unique results.
+    
+    This function:
+    1. First collects unique document IDs from search results (across multiple pages if needed)
+    2. Then fetches full document content only for unique documents
+    3. Returns data in format compatible with historical_cases.py
+    
+    Reference: https://api.indiankanoon.org/documentation/
+    
+    Args:
+        search_query: Search query string (required)
+        max_results: Maximum number of unique cases to return (default: 10)
+        fromdate: Minimum date filter in DD-MM-YYYY format (default: "01-01-2000")
+        doctypes: Filter by document types (default: "judgments")
+            Examples:
+            - "judgments" - All judgments (SC, HC, District Courts)
+            - "supremecourt" - Supreme Court only
+            - "delhi", "bombay", "kolkata", "chennai" - Specific High Courts
+            - "judgments,supremecourt" - Combine multiple (comma-separated)
+            - "highcourts,cci" - High courts + specific tribunal
+            - "laws" - Central Acts and Rules
+            - "tribunals" - All tribunals
+        todate: Maximum date filter in DD-MM-YYYY format (e.g., "31-12-2024")
+        title_filter: Words/phrases that must appear in document title (e.g., "NDPS")
+            Use this to ensure results have specific keywords in the title
+        cite_filter: Filter by citation (e.g., "1993 AIR")
+            Restrict search to documents with a specific citation
+        author_filter: Filter by judge/author name (e.g., "arijit pasayat")
+            Find judgments written by a particular judge
+        bench_filter: Filter by judge in bench (e.g., "arijit pasayat")
+            Find judgments where a specific judge was on the bench
+        maxcites: Number of citations to return per document (max 50)
+            Get list of citations for matching documents in search results
+        maxpages: Number of pages to fetch in one call (max 1000)
+            Fetch multiple pages in a single API call (only used on first page)
+        fir_context: FIR content context for relevancy scoring (optional)
+            Embedded with the search query and compared to each cached case summary
+        on_result: Callback invoked with each case as soon as it is summarized (optional)
+            Used by the node to keep partial results when its time budget runs out
+    
+    Returns:
+        List of dictionaries with case information:
+        [
+            {
+                "title": case_title,
+                "url": f"https://indiankanoon.org/doc/{doc_id}/",
+                "summary": content_preview,
+                "case_number": case_number,
+                "year": year,
+                "case_id": f"{case_number}_{year}",
+                "score": relevance_score,
+                "content": full_document_content
+            }
+        ]
+    
+    Example:
+        # Basic search
+        results = search_indian_kanoon("NDPS bail Ganja", max_results=10)
+        
+        # Advanced search with filters
+        results = search_indian_kanoon(
+            search_query="commercial quantity Cannabis",
+            max_results=10,
+            fromdate="01-01-2020",
+            doctypes="judgments,supremecourt",
+            title_filter="NDPS",
+            author_filter="arijit pasayat"
+        )
+    """
+    
+    unique_docs = collect_search_hits(
+        search_query, max_results=max_results, fromdate=fromdate, doctypes=doctypes, todate=todate,
+        title_filter=title_filter, cite_filter=cite_filter, author_filter=author_filter,
+        bench_filter=bench_filter, maxcites=maxcites, maxpages=maxpages
+    )
+    logger.info(f"Found {len(unique_docs)} unique documents, now fetching full content in parallel...")
+    return summarize_hits(unique_docs[:max_results], search_query, fir_context=fir_context, on_result=on_result)
+
+
+def search_candidates(queries, needed, **search_kwargs):
+    """
+    Run several search queries concurrently and merge their hits, deduplicated by document ID.
+    
+    Hits keep the priority of the query order (primary query first). Waiting stops
+    as soon as the queries finished so far, taken in that order, give `needed`
+    unique hits; slower fallback searches are then abandoned.
+    
+    Args:
+        queries: Search queries, most important first
+        needed: Number of unique hits wanted
+        **search_kwargs: Passed to collect_search_hits
+    
+    Returns:
+        Merged hits, at most `needed`
+    """
+    futures = {submit_with_deadline(_search_executor, collect_search_hits, query, max_results=needed, **search_kwargs): index
+               for index, query in enumerate(queries)}
+    hits_by_query = {}
+    
+    def merge(prefix_only):
+        hits = []
+        seen = set()
+        for index in range(len(queries)):
+            if index not in hits_by_query:
+                if prefix_only:
+                    break
+                continue
+            for doc in hits_by_query[index]:
+                if doc['tid'] not in seen:
+                    seen.add(doc['tid'])
+                    hits.append(doc)
+        return hits[:needed]
+    
+    try:
+        for future in as_completed(futures, timeout=_remaining_budget()):
+            try:
+                hits_by_query[futures[future]] = future.result()
+            except Exception as e:
+                logger.warning(f"Search query '{queries[futures[future]]}' failed: {e}")
+                hits_by_query[futures[future]] = []
+            if len(merge(prefix_only=True)) >= needed:
+                break
+    except FuturesTimeoutError:
+        logger.warning(f"Time budget exhausted with {len(hits_by_query)} of {len(queries)} searches finished")
+        current_deadline().mark_truncated()
+    finally:
+        for future in futures:
+            future.cancel()
+    
+    hits = merge(prefix_only=False)
+    logger.info(f"{len(hits)} unique candidate documents from {len(hits_by_query)} of {len(queries)} searches")
+    return hits
+
+
+def prerank_hits(hits, query_vector, keywords, limit):
+    """
+    Order search hits by their metadata and keep the best `limit` before any document is fetched.
+    
+    Score = cosine similarity of the FIR (query_vector) to the hit's title and headline
+    snippet (one batched embedding call), plus keyword, court and citation bonuses.
+    Without a query vector only the rule bonuses (and search order) count.
+    
+    Args:
+        hits: Hits from collect_search_hits / search_candidates, in search order
+        query_vector: Normalized FIR embedding (relevancy_vector) or None
+        keywords: Keywords extracted from the FIR
+        limit: Number of hits to keep
+    
+    Returns:
+        The best `limit` hits, best first
+    """
+    if len(hits) <= limit:
+        return hits
+    
+    texts = [f"{clean_html(hit.get('title', ''))}. {clean_html(hit.get('headline', ''))}" for hit in hits]
+    similarities = np.zeros(len(hits), dtype="float32")
+    if query_vector is not None:
+        try:
+            similarities = get_embedding(texts, normalize=True) @ query_vector
+        except Exception as e:
+            logger.warning(f"Could not embed search hits for pre-ranking: {e}")
+    
+    terms = {k.lower() for k in keywords if len(k) > 2} - {"ndps"}
+    scored = []
+    for position, (hit, text, similarity) in enumerate(zip(hits, texts, similarities)):
+        lowered = text.lower()
+        score = float(similarity)
+        score += min(PRERANK_KEYWORD_BONUS * sum(term in lowered for term in terms), PRERANK_KEYWORD_BONUS_MAX)
+        source = (hit.get('docsource') or '').lower()
+        if "supreme court" in source:
+            score += PRERANK_SUPREME_COURT_BONUS
+        elif "high court" in source:
+            score += PRERANK_HIGH_COURT_BONUS
+        score += min(PRERANK_CITATION_BONUS * np.log1p(hit.get('numcitedby') or 0), PRERANK_CITATION_BONUS_MAX)
+        scored.append((score, -position, hit))
+    
+    scored.sort(key=lambda item: item[:2], reverse=True)
+    return [hit for _, _, hit in scored[:limit]]
+
 # ============================================================================
 # LangGraph Node Function
 # ============================================================================
 
+def build_fallback_queries(fir_substance, keywords):
+    """Simpler queries built from the substance and keywords, most specific first"""
+    fallback_queries = []
+    
+    # Build fallback queries from keywords
+    if fir_substance:
+        # Try substance + "NDPS" + "bail"
+        fallback_queries.append(f"{fir_substance.capitalize()} NDPS bail")
+        fallback_queries.append(f"{fir_substance.capitalize()} NDPS")
+        fallback_queries.append(f"NDPS {fir_substance.capitalize()}")
+    
+    # Try with "BAIL" and substance
+    if "BAIL" in [k.upper() for k in keywords] and fir_substance:
+        fallback_queries.append(f"{fir_substance.capitalize()} bail")
+    
+    # Try just "NDPS bail" if we have substance
+    if fir_substance:
+        fallback_queries.append("NDPS bail")
+    
+    return fallback_queries
+
 class SearchQueryAndKeywords(BaseModel):
     search_query: str = Field(description="A specific search query to find relevant court judgments in NDPS cases from Indian Kanoon database")
     keywords: list[str] = Field(description="List of important keywords extracted from FIR including substance name, legal terms, and case characteristics. MUST always include 'BAIL' as one of the keywords. Include substance name variations if applicable.")
@@ -538,9 +1036,10 @@ def historical_cases(state: WorkflowState) -> dict:
     
     Simple flow:
     1. Generate search query and keywords from FIR content (single LLM call)
-    2. Search Indian Kanoon API for relevant NDPS cases (after 2000)
+    2. Search the local ndps_judgements index; when it has fewer than LOCAL_MIN_CASES
+       good matches, also search Indian Kanoon API for relevant NDPS cases (from MIN_CASE_YEAR)
     3. Get full document for each case
-    4. Summarize each document individually (max 2000 words) with relevancy score (0-10)
+    4. Summarize each document once (cached per doc_id) and score its relevancy (0-10) to this FIR
     5. Return results with full text preserved for future use
     
     Args:
@@ -549,7 +1048,11 @@ def historical_cases(state: WorkflowState) -> dict:
     Returns:
         Dictionary with "historical_cases" key containing list of case dictionaries
         Each case includes: title, url, summary (max 2K words), case_number, year, 
-        case_id, score (0-10 relevancy), and full content
+        case_id, score (0-10 relevancy), and full content.
+        "historical_cases_stats" counts local cases and, when Indian Kanoon was
+        searched, its hits, hits skipped by pre-ranking, documents cancelled once
+        enough cases were found, fetches avoided (those two together) and
+        documents actually downloaded
     """
     logger.info("Starting historical cases search using Indian Kanoon API")
     
@@ -628,82 +1131,82 @@ Generate search_query, keywords, and substance_name:
     
     historical_cases_list = []
     processed_case_ids = set()
+    local_case_ids = set()
+    # Per-run counters returned as historical_cases_stats
+    run_stats = {"local_cases": 0}
+    
+    # Cases summarized so far, reported as the node's partial result in case it overruns
+    partial_cases = []
+    
+    def record_partial(result):
+        partial_cases.append(result)
+        ranked = sorted(partial_cases, key=lambda x: x.get('score', 0), reverse=True)
+        report_partial({"historical_cases": ranked[:6]})
     
     try:
-        # Search using main search query with optimizations
-        logger.info("Searching with main query...")
-        results = search_indian_kanoon(
-            search_query=search_query,
-            max_results=6,  # Focus on 5-6 extremely relevant cases
-            fromdate="01-01-2010",  # Focus on last 15 years for more relevant cases
-            doctypes="judgments",  # Will be upgraded to include supremecourt,highcourts in function
-            title_filter="NDPS",  # Ensure NDPS relevance
-            maxcites=5,  # Get citations for relevance
-            maxpages=10,  # Fetch 10 pages in one call for speed
-            fir_context=pdf_content  # Pass FIR content for relevancy scoring
-        )
-        
-        # Process results from main search
-        for result in results:
-            case_id = result.get('case_id', '')
-            if case_id and case_id not in processed_case_ids:
-                processed_case_ids.add(case_id)
-                historical_cases_list.append(result)
-        
-        # If main query returned no results, try fallback searches with keywords
-        if len(historical_cases_list) == 0:
-            logger.warning(f"Main query returned 0 results, trying fallback searches with keywords...")
-            
-            # Try simpler queries using keywords
-            fallback_queries = []
-            
-            # Build fallback queries from keywords
-            if fir_substance:
-                # Try substance + "NDPS" + "bail"
-                fallback_queries.append(f"{fir_substance.capitalize()} NDPS bail")
-                fallback_queries.append(f"{fir_substance.capitalize()} NDPS")
-                fallback_queries.append(f"NDPS {fir_substance.capitalize()}")
-            
-            # Try with "BAIL" and substance
-            if "BAIL" in [k.upper() for k in keywords] and fir_substance:
-                fallback_queries.append(f"{fir_substance.capitalize()} bail")
+        # Local judgements index first; the network is only needed when it has too few good matches
+        for result in search_local_judgements(search_query, fir_context=pdf_content)[:TARGET_CASES]:
+            processed_case_ids.add(result['case_id'])
+            local_case_ids.add(result['case_id'])
+            historical_cases_list.append(result)
+            record_partial(result)
+        run_stats["local_cases"] = len(historical_cases_list)
+        logger.info(f"Local judgements index returned {len(historical_cases_list)} cases")
+    except Exception as e:
+        logger.warning(f"Local judgements search failed: {e}")
+    
+    try:
+        deadline = current_deadline()
+        if len(historical_cases_list) >= LOCAL_MIN_CASES:
+            logger.info("✅ Enough local cases, skipping Indian Kanoon")
+        elif deadline is not None and _remaining_budget() <= 0:
+            logger.warning("Time budget spent, skipping Indian Kanoon search")
+            deadline.mark_truncated()
+        else:
+            # Primary and fallback queries are searched concurrently; hits are deduplicated
+            # before any document is fetched, and fallback hits only fill what the primary lacks
+            needed = TARGET_CASES - len(historical_cases_list)
+            queries = [search_query] + build_fallback_queries(fir_substance, keywords)[:3]
+            logger.info(f"Searching Indian Kanoon with {len(queries)} queries: {queries}")
+            hits = search_candidates(
+                queries,
+                max(PRERANK_POOL, needed + SPARE_CANDIDATES),
+                fromdate=f"01-01-{MIN_CASE_YEAR}",  # Recent judgments only, as for local cases
+                doctypes="judgments",  # Will be upgraded to include supremecourt,highcourts in function
+                title_filter="NDPS",  # Ensure NDPS relevance
+                maxcites=5,  # Get citations for relevance
+                maxpages=10,  # Fetch 10 pages in one call for speed
+            )
             
-            # Try just "NDPS bail" if we have substance
-            if fir_substance:
-                fallback_queries.append("NDPS bail")
+            # Rank hits on their metadata and fetch only the best (plus a few spares
+            # for off-topic or unfetchable documents)
+            query_vector = relevancy_vector(search_query, pdf_content) if hits else None
+            selected = prerank_hits(hits, query_vector, keywords, needed + SPARE_CANDIDATES)
+            summarize_stats = {}
+            results = summarize_hits(
+                selected,
+                search_query,
+                fir_context=pdf_content,  # Pass FIR content for relevancy scoring
+                on_result=record_partial,
+                target=needed,
+                query_vector=query_vector,
+                stats=summarize_stats
+            )
+            run_stats["search_hits"] = len(hits)
+            run_stats["prerank_skipped"] = len(hits) - len(selected)
+            run_stats["documents_cancelled"] = summarize_stats.get("documents_cancelled", 0)
+            run_stats["fetches_avoided"] = run_stats["prerank_skipped"] + run_stats["documents_cancelled"]
+            run_stats["documents_fetched"] = summarize_stats.get("documents_fetched", 0)
             
-            # Try each fallback query
-            for fallback_query in fallback_queries[:3]:  # Limit to 3 fallback attempts
-                if len(historical_cases_list) >= 6:  # Focus on 5-6 cases
-                    break
-                    
-                logger.info(f"Trying fallback query: {fallback_query}")
-                try:
-                    fallback_results = search_indian_kanoon(
-                        search_query=fallback_query,
-                        max_results=6 - len(historical_cases_list),  # Focus on 5-6 cases
-                        fromdate="01-01-2010",  # Last 15 years
-                        doctypes="judgments",
-                        title_filter="NDPS",
-                        maxcites=5,
-                        maxpages=10,
-                        fir_context=pdf_content
-                    )
-                    
-                    for result in fallback_results:
-                        case_id = result.get('case_id', '')
-                        if case_id and case_id not in processed_case_ids:
-                            processed_case_ids.add(case_id)
-                            historical_cases_list.append(result)
-                            
-                    if len(historical_cases_list) > 0:
-                        logger.info(f"Fallback query '{fallback_query}' found {len(historical_cases_list)} cases")
-                        break
-                except Exception as e:
-                    logger.warning(f"Fallback query '{fallback_query}' failed: {e}")
-                    continue
+            # Merge with local cases, deduplicated by case number/year
+            for result in results:
+                case_id = result.get('case_id', '')
+                if case_id and case_id not in processed_case_ids:
+                    processed_case_ids.add(case_id)
+                    historical_cases_list.append(result)
         
-        # Simple processing - no additional filtering needed
+        # Local and Indian Kanoon cases share the 0-10 scale; keep the best
+        historical_cases_list.sort(key=lambda x: x.get('score', 0), reverse=True)
         filtered_cases = []
         for result in historical_cases_list:
             case_id = result.get('case_id', '')
@@ -734,10 +1237,22 @@ Generate search_query, keywords, and substance_name:
     except Exception as e:
         logger.error(f"Error searching Indian Kanoon with query '{search_query}': {e}")
     
-    logger.info(f"Found {len(historical_cases_list)} historical cases from Indian Kanoon")
+    local_count = sum(1 for case in historical_cases_list if case.get('case_id') in local_case_ids)
+    logger.info(f"Found {len(historical_cases_list)} historical cases "
+                f"({local_count} local, {len(historical_cases_list) - local_count} from Indian Kanoon)")
+    cache_stats = get_disk_cache().stats()
+    for namespace in (SEARCH_CACHE, DOCUMENT_CACHE, SUMMARY_CACHE, CHUNK_SUMMARY_CACHE):
+        if namespace in cache_stats:
+            logger.info(f"📊 Cache {namespace}: {cache_stats[namespace]}")
+    http_stats = get_http_client().stats().get("api.indiankanoon.org")
+    if http_stats:
+        logger.info(f"📊 Indian Kanoon HTTP: {http_stats}")
+    
+    logger.info(f"📊 Historical cases: {run_stats}")
     
     return {
-        "historical_cases": historical_cases_list
+        "historical_cases": historical_cases_list,
+        "historical_cases_stats": run_stats
     }
 
 # Example usage when run as script
@@ -4,6 +4,7 @@ from app.langgraph.state import WorkflowState
 from app.models.openai import llm_model
 from app.utils.retry import exponential_backoff_retry
 from app.utils.format_cases import format_historical_cases_for_prompt
+from app.utils.segmentation import get_node_content
 import logging
 
 logger = logging.getLogger(__name__)
@@ -173,7 +174,7 @@ def investigation_plan(state: WorkflowState) -> dict:
     if not state.get("pdf_content_in_english"):
         raise ValueError("pdf_content_in_english is required for FIR fact extraction")
     
-    pdf_content = state["pdf_content_in_english"]
+    pdf_content = get_node_content(state, "investigation_plan")
     logger.debug(f"FIR content length: {len(pdf_content)} characters")
     
     # Get historical cases if available
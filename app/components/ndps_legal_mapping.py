@@ -4,6 +4,7 @@ from app.models.openai import llm_model
 from typing import List
 from app.rag.query_all import query_ndps
 from app.utils.retry import exponential_backoff_retry
+from app.utils.segmentation import get_node_content
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,7 +45,7 @@ def ndps_legal_mapping(state: WorkflowState) -> dict:
     if not state.get("pdf_content_in_english"):
         raise ValueError("pdf_content_in_english is required for FIR fact extraction")
     
-    pdf_content = state["pdf_content_in_english"]
+    pdf_content = get_node_content(state, "ndps_legal_mapping")
     logger.debug(f"FIR content length: {len(pdf_content)} characters")
     
     # STEP 1: Extract top 5 legal points from FIR
@@ -1,5 +1,6 @@
 from langgraph.graph import MessagesState
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Annotated
+import operator
 
 class WorkflowState(MessagesState):
     pdf_path: str | None = None
@@ -7,8 +8,11 @@ class WorkflowState(MessagesState):
     pdf_filename: str | None = None
     pdf_content: str | None = None
     pdf_content_in_english: str | None = None
+    pdf_pages: List[dict] | None = None  # [{"page", "start", "end"}] offsets into pdf_content_in_english
+    fir_segments: List[dict] | None = None  # Labelled spans of the FIR bundle (see app/utils/segmentation.py)
     sections: List[str] | None = None  # Selected sections to process
     fir_facts: dict | None = None
+    fir_placeholders: Dict[str, str] | None = None  # Report template placeholders (see extract_fir_placeholders)
     ndps_sections_mapped: List[dict] | None = None
     bns_sections_mapped: List[dict] | None = None
     bnss_sections_mapped: List[dict] | None = None
@@ -21,7 +25,9 @@ class WorkflowState(MessagesState):
     donts: List[str] | None = None
     potential_prosecution_weaknesses: Dict[str, str] | None = None
     historical_cases: List[dict] | None = None
+    historical_cases_stats: dict | None = None  # Local cases; with an Indian Kanoon search also hits, prerank skips, cancellations, fetches avoided and made
     investigation_and_legal_timeline: Dict[str, str] | None = None
     defence_perspective_rebuttal: List[dict] | None = None
     summary_for_the_court: dict | None = None
-    chargesheet: dict | None = None
\ No newline at end of file
+    chargesheet: dict | None = None
+    node_overruns: Annotated[List[dict], operator.add]  # Nodes that ran out of their time budget
\ No newline at end of file
@@ -1,10 +1,14 @@
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
 from app.langgraph.state import WorkflowState
 from app.utils.read_pdf import read_pdf
+from app.utils.segmentation import segment_fir
+from app.translator import translate_to_english
+from app.utils.deadline import with_deadline
+from app.utils.store import create_checkpointer
 
 from app.components.fir_fact_extraction import extract_fir_fact
+from app.components.fir_placeholders import extract_fir_placeholders
 from app.components.ndps_legal_mapping import ndps_legal_mapping
 from app.components.bns_legal_mapping import bns_legal_mapping
 from app.components.bnss_legal_mapping import bnss_legal_mapping
@@ -20,7 +24,52 @@ from app.components.summary_for_the_court import generate_summary_for_the_court
 from app.components.chargesheet import generate_chargesheet
 
 
-checkpointer = MemorySaver()
+# Bump whenever prompts, models or graph wiring change what a workflow produces;
+# cached upload results (see /upload deduplication) are only reused within one version.
+PIPELINE_VERSION = "3"
+
+# Checkpointer follows STORE_BACKEND so any worker can continue a workflow
+checkpointer = create_checkpointer()
+
+# Output a node returns when it runs out of its time budget (see app/utils/deadline.py).
+# read_pdf has no fallback: without FIR text there is nothing for dependents to do.
+NODE_FALLBACKS = {
+    "translate_to_english": {},  # Keep the untranslated text
+    "segment_fir": {"fir_segments": []},
+    "extract_fir_fact": {"fir_facts": {}},
+    "extract_fir_placeholders": {},  # generate_document extracts them at download time
+    "ndps_legal_mapping": {"ndps_sections_mapped": []},
+    "bns_legal_mapping": {"bns_sections_mapped": []},
+    "bnss_legal_mapping": {"bnss_sections_mapped": []},
+    "bsa_legal_mapping": {"bsa_sections_mapped": []},
+    "investigation_plan": {"investigation_plan": []},
+    "investigation_and_legal_timeline": {"investigation_and_legal_timeline": None},
+    "historical_cases": {"historical_cases": []},
+    "generate_evidence_checklist": {"evidence_checklist": None},
+    "generate_dos_and_donts": {"dos": [], "donts": []},
+    "generate_potential_prosecution_weaknesses": {"potential_prosecution_weaknesses": {}},
+    "generate_defence_perspective_rebuttal": {"defence_perspective_rebuttal": []},
+    "generate_summary_for_the_court": {"summary_for_the_court": None},
+    "generate_chargesheet": {"chargesheet": None},
+}
+
+# Section keys selectable in the UI -> graph node that produces them
+SECTION_NODES = {
+    "ndps": "ndps_legal_mapping",
+    "bns": "bns_legal_mapping",
+    "bnss": "bnss_legal_mapping",
+    "bsa": "bsa_legal_mapping",
+    "timeline": "investigation_and_legal_timeline",
+    "historical_cases": "historical_cases",
+    "investigation_plan": "investigation_plan",
+    "evidence": "generate_evidence_checklist",
+    "dos_and_donts": "generate_dos_and_donts",
+    "weaknesses": "generate_potential_prosecution_weaknesses",
+    "defence_rebuttal": "generate_defence_perspective_rebuttal",
+    "court_summary": "generate_summary_for_the_court",
+    "chargesheet": "generate_chargesheet",
+}
+NODE_SECTIONS = {node: section for section, node in SECTION_NODES.items()}
 
 # Components that need historical cases
 COMPONENTS_NEEDING_HISTORICAL_CASES = [
@@ -121,27 +170,40 @@ def route_from_historical_cases(state: WorkflowState) -> list[str]:
 # Build graph
 workflow_graph = StateGraph(WorkflowState)
 
-# Add all nodes
-workflow_graph.add_node("read_pdf", read_pdf)
-workflow_graph.add_node("extract_fir_fact", extract_fir_fact)
-workflow_graph.add_node("ndps_legal_mapping", ndps_legal_mapping)
-workflow_graph.add_node("bns_legal_mapping", bns_legal_mapping)
-workflow_graph.add_node("bnss_legal_mapping", bnss_legal_mapping)
-workflow_graph.add_node("bsa_legal_mapping", bsa_legal_mapping)
-workflow_graph.add_node("investigation_plan", investigation_plan)
-workflow_graph.add_node("investigation_and_legal_timeline", investigation_and_legal_timeline)
-workflow_graph.add_node("historical_cases", historical_cases)
-workflow_graph.add_node("generate_evidence_checklist", generate_evidence_checklist)
-workflow_graph.add_node("generate_dos_and_donts", generate_dos_and_donts)
-workflow_graph.add_node("generate_potential_prosecution_weaknesses", generate_potential_prosecution_weaknesses)
-workflow_graph.add_node("generate_defence_perspective_rebuttal", generate_defence_perspective_rebuttal)
-workflow_graph.add_node("generate_summary_for_the_court", generate_summary_for_the_court)
-workflow_graph.add_node("generate_chargesheet", generate_chargesheet)
+
+def add_bounded_node(name: str, func):
+    """Add a node to the graph wrapped with its wall-clock budget and fallback output."""
+    workflow_graph.add_node(name, with_deadline(name, func, NODE_FALLBACKS.get(name)))
+
+
+# Add all nodes (each bounded by its wall-clock budget)
+add_bounded_node("read_pdf", read_pdf)
+add_bounded_node("translate_to_english", translate_to_english)
+add_bounded_node("segment_fir", segment_fir)
+add_bounded_node("extract_fir_fact", extract_fir_fact)
+add_bounded_node("extract_fir_placeholders", extract_fir_placeholders)
+add_bounded_node("ndps_legal_mapping", ndps_legal_mapping)
+add_bounded_node("bns_legal_mapping", bns_legal_mapping)
+add_bounded_node("bnss_legal_mapping", bnss_legal_mapping)
+add_bounded_node("bsa_legal_mapping", bsa_legal_mapping)
+add_bounded_node("investigation_plan", investigation_plan)
+add_bounded_node("investigation_and_legal_timeline", investigation_and_legal_timeline)
+add_bounded_node("historical_cases", historical_cases)
+add_bounded_node("generate_evidence_checklist", generate_evidence_checklist)
+add_bounded_node("generate_dos_and_donts", generate_dos_and_donts)
+add_bounded_node("generate_potential_prosecution_weaknesses", generate_potential_prosecution_weaknesses)
+add_bounded_node("generate_defence_perspective_rebuttal", generate_defence_perspective_rebuttal)
+add_bounded_node("generate_summary_for_the_court", generate_summary_for_the_court)
+add_bounded_node("generate_chargesheet", generate_chargesheet)
 
 # Permanent sequential path
 workflow_graph.add_edge(START, "read_pdf")
-workflow_graph.add_edge("read_pdf", "extract_fir_fact")
-# workflow_graph.add_edge("translate_to_english", "extract_fir_fact")
+workflow_graph.add_edge("read_pdf", "translate_to_english")
+workflow_graph.add_edge("translate_to_english", "segment_fir")
+workflow_graph.add_edge("segment_fir", "extract_fir_fact")
+# Report placeholders only read the FIR text (not fir_facts), so they run alongside fact extraction
+workflow_graph.add_edge("segment_fir", "extract_fir_placeholders")
+workflow_graph.add_edge("extract_fir_placeholders", END)
 
 # Route to ALL selected sections at once - they ALL run in PARALLEL
 workflow_graph.add_conditional_edges(
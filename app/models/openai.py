@@ -13,7 +13,16 @@ llm_model = ChatOpenAI(
     temperature=0.1,
     api_key=openai_api_key,
     max_tokens=None,
-    timeout=None,
+    timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "180")),  # Per-request cap; node budgets bound the total
+    max_retries=5
+)
+
+# Cheaper model for high-volume, narrow tasks (e.g. summarizing chunks of long judgments)
+small_llm_model = ChatOpenAI(
+    model=os.getenv("SMALL_LLM_MODEL", "gpt-5-nano"),
+    api_key=openai_api_key,
+    max_tokens=None,
+    timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "180")),
     max_retries=5
 )
 
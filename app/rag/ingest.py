@@ -0,0 +1,244 @@
+"""
+Grow the ndps_judgements index with judgments fetched from Indian Kanoon.
+
+Every relevant judgment the historical-cases node fetches and summarizes is
+queued here. A background worker chunks its key passages, embeds the chunks
+in batches and appends them to the index, so later precedent searches can be
+served locally (see search_local_judgements).
+
+The index is append-only, and positions in the FAISS index map to positions in
+chunks.json, which is the ID mapping. Writers in every process and uvicorn
+worker serialize on a lock file in NDPS_JUDGEMENTS_DIR (flock, or msvcrt on
+Windows); inside the lock the on-disk pair is re-read (never the possibly
+stale in-process cache), so no batch is lost and no process pairs its vectors
+with another's chunks.
+Each write builds a new index and chunk list next to the live ones. It then
+replaces chunks.json before the index file, so a reader in another process
+never sees vectors without chunks. Finally it swaps the in-process cache in
+one assignment. Readers are never blocked and always see a consistent
+(index, chunks) pair.
+
+The grown index is written to NDPS_JUDGEMENTS_DIR (under data/), seeded from the
+bundled index on first write; the bundled files are never modified.
+"""
+
+import os
+import json
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from app.models.openai import embedding_model
+from app.rag.query_all import NDPS_JUDGEMENTS_DIR, _index_paths, _load_index, _swap_index
+from app.utils.judgment_text import split_paragraphs, chunk_paragraphs, select_key_passages
+
+logger = logging.getLogger(__name__)
+
+INGEST_ENABLED = os.getenv("INGEST_JUDGEMENTS", "true").lower() in ("1", "true", "yes")
+INGEST_CHUNK_CHARS = 2000
+INGEST_TOKEN_BUDGET = 4000  # Key passages indexed per judgment
+EMBED_BATCH_SIZE = 64  # Texts per embeddings request
+INGEST_BATCH_DOCS = 16  # Judgments written per index swap
+
+ACT_CODE = "ndps_judgements"
+LOCK_FILE_NAME = ".ingest.lock"
+
+_write_lock = threading.Lock()
+_queue: "queue.Queue[dict]" = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def chunk_judgement(doc: dict) -> List[dict]:
+    """
+    Chunk entries (without vectors) for one judgment.
+
+    The first chunk is the case summary, which matches FIR queries best; the
+    rest are the judgment's key passages, packed into INGEST_CHUNK_CHARS chunks.
+
+    Args:
+        doc: {"doc_id", "text", "summary", "title", "case_number", "year", "court", "url"}
+    """
+    metadata = {
+        "doc_id": str(doc["doc_id"]),
+        "case_number": doc.get("case_number"),
+        "year": doc.get("year"),
+        "title": doc.get("title"),
+        "court": doc.get("court"),
+        "url": doc.get("url"),
+        "summary": doc.get("summary"),
+    }
+    texts = []
+    if doc.get("summary"):
+        texts.append(f"{doc.get('title') or ''}\n{doc['summary']}".strip())
+    passages = select_key_passages(doc.get("text") or "", INGEST_TOKEN_BUDGET)
+    texts.extend(chunk_paragraphs(split_paragraphs(passages, INGEST_CHUNK_CHARS), INGEST_CHUNK_CHARS))
+    return [{**metadata, "content": text, "start_pos": None, "end_pos": None} for text in texts if text.strip()]
+
+
+def _embed(texts: List[str]) -> np.ndarray:
+    vectors = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        vectors.extend(embedding_model.embed_documents(texts[start:start + EMBED_BATCH_SIZE]))
+    array = np.array(vectors, dtype="float32")
+    faiss.normalize_L2(array)
+    return array
+
+
+def _replace_file(path, write):
+    """Write a file through a temp file in the same directory and atomically move it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _lock_file(lock_file, locked: bool):
+    """Take (locked=True) or release an exclusive lock on an open file: flock on POSIX, msvcrt on Windows."""
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt  # Windows: lock the first byte of the file
+        lock_file.seek(0)
+        if not locked:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:  # LK_LOCK gives up after 10 attempts; keep waiting
+                continue
+    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if locked else fcntl.LOCK_UN)
+
+
+@contextmanager
+def _ingest_lock():
+    """Exclusive write access to the grown index, across threads and processes."""
+    NDPS_JUDGEMENTS_DIR.mkdir(parents=True, exist_ok=True)
+    with _write_lock, open(NDPS_JUDGEMENTS_DIR / LOCK_FILE_NAME, "a+") as lock_file:
+        _lock_file(lock_file, locked=True)
+        try:
+            yield
+        finally:
+            _lock_file(lock_file, locked=False)
+
+
+def _read_index_files():
+    """
+    The (index, chunks) pair currently on disk, read directly rather than through _load_index.
+
+    Call with the ingest lock held. A writer that died between replacing
+    chunks.json and the index leaves chunks for vectors that were never
+    written; those are dropped so positions keep matching.
+    """
+    chunks_path, index_path = _index_paths(ACT_CODE)
+    index = faiss.read_index(str(index_path))
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    if len(chunks) < index.ntotal:
+        raise ValueError(f"{chunks_path} has {len(chunks)} chunks for {index.ntotal} vectors")
+    return index, chunks[:index.ntotal]
+
+
+def ingest_judgements(docs: List[dict]) -> int:
+    """
+    Append judgments to the ndps_judgements index (skipping ones already indexed).
+
+    Args:
+        docs: See chunk_judgement
+
+    Returns:
+        Number of chunks added
+    """
+    with _ingest_lock():
+        index, chunks = _read_index_files()
+        indexed = {chunk.get("doc_id") for chunk in chunks if chunk.get("doc_id")}
+        new_chunks = []
+        for doc in docs:
+            doc_id = str(doc["doc_id"])
+            if doc_id in indexed:
+                continue
+            indexed.add(doc_id)
+            new_chunks.extend(chunk_judgement(doc))
+        if not new_chunks:
+            return 0
+
+        vectors = _embed([chunk["content"] for chunk in new_chunks])
+        if vectors.shape[1] != index.d:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {index.d}")
+        for offset, chunk in enumerate(new_chunks):
+            chunk["chunk_id"] = len(chunks) + offset  # Position in the index
+        new_index = faiss.clone_index(index)
+        new_index.add(vectors)
+        all_chunks = chunks + new_chunks
+
+        chunks_path = NDPS_JUDGEMENTS_DIR / "chunks.json"
+        index_path = NDPS_JUDGEMENTS_DIR / "legal_index.faiss"
+
+        def write_chunks(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(all_chunks, f, ensure_ascii=False)
+
+        # Chunks first: an index never points past the end of the chunk list on disk
+        _replace_file(chunks_path, write_chunks)
+        _replace_file(index_path, lambda tmp_path: faiss.write_index(new_index, tmp_path))
+        _swap_index(ACT_CODE, new_index, all_chunks, index_path.stat().st_mtime)
+
+    logger.info(f"📚 Indexed {len(docs)} judgements ({len(new_chunks)} chunks), index size {new_index.ntotal}")
+    return len(new_chunks)
+
+
+def _run_worker():
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < INGEST_BATCH_DOCS:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            ingest_judgements(batch)
+        except Exception as e:
+            logger.warning(f"Could not index {len(batch)} judgements: {e}")
+
+
+def enqueue_judgement(doc: Dict):
+    """
+    Queue a fetched judgment for background indexing (no-op when INGEST_JUDGEMENTS is off).
+
+    Args:
+        doc: See chunk_judgement
+    """
+    global _worker
+    if not INGEST_ENABLED:
+        return
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run_worker, name="judgement-ingest", daemon=True)
+            _worker.start()
+    _queue.put(doc)
+
+
+if __name__ == "__main__":
+    # Reset the grown index to the bundled one: python -m app.rag.ingest --reset
+    import sys
+
+    if "--reset" in sys.argv and NDPS_JUDGEMENTS_DIR.exists():
+        shutil.rmtree(NDPS_JUDGEMENTS_DIR)
+        print(f"Removed {NDPS_JUDGEMENTS_DIR}")
+    chunks_path, index_path = _index_paths(ACT_CODE)
+    index, chunks = _load_index(ACT_CODE)
+    print(f"{index_path}: {index.ntotal} vectors, {len(chunks)} chunks")
@@ -1,6 +1,8 @@
+import os
 import faiss
 import numpy as np
 import json
+import threading
 from typing import List, Dict
 from pathlib import Path
 from app.models.openai import embedding_model
@@ -8,61 +10,54 @@ from app.models.openai import embedding_model
 # Base path for RAG data
 RAG_BASE_PATH = Path(__file__).parent
 
-# Cache for loaded indices and chunks
+# The judgements index grows at runtime (see app/rag/ingest.py); the grown copy lives
+# here and is preferred over the bundled one once it exists
+NDPS_JUDGEMENTS_DIR = Path(os.getenv("NDPS_JUDGEMENTS_DIR", os.path.join("data", "rag", "ndps_judgements")))
+
+# act_code -> (index, chunks, index file mtime). Index and chunks are stored as one
+# tuple so a reader never pairs an index with the chunk list of another version.
 _index_cache = {}
-_chunks_cache = {}
+_load_lock = threading.Lock()
 
 
-def _load_index(act_code: str):
-    """Load index and chunks for an act (cached)"""
-    if act_code in _index_cache:
-        return _index_cache[act_code], _chunks_cache[act_code]
-    
-    configs = {
-        'bns': {
-            'chunks_path': RAG_BASE_PATH / 'bns' / 'chunks.json',
-            'index_path': RAG_BASE_PATH / 'bns' / 'legal_index.faiss'
-        },
-        'bnss': {
-            'chunks_path': RAG_BASE_PATH / 'bnss' / 'chunks.json',
-            'index_path': RAG_BASE_PATH / 'bnss' / 'legal_index.faiss'
-        },
-        'bsa': {
-            'chunks_path': RAG_BASE_PATH / 'bsa' / 'chunks.json',
-            'index_path': RAG_BASE_PATH / 'bsa' / 'legal_index.faiss'
-        },
-        'ndps': {
-            'chunks_path': RAG_BASE_PATH / 'ndps' / 'chunks.json',
-            'index_path': RAG_BASE_PATH / 'ndps' / 'legal_index.faiss'
-        },
-        'forensic': {
-            'chunks_path': RAG_BASE_PATH / 'forensic' / 'chunks.json',
-            'index_path': RAG_BASE_PATH / 'forensic' / 'legal_index.faiss'
-        },
-        'ndps_judgements': {
-            'chunks_path': RAG_BASE_PATH / 'ndps_judgements' / 'chunks.json',
-            'index_path': RAG_BASE_PATH / 'ndps_judgements' / 'legal_index.faiss'
-        }
-    }
-    
-    if act_code not in configs:
+def _index_paths(act_code: str):
+    """(chunks_path, index_path) for an act"""
+    if act_code not in ('bns', 'bnss', 'bsa', 'ndps', 'forensic', 'ndps_judgements'):
         raise ValueError(f"Unknown act code: {act_code}")
-    
-    config = configs[act_code]
-    
-    if not config['index_path'].exists() or not config['chunks_path'].exists():
+    directory = RAG_BASE_PATH / act_code
+    if act_code == 'ndps_judgements' and (NDPS_JUDGEMENTS_DIR / 'legal_index.faiss').exists():
+        directory = NDPS_JUDGEMENTS_DIR
+    return directory / 'chunks.json', directory / 'legal_index.faiss'
+
+
+def _load_index(act_code: str):
+    """Load index and chunks for an act (cached; reloaded when the index file changes)"""
+    chunks_path, index_path = _index_paths(act_code)
+    if not index_path.exists() or not chunks_path.exists():
         raise FileNotFoundError(f"Index files not found for {act_code}")
     
-    index = faiss.read_index(str(config['index_path']))
-    with open(config['chunks_path'], 'r', encoding='utf-8') as f:
-        chunks = json.load(f)
+    mtime = index_path.stat().st_mtime
+    cached = _index_cache.get(act_code)
+    if cached is not None and cached[2] >= mtime:
+        return cached[0], cached[1]
     
-    _index_cache[act_code] = index
-    _chunks_cache[act_code] = chunks
+    with _load_lock:
+        cached = _index_cache.get(act_code)
+        if cached is not None and cached[2] >= mtime:
+            return cached[0], cached[1]
+        index = faiss.read_index(str(index_path))
+        with open(chunks_path, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        _index_cache[act_code] = (index, chunks, mtime)
     
     return index, chunks
 
 
+def _swap_index(act_code: str, index, chunks, mtime: float):
+    """Replace the cached index and chunks in one assignment; readers keep the version they hold"""
+    _index_cache[act_code] = (index, chunks, mtime)
+
+
 def query_bns(query: str, k: int = 5) -> List[Dict]:
     """
     Query Bharatiya Nyaya Sanhita (BNS)
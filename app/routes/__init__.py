@@ -7,6 +7,7 @@ from .upload import router as upload_router
 from .results import router as results_router
 from .document import router as document_router
 from .session import router as session_router
+from .batch import router as batch_router
 
 # Create main router
 api_router = APIRouter()
@@ -15,4 +16,5 @@ api_router = APIRouter()
 api_router.include_router(session_router, tags=["session"])
 api_router.include_router(upload_router, tags=["upload"])
 api_router.include_router(results_router, tags=["results"])
-api_router.include_router(document_router, tags=["document"])
\ No newline at end of file
+api_router.include_router(document_router, tags=["document"])
+api_router.include_router(batch_router, tags=["batch"])
\ No newline at end of file
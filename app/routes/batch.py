@@ -0,0 +1,322 @@
+"""
+Batch route handlers for processing many FIR PDFs in one request.
+"""
+
+import json
+import asyncio
+import tempfile
+import time
+import uuid
+import logging
+import zipfile
+from pathlib import PurePosixPath
+from typing import List, Optional
+
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.utils.job_queue import PRIORITY_LOW
+from app.utils.events import STATUS
+from app.utils.blob_store import save_upload, save_stream, UploadTooLarge
+from app.utils.render_pool import RenderPoolFull
+from .config import (results_store, job_store, job_queue, job_events, batch_store, BATCH_MAX_FILES,
+                     BATCH_MAX_TOTAL_BYTES, MAX_UPLOAD_BYTES)
+from .upload import process_workflow_background
+from .document import render_document
+from .utils import format_state_for_display
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Batch ZIPs are built in memory up to this size, then spill to a temporary file
+BATCH_ZIP_SPOOL_BYTES = 16 * 1024 * 1024
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+def _unpack_zip(filename: str, fileobj, budget: int) -> List[tuple]:
+    """
+    Store the PDF entries of a ZIP as blobs (in archive order), checking sizes before reading.
+
+    Declared entry sizes are checked against MAX_UPLOAD_BYTES and the remaining
+    batch budget before anything is decompressed; save_stream then enforces the
+    limit on the bytes actually inflated, so a lying header cannot get past it.
+
+    Returns:
+        [(filename, blob path, size)]
+    """
+    try:
+        with zipfile.ZipFile(fileobj) as archive:
+            entries = [
+                entry for entry in archive.infolist()
+                if not entry.is_dir()
+                and PurePosixPath(entry.filename).name.lower().endswith(".pdf")
+                and not PurePosixPath(entry.filename).name.startswith(".")
+            ]
+            if len(entries) > BATCH_MAX_FILES:
+                raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_MAX_FILES} FIRs")
+            for entry in entries:
+                if entry.file_size > MAX_UPLOAD_BYTES:
+                    raise _too_large(f"{entry.filename} in {filename} exceeds the "
+                                     f"{MAX_UPLOAD_BYTES // (1024 * 1024)}MB per-FIR limit")
+            if sum(entry.file_size for entry in entries) > budget:
+                raise _too_large(f"{filename} unpacks to more than the "
+                                 f"{BATCH_MAX_TOTAL_BYTES // (1024 * 1024)}MB batch limit")
+
+            pdfs = []
+            for entry in entries:
+                with archive.open(entry) as stream:
+                    pdf_path, _, size = save_stream(stream, min(MAX_UPLOAD_BYTES, budget))
+                budget -= size
+                pdfs.append((PurePosixPath(entry.filename).name, pdf_path, size))
+            return pdfs
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail=f"Invalid ZIP archive: {filename}")
+    except UploadTooLarge:
+        raise _too_large(f"{filename} unpacks to more than its declared size or the batch limit")
+
+
+async def _collect_pdfs(files: List[UploadFile]) -> List[tuple]:
+    """
+    Store uploaded FIRs as blobs and return (filename, blob path) pairs.
+
+    Plain PDFs are streamed to the blob store; ZIP archives (already spooled to
+    disk by the multipart parser) are unpacked, PDF entries only, in archive
+    order. Nothing is read into memory whole, and the batch is rejected with
+    413 as soon as a FIR or the batch total goes over its limit.
+    """
+    pdfs = []
+    budget = BATCH_MAX_TOTAL_BYTES
+    for upload in files:
+        filename = upload.filename or "document.pdf"
+        try:
+            if filename.lower().endswith(".zip"):
+                if (upload.size or 0) > budget:
+                    raise _too_large(f"{filename} exceeds the {BATCH_MAX_TOTAL_BYTES // (1024 * 1024)}MB batch limit")
+                unpacked = await asyncio.to_thread(_unpack_zip, filename, upload.file, budget)
+                budget -= sum(size for _, _, size in unpacked)
+                pdfs.extend((name, pdf_path) for name, pdf_path, _ in unpacked)
+            elif filename.lower().endswith(".pdf"):
+                try:
+                    pdf_path, _, size = await save_upload(upload, min(MAX_UPLOAD_BYTES, budget))
+                except UploadTooLarge:
+                    raise _too_large(f"{filename} exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)}MB per-FIR "
+                                     f"or {BATCH_MAX_TOTAL_BYTES // (1024 * 1024)}MB batch limit")
+                budget -= size
+                pdfs.append((filename, pdf_path))
+            else:
+                raise HTTPException(status_code=400, detail=f"Only PDF or ZIP files allowed: {filename}")
+        finally:
+            await upload.close()
+        if len(pdfs) > BATCH_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_MAX_FILES} FIRs")
+    return pdfs
+
+
+@router.post("/api/batch")
+async def create_batch(
+    files: List[UploadFile] = File(...),
+    sections: Optional[str] = Form(None)
+):
+    """
+    Queue a batch of FIRs (several PDFs and/or a ZIP of PDFs) for analysis.
+
+    Every FIR becomes its own workflow on the shared job queue. The batch is
+    queued as a single low-priority session, so it runs with bounded
+    parallelism and cannot starve interactive uploads. All FIRs share the
+    process-wide LLM/embedding clients, retrieval indices and caches.
+
+    Returns:
+        batch_id for polling /api/batch/{batch_id}
+    """
+    try:
+        sections_list = json.loads(sections) if sections else []
+    except json.JSONDecodeError:
+        sections_list = []
+    if not sections_list:
+        raise HTTPException(status_code=400, detail="At least one section must be selected for analysis")
+
+    pdfs = await _collect_pdfs(files)
+    if not pdfs:
+        raise HTTPException(status_code=400, detail="No PDF files found in upload")
+
+    batch_id = str(uuid.uuid4())
+    items = []
+    for index, (filename, pdf_path) in enumerate(pdfs):
+        job_id = str(uuid.uuid4())
+        workflow_id = f"batch-{batch_id}-{index}"
+        now = time.time()
+        job_store[job_id] = {
+            "status": "queued",
+            "workflow_id": workflow_id,
+            "progress": 0,
+            "error": None,
+            "overruns": [],
+            "created_at": now,
+            "updated_at": now
+        }
+        job_events.publish(job_id, STATUS, status="queued", progress=0)
+        job_queue.submit(
+            job_id,
+            f"batch:{batch_id}",
+            process_workflow_background,
+            job_id,
+            workflow_id,
+            pdf_path,
+            filename,
+            sections_list,
+            True,
+            priority=PRIORITY_LOW
+        )
+        items.append({"index": index, "filename": filename, "job_id": job_id, "workflow_id": workflow_id})
+
+    batch_store[batch_id] = {
+        "batch_id": batch_id,
+        "sections": sections_list,
+        "items": items,
+        "created_at": time.time()
+    }
+    logger.info(f"📦 Batch {batch_id} queued with {len(items)} FIRs")
+
+    return JSONResponse({
+        "success": True,
+        "batch_id": batch_id,
+        "count": len(items),
+        "status_url": f"/api/batch/{batch_id}",
+        "download_url": f"/api/batch/{batch_id}/download"
+    })
+
+
+def _batch_status(batch: dict) -> dict:
+    """Aggregate per-FIR job status into batch-level progress."""
+    items = []
+    counts = {"queued": 0, "processing": 0, "completed": 0, "failed": 0}
+    total_progress = 0
+    for item in batch["items"]:
+        job = job_store.get(item["job_id"]) or {"status": "failed", "progress": 0, "error": "Job expired"}
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+        progress = 100 if job["status"] in ("completed", "failed") else job.get("progress", 0)
+        total_progress += progress
+        items.append({
+            **item,
+            "status": job["status"],
+            "progress": progress,
+            "error": job.get("error"),
+            "overruns": job.get("overruns") or []
+        })
+    total = len(batch["items"])
+    finished = counts["completed"] + counts["failed"]
+    return {
+        "batch_id": batch["batch_id"],
+        "status": "completed" if finished == total else "processing",
+        "progress": int(total_progress / max(total, 1)),
+        "total": total,
+        "counts": counts,
+        "sections": batch["sections"],
+        "created_at": batch["created_at"],
+        "items": items
+    }
+
+
+@router.get("/api/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get batch-level progress plus per-FIR status."""
+    batch = batch_store.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return JSONResponse(_batch_status(batch))
+
+
+def _write_batch_zip(entries: List[tuple], status: dict) -> tempfile.SpooledTemporaryFile:
+    """
+    Write the batch ZIP to a temporary file (spilled to disk past BATCH_ZIP_SPOOL_BYTES).
+
+    Args:
+        entries: [(item, result, document bytes or None)] for completed FIRs
+        status: Batch status, written as batch_summary.json
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=BATCH_ZIP_SPOOL_BYTES)
+    try:
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            for item, result, document_bytes in entries:
+                stem = f"{item['index']:03d}_{PurePosixPath(item['filename']).stem}"
+                formatted = jsonable_encoder(format_state_for_display(result))
+                archive.writestr(f"{stem}.json", json.dumps(formatted, indent=2, ensure_ascii=False))
+                if document_bytes is not None:
+                    archive.writestr(f"{stem}.docx", document_bytes)
+            archive.writestr("batch_summary.json", json.dumps(status, indent=2, ensure_ascii=False, default=str))
+    except BaseException:
+        output.close()
+        raise
+    return output
+
+
+def _iter_file(output, chunk_size: int = 1024 * 1024):
+    """Stream a temporary file from the start and close it when done (or when the client goes away)."""
+    try:
+        output.seek(0)
+        while chunk := output.read(chunk_size):
+            yield chunk
+    finally:
+        output.close()
+
+
+@router.get("/api/batch/{batch_id}/download")
+async def download_batch(batch_id: str, partial: bool = False):
+    """
+    Download a ZIP with a JSON and a DOCX report per completed FIR plus a batch summary.
+
+    Reports are rendered on the shared render pool (most are already pre-rendered);
+    when the pool is full or renders are still running after RENDER_TIMEOUT_SECONDS,
+    the request gets 503 with Retry-After, as /api/document does, and the renders
+    started meanwhile are cached for the retry. The ZIP is built in a temporary file
+    and streamed.
+
+    Returns 409 while FIRs are still running unless `partial=true`.
+    """
+    batch = batch_store.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    status = _batch_status(batch)
+    if status["status"] != "completed" and not partial:
+        raise HTTPException(status_code=409, detail="Batch still processing; pass partial=true for finished FIRs only")
+
+    completed = []
+    for item in status["items"]:
+        if item["status"] != "completed":
+            continue
+        result = results_store.get(item["workflow_id"])
+        if result is not None:
+            completed.append((item, result))
+
+    documents = await asyncio.gather(*(render_document(item["workflow_id"], result) for item, result in completed),
+                                     return_exceptions=True)
+    pending = sum(isinstance(document, (RenderPoolFull, asyncio.TimeoutError)) for document in documents)
+    if pending:
+        logger.warning(f"⏱️ Batch {batch_id}: {pending} of {len(completed)} documents not ready")
+        raise HTTPException(status_code=503, detail=f"{pending} documents are still being generated, please retry shortly",
+                            headers={"Retry-After": "10"})
+
+    entries = []
+    for (item, result), document in zip(completed, documents):
+        if isinstance(document, BaseException):
+            logger.error(f"Error generating document for {item['workflow_id']}: {document}",
+                         exc_info=(type(document), document, document.__traceback__))
+            item["error"] = f"Document generation failed: {document}"
+            document = None
+        entries.append((item, result, document))
+
+    output = await asyncio.to_thread(_write_batch_zip, entries, status)
+    size = output.tell()
+    return StreamingResponse(
+        _iter_file(output),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="FIR_Batch_{batch_id}.zip"',
+            "Content-Length": str(size),
+        }
+    )
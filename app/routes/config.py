@@ -2,8 +2,14 @@
 Configuration and shared state for routes.
 """
 
+import os
 from pathlib import Path
 
+from app.utils.job_queue import JobQueue
+from app.utils.events import JobEvents
+from app.utils.render_pool import RenderPool
+from app.utils.store import KeyValueStore, create_store_backend
+
 # Directory paths (for templates and static only; no file saving)
 TEMPLATES_DIR = Path("templates")
 STATIC_DIR = Path("static")
@@ -11,22 +17,70 @@ STATIC_DIR = Path("static")
 TEMPLATES_DIR.mkdir(exist_ok=True)
 STATIC_DIR.mkdir(exist_ok=True)
 
-# In-memory storage for results (display only; no persistence to disk)
-results_store = {}
+# Shared store backend (STORE_BACKEND=memory|sqlite|redis, see app/utils/store.py).
+# With sqlite or redis every uvicorn worker/host sees the same jobs and results.
+# Entries expire after STORE_TTL_SECONDS (default 7 days).
+STORE_TTL_SECONDS = int(os.getenv("STORE_TTL_SECONDS", str(7 * 24 * 3600)))
+store_backend = create_store_backend()
+
+# Workflow results (display only)
+results_store = KeyValueStore(store_backend, "results", ttl=STORE_TTL_SECONDS)
 
-# Store PDF bytes separately for workflow continuation
-pdf_store = {}
+# Store PDF bytes separately for workflow continuation (uploads themselves live in app/utils/blob_store.py)
+pdf_store = KeyValueStore(store_backend, "pdf", ttl=STORE_TTL_SECONDS)
 
 # Session management: maps session_id to session data
-session_store = {}
+session_store = KeyValueStore(store_backend, "session", ttl=STORE_TTL_SECONDS)
+
+# Upload deduplication: "{pdf sha256}:{sorted sections}:{pipeline version}" -> {"job_id", "workflow_id", "created_at"}
+dedup_store = KeyValueStore(store_backend, "dedup", ttl=STORE_TTL_SECONDS)
+
+# Rendered DOCX reports: workflow_id -> {"result_version", "etag", "content"}; stale once the result version moves on
+document_store = KeyValueStore(store_backend, "document", ttl=STORE_TTL_SECONDS)
+
+# Batch uploads: batch_id -> {"batch_id", "sections", "items": [{"index", "filename", "job_id", "workflow_id"}], "created_at"}
+batch_store = KeyValueStore(store_backend, "batch", ttl=STORE_TTL_SECONDS)
+
+# Largest PDF accepted by /upload; larger uploads are rejected with 413 while streaming
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+# Maximum number of FIRs accepted in one batch upload
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+
+# Largest total size of one batch: uploaded ZIPs as sent, and all FIRs once uncompressed.
+# Every single FIR (uploaded or unpacked) is also held to MAX_UPLOAD_BYTES.
+BATCH_MAX_TOTAL_BYTES = int(os.getenv("BATCH_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
 
 # Job storage for asynchronous processing
 # Structure: job_id -> {
-#   "status": "processing" | "completed" | "failed",
+#   "status": "queued" | "processing" | "completed" | "failed",
 #   "workflow_id": str | None,
 #   "progress": int (0-100),
 #   "error": str | None,
+#   "overruns": list of {"node", "budget_seconds", "elapsed_seconds", "partial"},
+#   "dedup_key": str | None (dedup_store entry owned by this job),
 #   "created_at": timestamp,
 #   "updated_at": timestamp
 # }
-job_store = {}
\ No newline at end of file
+# Values are copies: write changes back with job_store.update(job_id, **fields)
+job_store = KeyValueStore(store_backend, "job", ttl=STORE_TTL_SECONDS)
+
+# Number of workflows allowed to run at once (the rest wait in job_queue)
+WORKFLOW_WORKERS = int(os.getenv("WORKFLOW_WORKERS", "2"))
+
+# Dedicated worker pool for workflow jobs (priority + per-session fair FIFO)
+job_queue = JobQueue(worker_count=WORKFLOW_WORKERS, name="workflow")
+
+# Progress events per job, published by workflow workers and streamed over SSE
+job_events = JobEvents(store_backend, ttl=STORE_TTL_SECONDS)
+
+# Report rendering runs on its own bounded pool, never on the event loop (see app/utils/render_pool.py)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", "16"))
+render_pool = RenderPool(worker_count=RENDER_WORKERS, max_pending=RENDER_MAX_PENDING, name="render")
+
+# Seconds a download waits for its report before answering 503 (the render carries on and is cached)
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+
+# Render the report in the background as soon as a workflow completes, so downloads are served from cache
+PRERENDER_DOCUMENTS = os.getenv("PRERENDER_DOCUMENTS", "true").lower() in ("1", "true", "yes")
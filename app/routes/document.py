@@ -1,49 +1,152 @@
 """
 Document generation route handlers.
+
+Rendered reports are cached in document_store per workflow and reused while the
+result version is unchanged; adding sections publishes a new result version,
+so the next download renders again. Downloads carry an ETag, and a request
+whose If-None-Match still matches gets 304 without any rendering.
+
+Rendering runs on render_pool, never on the event loop. Completed workflows are
+pre-rendered (PRERENDER_DOCUMENTS), so most downloads are cache hits.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Header
 from fastapi.responses import Response
-from .config import results_store
-from ..utils.document_generator import generate_document
+from app.utils.render_pool import RenderPoolFull
+from .config import results_store, document_store, render_pool, RENDER_TIMEOUT_SECONDS, PRERENDER_DOCUMENTS
+from ..utils.document_generator import generate_document, DOCUMENT_VERSION
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def document_etag(workflow_id: str, workflow_state: Dict[str, Any]) -> str:
+    """ETag for a workflow's report: changes whenever the result version or the report layout does."""
+    return f'"{workflow_id}-{workflow_state.get("result_version", 0)}-{DOCUMENT_VERSION}"'
+
+
+def cached_document(workflow_id: str, etag: str) -> Optional[bytes]:
+    """Cached report bytes for a workflow, or None when missing or rendered for another ETag."""
+    cached = document_store.get(workflow_id)
+    if cached and cached.get("etag") == etag:
+        logger.info(f"📄 Serving cached document for workflow {workflow_id}")
+        return cached["content"]
+    return None
+
+
+def get_document_bytes(workflow_id: str, workflow_state: Dict[str, Any]) -> Tuple[bytes, str]:
+    """
+    Rendered report for a workflow result, from document_store when still current.
+
+    Args:
+        workflow_id: Unique workflow identifier
+        workflow_state: Result from results_store
+
+    Returns:
+        (document bytes, ETag)
+    """
+    etag = document_etag(workflow_id, workflow_state)
+    cached = cached_document(workflow_id, etag)
+    if cached is not None:
+        return cached, etag
+
+    document_bytes = generate_document(workflow_state)
+    # One entry per workflow: a newer result version simply overwrites the stale one
+    document_store[workflow_id] = {
+        "result_version": workflow_state.get("result_version", 0),
+        "etag": etag,
+        "content": document_bytes,
+    }
+    return document_bytes, etag
+
+
+def prerender_document(workflow_id: str, workflow_state: Dict[str, Any]):
+    """Render a completed workflow's report in the background (no-op when PRERENDER_DOCUMENTS is off)."""
+    if not PRERENDER_DOCUMENTS:
+        return
+    try:
+        render_pool.submit(f"{workflow_id}:{document_etag(workflow_id, workflow_state)}",
+                           get_document_bytes, workflow_id, workflow_state)
+    except RenderPoolFull:
+        logger.info(f"Render pool busy; workflow {workflow_id} will be rendered on download")
+
+
+async def render_document(workflow_id: str, workflow_state: Dict[str, Any]) -> bytes:
+    """
+    Report bytes for async routes: from the cache, or rendered on render_pool
+    (joining a render of the same report already in flight).
+
+    Raises:
+        RenderPoolFull: If the pool already has RENDER_MAX_PENDING renders
+        asyncio.TimeoutError: If the render outlasts RENDER_TIMEOUT_SECONDS (it keeps running and is cached)
+    """
+    etag = document_etag(workflow_id, workflow_state)
+    document_bytes = cached_document(workflow_id, etag)
+    if document_bytes is None:
+        document_bytes, _ = await render_pool.run(f"{workflow_id}:{etag}", get_document_bytes, workflow_id,
+                                                  workflow_state, timeout=RENDER_TIMEOUT_SECONDS)
+    return document_bytes
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
 
 @router.get("/api/document/{workflow_id}")
-async def generate_document_endpoint(workflow_id: str):
+async def generate_document_endpoint(workflow_id: str, if_none_match: Optional[str] = Header(None)):
     """
     Generate and download a Word document for the workflow.
-    
+
     Args:
         workflow_id: Unique workflow identifier
-        
+        if_none_match: ETag of a previously downloaded copy
+
     Returns:
-        Word document file download
-        
+        Word document file download, or 304 when the client's copy is current
+
     Raises:
-        HTTPException: If workflow not found or generation fails
+        HTTPException: 404 if workflow not found, 503 if the render pool is full or the
+            render outlasts RENDER_TIMEOUT_SECONDS, 500 if generation fails
     """
-    if workflow_id not in results_store:
+    workflow_state = results_store.get(workflow_id)
+    if workflow_state is None:
         raise HTTPException(status_code=404, detail="Workflow result not found")
-    
+
+    # Revalidate on every download; a new result version changes the ETag
+    etag = document_etag(workflow_id, workflow_state)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    # Served straight from the cache when possible; otherwise render on the pool (joining a pre-render in flight)
     try:
-        workflow_state = results_store[workflow_id]
-        document_bytes = generate_document(workflow_state)
-        
+        document_bytes = await render_document(workflow_id, workflow_state)
+
         # Generate filename
         filename = f"FIR_Report_{workflow_id}.docx"
-        
+
         return Response(
             content=document_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            media_type=DOCX_MEDIA_TYPE,
             headers={
-                "Content-Disposition": f'attachment; filename="{filename}"'
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                **cache_headers,
             }
         )
+    except (RenderPoolFull, asyncio.TimeoutError) as e:
+        logger.warning(f"⏱️ Document for workflow {workflow_id} not ready: {str(e) or 'render timed out'}")
+        raise HTTPException(status_code=503, detail="Document is still being generated, please retry shortly",
+                            headers={"Retry-After": "10"})
     except Exception as e:
         logger.error(f"Error generating document for workflow {workflow_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating document: {str(e)}")
@@ -14,9 +14,10 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 
 def load_result(workflow_id: str) -> dict:
-    """Load result from in-memory store only (no file I/O)."""
-    if workflow_id in results_store:
-        return results_store[workflow_id]
+    """Load result from the shared results store."""
+    result = results_store.get(workflow_id)
+    if result is not None:
+        return result
     raise HTTPException(status_code=404, detail="Workflow result not found")
 
 
@@ -28,6 +29,10 @@ async def get_results_api(workflow_id: str):
     """
     Get results as JSON (API endpoint).
     
+    While a workflow is running this returns the sections finished so far;
+    `section_status`, `result_version` and `complete` tell the UI what is
+    still pending.
+    
     Args:
         workflow_id: Unique workflow identifier
         
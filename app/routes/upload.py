@@ -7,38 +7,148 @@ import logging
 import uuid
 import time
 import threading
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Request, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional
 
-from app.langgraph.workflow import graph
-from .config import results_store, job_store
+from app.langgraph.workflow import graph, NODE_SECTIONS, PIPELINE_VERSION
+from app.utils.job_queue import PRIORITY_HIGH, PRIORITY_NORMAL
+from app.utils.events import NODE_STARTED, NODE_COMPLETED, STATUS
+from app.utils.blob_store import save_upload, sweep_blobs, UploadTooLarge
+from .config import results_store, job_store, job_queue, job_events, dedup_store, MAX_UPLOAD_BYTES, STORE_TTL_SECONDS
 from .session import get_session_id
+from .document import prerender_document
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Section status values in partial results
+SECTION_PENDING = "pending"
+SECTION_RUNNING = "running"
+SECTION_COMPLETED = "completed"
+SECTION_TIMED_OUT = "timed_out"
+SECTION_FAILED = "failed"
+
+
+def _start_partial_result(workflow_id: str, sections_list: list) -> dict:
+    """
+    Create (or extend, when continuing a workflow) the partial result for a run.
+    
+    Sections already completed by an earlier run keep their status; newly
+    requested ones start as pending.
+    """
+    partial = results_store.get(workflow_id) or {"workflow_id": workflow_id}
+    section_status = dict(partial.get("section_status") or {})
+    for section in sections_list:
+        if section_status.get(section) not in (SECTION_COMPLETED, SECTION_TIMED_OUT):
+            section_status[section] = SECTION_PENDING
+    partial["section_status"] = section_status
+    partial["result_complete"] = False
+    return _publish_partial_result(workflow_id, partial)
+
+
+def _publish_partial_result(workflow_id: str, partial: dict) -> dict:
+    """Bump the result version and write the partial result to the results store."""
+    partial["result_version"] = partial.get("result_version", 0) + 1
+    results_store[workflow_id] = partial
+    return partial
+
+
+def _merge_node_output(partial: dict, node_name: str, node_output) -> dict:
+    """Merge one node's state update into the partial result and mark its section done."""
+    if isinstance(node_output, dict):
+        for key, value in node_output.items():
+            if key == "pdf_bytes":
+                continue
+            if key == "node_overruns":
+                partial["node_overruns"] = (partial.get("node_overruns") or []) + value
+            else:
+                partial[key] = value
+    section = NODE_SECTIONS.get(node_name)
+    if section and section in partial["section_status"]:
+        timed_out = isinstance(node_output, dict) and bool(node_output.get("node_overruns"))
+        partial["section_status"][section] = SECTION_TIMED_OUT if timed_out else SECTION_COMPLETED
+    return partial
+
+
+def _dedup_key(pdf_hash: str, sections_list: list) -> str:
+    """Result index key: same PDF bytes, same sections, same pipeline version."""
+    return f"{pdf_hash}:{','.join(sorted(set(sections_list)))}:{PIPELINE_VERSION}"
+
+
+def _claim_upload(dedup_key: str, job_id: str, workflow_id: str) -> Optional[dict]:
+    """
+    Claim the dedup entry for an upload (single-flight across concurrent requests).
+    
+    The job record for job_id must already exist, so a concurrent request never
+    mistakes a fresh claim for a stale one.
+    
+    Returns:
+        None when this request owns the work, otherwise the existing
+        {"job_id", "workflow_id", "created_at"} entry to reuse
+    """
+    candidate = {"job_id": job_id, "workflow_id": workflow_id, "created_at": time.time()}
+    for _ in range(2):
+        entry = dedup_store.setdefault(dedup_key, candidate)
+        if entry["job_id"] == job_id:
+            return None
+        existing_job = job_store.get(entry["job_id"])
+        reusable = existing_job is not None and (
+            existing_job["status"] in ("queued", "processing")
+            or (existing_job["status"] == "completed" and entry["workflow_id"] in results_store)
+        )
+        if reusable:
+            return entry
+        # Failed or expired: drop the stale entry and claim again
+        if (dedup_store.get(dedup_key) or {}).get("job_id") == entry["job_id"]:
+            dedup_store.pop(dedup_key)
+    return None
+
+
+def _copy_workflow(source_id: str, target_id: str) -> Optional[dict]:
+    """
+    Seed a workflow with a copy of another workflow's finished state.
+
+    The checkpoint and the published result are both copied, so the target
+    session continues its own thread: sections it adds later never touch the
+    source workflow, its results or its cached report.
+
+    Returns:
+        The target's published result, or None when the source has no checkpoint or result
+    """
+    source_state = graph.get_state({"configurable": {"thread_id": source_id}})
+    source_result = results_store.get(source_id)
+    if not source_state or not source_state.values or source_result is None:
+        return None
+    graph.update_state({"configurable": {"thread_id": target_id}}, dict(source_state.values))
+    result = dict(source_result)
+    result["workflow_id"] = target_id
+    result["result_version"] = 0
+    return _publish_partial_result(target_id, result)
+
 
 def process_workflow_background(
     job_id: str,
     workflow_id: str,
-    file_bytes: Optional[bytes],
+    pdf_path: Optional[str],
     filename: Optional[str],
     sections_list: list,
     is_new_workflow: bool
 ):
     """
-    Background task to process the workflow asynchronously.
+    Process the workflow asynchronously on a job_queue worker.
     This runs independently of the HTTP request.
+    
+    The PDF is passed as a path into the blob store, never as bytes.
     """
     import sys
     
+    partial = None
     try:
         # Update job status
-        job_store[job_id]["status"] = "processing"
-        job_store[job_id]["progress"] = 5
-        job_store[job_id]["updated_at"] = time.time()
+        job_store.update(job_id, status="processing", progress=5, updated_at=time.time())
+        job_events.publish(job_id, STATUS, status="processing", progress=5)
         
         config = {"configurable": {"thread_id": workflow_id}}
         
@@ -48,13 +158,16 @@ def process_workflow_background(
             prior_state = graph.get_state(config)
             if prior_state and prior_state.values:
                 graph_state = dict(prior_state.values)
+                # The input passes through the state reducers: re-sending the earlier
+                # overruns would append them to the checkpoint's copy again
+                graph_state.pop("node_overruns", None)
                 logger.info(f"✅ Loaded prior state with keys: {list(graph_state.keys())}")
-                job_store[job_id]["progress"] = 10
+                job_store.update(job_id, progress=10)
         
         # Set up graph state
         if is_new_workflow:
-            if file_bytes:
-                graph_state["pdf_bytes"] = file_bytes
+            if pdf_path:
+                graph_state["pdf_path"] = pdf_path
                 graph_state["pdf_filename"] = filename or "document.pdf"
             graph_state["sections"] = sections_list
         else:
@@ -72,24 +185,37 @@ def process_workflow_background(
             raise ValueError("No sections selected for processing")
         
         # Update progress after setup
-        job_store[job_id]["progress"] = 10
-        job_store[job_id]["updated_at"] = time.time()
+        job_store.update(job_id, progress=10, updated_at=time.time())
         logger.info(f"📈 Progress updated to 10% - Starting graph execution")
         sys.stdout.flush()
         
         # Track total nodes to estimate progress
-        total_nodes = len(sections_list) + 2  # +2 for read_pdf and extract_fir_fact
+        total_nodes = len(sections_list) + 5  # +5 for read_pdf, translate_to_english, segment_fir, extract_fir_fact and extract_fir_placeholders
         logger.info(f"📊 Total nodes expected: {total_nodes}")
         completed_nodes = 0
+        progress = 10
+        
+        # Partial result published after every node so the UI can render sections as they finish
+        partial = _start_partial_result(workflow_id, sections_list)
         
         # Stream graph execution and update progress
+        # "tasks" reports node starts, "updates" reports node outputs
         result = None
         event_count = 0
         logger.info(f"🔄 Starting graph.stream()...")
         sys.stdout.flush()
         
         try:
-            for event in graph.stream(graph_state, config=config):
+            for mode, event in graph.stream(graph_state, config=config, stream_mode=["tasks", "updates"]):
+                if mode == "tasks":
+                    if "input" in event:  # Task start (finished tasks carry "result" instead)
+                        job_events.publish(job_id, NODE_STARTED, node=event["name"], progress=progress)
+                        section = NODE_SECTIONS.get(event["name"])
+                        if section and partial["section_status"].get(section) == SECTION_PENDING:
+                            partial["section_status"][section] = SECTION_RUNNING
+                            partial = _publish_partial_result(workflow_id, partial)
+                    continue
+                
                 event_count += 1
                 logger.info(f"📦 Received event #{event_count}: {list(event.keys())}")
                 sys.stdout.flush()
@@ -97,8 +223,17 @@ def process_workflow_background(
                 for node_name, node_output in event.items():
                     completed_nodes += 1
                     progress = min(10 + int((completed_nodes / max(total_nodes, 1)) * 85), 95)
-                    job_store[job_id]["progress"] = progress
-                    job_store[job_id]["updated_at"] = time.time()
+                    job_update = {"progress": progress, "updated_at": time.time()}
+                    
+                    # Record nodes that ran out of their time budget
+                    overruns = node_output.get("node_overruns") if isinstance(node_output, dict) else None
+                    if overruns:
+                        job_update["overruns"] = job_store[job_id].get("overruns", []) + overruns
+                        logger.warning(f"⏱️ Node {node_name} exceeded its time budget: {overruns}")
+                    job_store.update(job_id, **job_update)
+                    partial = _publish_partial_result(workflow_id, _merge_node_output(partial, node_name, node_output))
+                    job_events.publish(job_id, NODE_COMPLETED, node=node_name, progress=progress, timed_out=bool(overruns),
+                                       result_version=partial["result_version"])
                     
                     logger.info(f"✅ Node completed: {node_name} (Progress: {progress}%, Completed: {completed_nodes}/{total_nodes})")
                     sys.stdout.flush()
@@ -119,16 +254,20 @@ def process_workflow_background(
             logger.warning("⚠️ Could not get state from checkpointer")
             result = graph.invoke(graph_state, config=config)
         
-        # Store result
+        # Store final result
+        result = dict(result)
         result.pop("pdf_bytes", None)
         result["workflow_id"] = workflow_id
-        results_store[workflow_id] = result
+        result["section_status"] = partial["section_status"]
+        result["result_version"] = partial["result_version"]
+        result["result_complete"] = True
+        _publish_partial_result(workflow_id, result)
+        prerender_document(workflow_id, result)
         
         # Update job status to completed
-        job_store[job_id]["status"] = "completed"
-        job_store[job_id]["workflow_id"] = workflow_id
-        job_store[job_id]["progress"] = 100
-        job_store[job_id]["updated_at"] = time.time()
+        job_store.update(job_id, status="completed", workflow_id=workflow_id, progress=100, updated_at=time.time())
+        job_events.publish(job_id, STATUS, status="completed", progress=100, workflow_id=workflow_id,
+                           redirect_url=f"/results/{workflow_id}")
         
         logger.info(f"✅ Background workflow completed for job_id: {job_id}, workflow_id: {workflow_id}")
         sys.stdout.flush()
@@ -138,26 +277,42 @@ def process_workflow_background(
         sys.stdout.flush()
         
         # Update job status to failed
-        job_store[job_id]["status"] = "failed"
-        job_store[job_id]["error"] = str(e)
-        job_store[job_id]["updated_at"] = time.time()
+        job_store.update(job_id, status="failed", error=str(e), updated_at=time.time())
+        job_events.publish(job_id, STATUS, status="failed", error=str(e))
+        
+        # Sections that never finished will not arrive
+        if partial is not None:
+            for section, status in partial["section_status"].items():
+                if status in (SECTION_PENDING, SECTION_RUNNING):
+                    partial["section_status"][section] = SECTION_FAILED
+            _publish_partial_result(workflow_id, partial)
 
 
 @router.post("/upload")
 async def upload_pdf(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: Optional[UploadFile] = File(None),
     sections: Optional[str] = Form(None)
 ):
     """
     Upload PDF or add sections to existing workflow.
     Returns immediately with a job_id for status polling.
+    
+    A PDF already uploaded with the same sections (same bytes, same pipeline
+    version) is not processed again. A finished analysis is copied into this
+    session's own workflow; one still in flight is returned read-only (its
+    job and workflow ids) without rebinding the session, since workflow ids
+    are also checkpoint thread ids and must never be shared between sessions.
     """
     
     workflow_id = get_session_id(request)
     logger.info(f"📥 Starting upload request for workflow_id: {workflow_id}")
     
+    # Reject oversized uploads before reading the body (allowing for multipart overhead)
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)}MB upload limit")
+    
     # Parse sections
     try:
         sections_list = json.loads(sections) if sections else []
@@ -179,8 +334,9 @@ async def upload_pdf(
     is_new_workflow = not prior_state or not prior_state.values
     
     # Validate file if new workflow
-    file_bytes = None
+    pdf_path = None
     filename = None
+    dedup_key = None
     if is_new_workflow:
         if not file:
             raise HTTPException(status_code=400, detail="PDF file required for new workflow")
@@ -189,42 +345,90 @@ async def upload_pdf(
             raise HTTPException(status_code=400, detail="Only PDF files allowed")
         
         try:
-            file_bytes = await file.read()
+            pdf_path, pdf_hash, size = await save_upload(file, MAX_UPLOAD_BYTES)
             filename = file.filename or "document.pdf"
-            logger.info(f"📄 PDF file received: {filename}, size: {len(file_bytes)} bytes")
+            logger.info(f"📄 PDF file received: {filename}, size: {size} bytes")
+        except UploadTooLarge:
+            raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)}MB upload limit")
         except Exception as e:
             logger.error(f"❌ Error reading file: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error reading file: {str(e)}")
+        finally:
+            await file.close()
+        dedup_key = _dedup_key(pdf_hash, sections_list)
+        sweep_blobs(STORE_TTL_SECONDS)
     
     # Initialize job in job_store
     job_store[job_id] = {
-        "status": "processing",
-        "workflow_id": None,
+        "status": "queued",
+        "workflow_id": workflow_id,  # Known up front so partial results can be fetched while running
         "progress": 0,
         "error": None,
+        "overruns": [],
+        "dedup_key": dedup_key,
         "created_at": time.time(),
         "updated_at": time.time()
     }
     
-    # Start background task
-    background_tasks.add_task(
+    existing = _claim_upload(dedup_key, job_id, workflow_id) if dedup_key else None
+    if existing:
+        existing_job = job_store.get(existing["job_id"]) or {"status": "queued"}
+        if existing_job["status"] == "completed" and _copy_workflow(existing["workflow_id"], workflow_id):
+            # This session gets its own copy, so sections it adds later stay its own
+            job_store.update(job_id, status="completed", progress=100, dedup_key=None, updated_at=time.time())
+            job_events.publish(job_id, STATUS, status="completed", progress=100, workflow_id=workflow_id,
+                               redirect_url=f"/results/{workflow_id}")
+            logger.info(f"♻️ Duplicate upload for workflow_id: {workflow_id}, copied result of workflow {existing['workflow_id']}")
+            return JSONResponse({
+                "success": True,
+                "job_id": job_id,
+                "workflow_id": workflow_id,
+                "status": "completed",
+                "deduplicated": True,
+                "message": "This FIR was already analysed with the same sections; reusing that analysis.",
+                "events_url": f"/status/{job_id}/events"
+            })
+        
+        # Still running: follow the existing job read-only; this session keeps its own (empty) workflow
+        del job_store[job_id]
+        logger.info(f"♻️ Duplicate upload for workflow_id: {workflow_id}, following job {existing['job_id']} ({existing_job['status']})")
+        return JSONResponse({
+            "success": True,
+            "job_id": existing["job_id"],
+            "workflow_id": existing["workflow_id"],
+            "status": existing_job["status"],
+            "deduplicated": True,
+            "read_only": True,
+            "message": "This FIR is already being analysed with the same sections; showing that analysis. "
+                       "Upload it again once it has finished to add sections.",
+            "events_url": f"/status/{existing['job_id']}/events"
+        })
+    
+    job_events.publish(job_id, STATUS, status="queued", progress=0)
+    
+    # Queue the job; adding sections to an existing workflow is short and jumps ahead of new uploads
+    job_queue.submit(
+        job_id,
+        workflow_id,
         process_workflow_background,
         job_id,
         workflow_id,
-        file_bytes,
+        pdf_path,
         filename,
         sections_list,
-        is_new_workflow
+        is_new_workflow,
+        priority=PRIORITY_NORMAL if is_new_workflow else PRIORITY_HIGH
     )
     
-    logger.info(f"✅ Job {job_id} created and background task started for workflow_id: {workflow_id}")
+    logger.info(f"✅ Job {job_id} queued for workflow_id: {workflow_id}")
     
     # Return immediately with job_id
     return JSONResponse({
         "success": True,
         "job_id": job_id,
-        "status": "processing",
-        "message": "Workflow processing started. Poll /status/{job_id} for progress."
+        "status": "queued",
+        "message": "Workflow queued for processing. Subscribe to /status/{job_id}/events or poll /status/{job_id} for progress.",
+        "events_url": f"/status/{job_id}/events"
     })
 
 
@@ -232,20 +436,30 @@ async def upload_pdf(
 async def get_job_status(job_id: str):
     """
     Get the status of an asynchronous job.
-    Frontend should poll this endpoint every 2-3 seconds.
+    Kept for polling clients; /status/{job_id}/events pushes the same progress as it happens.
     """
-    if job_id not in job_store:
+    job = job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = job_store[job_id]
-    
     response = {
         "job_id": job_id,
         "status": job["status"],
         "progress": job["progress"],
-        "updated_at": job["updated_at"]
+        "updated_at": job["updated_at"],
+        "results_url": f"/api/results/{job['workflow_id']}"
     }
     
+    if job["status"] == "queued":
+        queue_info = job_queue.position(job_id)
+        if queue_info:
+            response["queue_position"] = queue_info["queue_position"]
+            response["estimated_start_at"] = queue_info["estimated_start_at"]
+            response["estimated_start_in"] = max(0, int(queue_info["estimated_start_at"] - time.time()))
+    
+    if job.get("overruns"):
+        response["overruns"] = job["overruns"]
+    
     if job["status"] == "completed":
         response["workflow_id"] = job["workflow_id"]
         response["redirect_url"] = f"/results/{job['workflow_id']}"
@@ -253,3 +467,36 @@ async def get_job_status(job_id: str):
         response["error"] = job["error"]
     
     return JSONResponse(response)
+
+
+@router.get("/status/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Stream job progress as Server-Sent Events.
+    
+    Emits node_started / node_completed events (with progress %) and status
+    events; the stream ends after the "completed" or "failed" status event.
+    Reconnecting clients resume from the Last-Event-ID header.
+    """
+    if job_id not in job_store:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        start = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        start = 0
+    
+    async def event_stream():
+        async for index, event in job_events.subscribe(job_id, start=start):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {index}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -81,6 +81,10 @@ def format_state_for_display(state: dict) -> dict:
         "summary_for_the_court": summary_for_the_court,
         "chargesheet": chargesheet,
         "sections": state.get("sections", []),  # Selected sections
+        "node_overruns": state.get("node_overruns") or [],  # Sections returned partial/empty after a timeout
+        "section_status": state.get("section_status") or {},  # Per-section pending/running/completed/timed_out/failed
+        "result_version": state.get("result_version", 0),
+        "complete": state.get("result_complete", True),
         "stats": {
             "ndps_count": len(ndps_sections),
             "bns_count": len(bns_sections),
@@ -1,128 +1,260 @@
 import os
-import requests
+import re
 import uuid
-import json
+import hashlib
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+
 from app.langgraph.state import WorkflowState
+from app.utils.retry import exponential_backoff_retry
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+TRANSLATOR_MAX_CHARS = int(os.getenv("TRANSLATOR_MAX_CHARS", "5000"))  # Per request; Azure allows up to 50,000
+TRANSLATOR_CONCURRENCY = int(os.getenv("TRANSLATOR_CONCURRENCY", "4"))
+TRANSLATOR_TIMEOUT = float(os.getenv("TRANSLATOR_TIMEOUT", "30"))
+TRANSLATION_CACHE_DIR = os.getenv("TRANSLATION_CACHE_DIR", os.path.join("data", "translation_cache"))
+
+# Scripts we translate from, by Unicode block; anything else (Latin, digits, punctuation) is kept as-is
+SCRIPT_RANGES = {
+    "gu": (0x0A80, 0x0AFF),  # Gujarati
+    "hi": (0x0900, 0x097F),  # Devanagari (Hindi/Marathi)
+}
+# A line is vernacular when at least this share of its letters are in one of SCRIPT_RANGES
+VERNACULAR_RATIO = 0.3
+
+SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|\n")
+
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Detect the vernacular script of a line.
+
+    Returns:
+        "gu" or "hi" when the line should be translated, None for English/neutral text
+    """
+    counts = dict.fromkeys(SCRIPT_RANGES, 0)
+    letters = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        code = ord(char)
+        for lang, (low, high) in SCRIPT_RANGES.items():
+            if low <= code <= high:
+                counts[lang] += 1
+                break
+    if not letters:
+        return None
+    lang, count = max(counts.items(), key=lambda kv: kv[1])
+    return lang if count / letters >= VERNACULAR_RATIO else None
+
+
+def split_for_translation(text: str, max_chars: int = TRANSLATOR_MAX_CHARS) -> List[str]:
+    """
+    Split text at sentence boundaries (including the danda) into chunks under max_chars.
+
+    Sentences longer than max_chars are split at whitespace. Joining the chunks
+    with "" gives back the original text.
+    """
+    pieces = []
+    last = 0
+    for match in SENTENCE_END.finditer(text):
+        pieces.append(text[last:match.end()])
+        last = match.end()
+    if last < len(text):
+        pieces.append(text[last:])
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        while len(piece) > max_chars:
+            cut = piece.rfind(" ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(piece[:cut])
+            piece = piece[cut:]
+        if len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_runs(page_text: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Group consecutive lines of a page into (language, text) runs.
+
+    Language is "gu"/"hi" for vernacular lines and "en" for other lines with letters;
+    lines without letters (numbers, punctuation) join the current run.
+    """
+    runs = []
+    for line in page_text.splitlines(keepends=True):
+        lang = detect_language(line) or ("en" if any(char.isalpha() for char in line) else None)
+        if runs and (lang is None or lang == runs[-1][0]):
+            runs[-1] = (runs[-1][0], runs[-1][1] + line)
+        else:
+            runs.append((lang, line))
+    return runs
+
+
+def translator_backend() -> str:
+    """
+    Translation backend from TRANSLATOR_BACKEND: "azure" (needs AZURE_TRANSLATOR_KEY/LOCATION),
+    "mock" (offline, for tests) or "none". Defaults to azure when a key is configured,
+    otherwise vernacular text is left as-is. Read on every call, so keys from .env
+    are seen whatever the import order.
+    """
+    return os.getenv("TRANSLATOR_BACKEND", "azure" if os.getenv("AZURE_TRANSLATOR_KEY") else "none").lower()
+
+
+def _cache_path(text: str, lang: str, backend: str) -> str:
+    digest = hashlib.sha256(f"{backend}:{lang}:{text}".encode("utf-8")).hexdigest()
+    return os.path.join(TRANSLATION_CACHE_DIR, f"{digest}.txt")
+
+
+@exponential_backoff_retry(max_retries=3, max_wait=10)
+def _azure_translate(text: str, lang: str) -> str:
+    key = os.environ.get("AZURE_TRANSLATOR_KEY")
+    location = os.environ.get("AZURE_TRANSLATOR_LOCATION")
+    endpoint = os.environ.get("AZURE_TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com")
+    if not key or not location:
+        raise ValueError("AZURE_TRANSLATOR_KEY and AZURE_TRANSLATOR_LOCATION must be set in .env")
+
+    params = {"api-version": "3.0", "to": ["en"]}
+    if lang == "gu":
+        params["from"] = "gu"  # Devanagari is left to auto-detection (Hindi or Marathi)
+    headers = {
+        "Ocp-Apim-Subscription-Key": key,
+        # location required if you're using a multi-service or regional (not global) resource.
+        "Ocp-Apim-Subscription-Region": location,
+        "Content-type": "application/json",
+        "X-ClientTraceId": str(uuid.uuid4())
+    }
+    response = requests.post(f"{endpoint}/translate", params=params, headers=headers,
+                             json=[{"text": text}], timeout=TRANSLATOR_TIMEOUT)
+    payload = response.json()
+    if isinstance(payload, dict) and "error" in payload:
+        raise Exception(f"Azure API Error: {payload['error']}")
+    response.raise_for_status()
+    # Response structure: [{'translations': [{'text': '...', 'to': 'en'}]}]
+    return payload[0]["translations"][0]["text"]
+
+
+def _mock_translate(text: str, lang: str) -> str:
+    """Offline stand-in that marks the text instead of translating it."""
+    return f"[{lang}->en] {text}"
+
+
+def translate_chunk(text: str, lang: str) -> str:
+    """Translate one chunk with the configured backend, using the on-disk cache."""
+    backend = translator_backend()
+    cache_path = _cache_path(text, lang, backend)
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    translated = _mock_translate(text, lang) if backend == "mock" else _azure_translate(text, lang)
+    # Keep the line structure the next stages rely on
+    if text.endswith("\n") and not translated.endswith("\n"):
+        translated += "\n"
+
+    os.makedirs(TRANSLATION_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(translated)
+    os.replace(tmp_path, cache_path)
+    return translated
+
+
+def translate_pages(pages: List[str]) -> Tuple[List[str], int]:
+    """
+    Translate the vernacular parts of each page to English, keeping English text untouched.
+
+    Returns:
+        (translated pages in order, number of chunks translated)
+    """
+    # Each page becomes a list of parts; vernacular parts are replaced by chunk slots to fill in
+    layout = []
+    jobs = []
+    for page_text in pages:
+        parts = []
+        for lang, run in _split_runs(page_text):
+            if lang in (None, "en"):
+                parts.append(run)
+                continue
+            for chunk in split_for_translation(run):
+                parts.append(len(jobs))
+                jobs.append((chunk, lang))
+        layout.append(parts)
+
+    if not jobs:
+        return pages, 0
+
+    with ThreadPoolExecutor(max_workers=max(1, TRANSLATOR_CONCURRENCY)) as executor:
+        translated = list(executor.map(lambda job: translate_chunk(*job), jobs))
+
+    return ["".join(translated[p] if isinstance(p, int) else p for p in parts) for parts in layout], len(jobs)
+
 
 def translate_to_english(state: WorkflowState) -> dict:
     """
-    Translate PDF content to English using Azure Translator.
+    Translate vernacular (Gujarati/Devanagari) parts of the FIR to English.
     Works as a LangGraph node that accepts state and returns updated state.
-    
+
+    Language is detected per line and page; English spans are never sent. Vernacular
+    runs are split at sentence boundaries under TRANSLATOR_MAX_CHARS, translated
+    concurrently with retry, cached by content hash and reassembled in order.
+
     Args:
-        state: WorkflowState containing pdf_content
-        
+        state: WorkflowState containing pdf_content (and pdf_pages offsets from read_pdf)
+
     Returns:
-        Dictionary with translated content in pdf_content_in_english
+        {"pdf_content_in_english", "pdf_pages"} when anything was translated, otherwise {}
     """
     if not state.get("pdf_content"):
         raise ValueError("pdf_content is required for translation")
-    
+
     pdf_content = state["pdf_content"]
-    print("Translation started")
-    try:
-        # Retrieve configuration from environment variables
-        key = os.environ.get("AZURE_TRANSLATOR_KEY")
-        location = os.environ.get("AZURE_TRANSLATOR_LOCATION")
-        endpoint = os.environ.get("AZURE_TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com")
-        
-        if not key or not location:
-            raise ValueError("AZURE_TRANSLATOR_KEY and AZURE_TRANSLATOR_LOCATION must be set in .env")
-
-        path = '/translate'
-        constructed_url = endpoint + path
-
-        params = {
-            'api-version': '3.0',
-            'to': ['en']  # Translating TO English
-        }
-
-        headers = {
-            'Ocp-Apim-Subscription-Key': key,
-            # location required if you're using a multi-service or regional (not global) resource.
-            'Ocp-Apim-Subscription-Region': location,
-            'Content-type': 'application/json',
-            'X-ClientTraceId': str(uuid.uuid4())
-        }
-
-        # You can pass more than one object in body.
-        body = [{
-            'text': pdf_content
-        }]
-
-        print(f"📡 [translate_to_english] Sending request to {endpoint} (timeout=10s)...")
-        request = requests.post(constructed_url, params=params, headers=headers, json=body, timeout=10)
-        print("✅ [translate_to_english] Received response from Azure.")
-        
-        response = request.json()
-
-        # Check for error in response
-        if isinstance(response, dict) and "error" in response:
-             raise Exception(f"Azure API Error: {response['error']}")
-
-        # Extract translated text
-        # Response structure is valid for multiple inputs: [{'translations': [{'text': '...', 'to': 'en'}]}]
-        translated_text = response[0]['translations'][0]['text']
-        
-        print(f"✅ [translate_to_english] Translation completed, output length: {len(translated_text)} characters")
-        print("=" * 80)
-        
-        return {"pdf_content_in_english": translated_text}
-
-    except Exception as e:
-        raise Exception(f"Error translating content: {str(e)}")
+    offsets = state.get("pdf_pages") or [{"page": 1, "start": 0, "end": len(pdf_content)}]
+    pages = [pdf_content[p["start"]:p["end"]] for p in offsets]
 
-if __name__ == "__main__":
-    # For local testing - Direct API Call (No project imports needed)
-    from dotenv import load_dotenv
-    import os
-    import requests
-    import uuid
-    import json
-    
-    # Load env from .env in current or parent directory
-    load_dotenv(".env")
-    
-    print("🚀 Starting Translator Direct Test...")
+    if not any(detect_language(line) for page in pages for line in page.splitlines()):
+        logger.info("✅ [translate_to_english] FIR is already in English, skipping translation")
+        return {}
+    backend = translator_backend()
+    if backend not in ("azure", "mock"):
+        logger.warning("⚠️ [translate_to_english] Vernacular text found but no translator configured (TRANSLATOR_BACKEND)")
+        return {}
 
-    key = os.environ.get("AZURE_TRANSLATOR_KEY")
-    location = os.environ.get("AZURE_TRANSLATOR_LOCATION")
-    endpoint = os.environ.get("AZURE_TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com")
-    
-    if not key or not location:
-         print("❌ Error: AZURE_TRANSLATOR_KEY and AZURE_TRANSLATOR_LOCATION not found in .env")
-    else:
-        path = '/translate'
-        constructed_url = endpoint + path
-
-        params = {
-            'api-version': '3.0',
-            'to': ['en']  # Translate to English
-        }
-
-        headers = {
-            'Ocp-Apim-Subscription-Key': key,
-            'Ocp-Apim-Subscription-Region': location,
-            'Content-type': 'application/json',
-            'X-ClientTraceId': str(uuid.uuid4())
-        }
-
-        body = [{
-             'text': 'કેમ છો દુનિયા! હું ખરેખર તમારી કારને બ્લોકની આસપાસ થોડી વાર ચલાવવા માંગુ છું!'
-        }]
-        
-        try:
-            print(f"📡 Sending request to {endpoint}...")
-            request = requests.post(constructed_url, params=params, headers=headers, json=body)
-            response = request.json()
-            
-            print(json.dumps(response, sort_keys=True, ensure_ascii=False, indent=4, separators=(',', ': ')))
-            
-            if isinstance(response, list) and 'translations' in response[0]:
-                 print(f"\n✅ Translated: {response[0]['translations'][0]['text']}")
-            else:
-                 print("\n⚠️ Unexpected response format.")
-
-        except Exception as e:
-            print(f"\n❌ Error during test: {e}")
+    logger.info(f"🌐 [translate_to_english] Translating vernacular text with {backend}...")
+    translated_pages, chunk_count = translate_pages(pages)
 
+    text = []
+    new_offsets = []
+    offset = 0
+    for page, page_text in zip(offsets, translated_pages):
+        if text:
+            offset += 1  # "\n" separator, as in read_pdf
+        new_offsets.append({"page": page["page"], "start": offset, "end": offset + len(page_text)})
+        text.append(page_text)
+        offset += len(page_text)
+    translated_text = "\n".join(text)
+
+    logger.info(f"✅ [translate_to_english] Translated {chunk_count} chunks, output length: {len(translated_text)} characters")
+    return {"pdf_content_in_english": translated_text, "pdf_pages": new_offsets}
+
+
+if __name__ == "__main__":
+    # For local testing: TRANSLATOR_BACKEND=mock python -m app.translator.translator
+    logging.basicConfig(level=logging.INFO)
+    sample = "FIR No. 12/2024\nકેમ છો દુનિયા! હું ખરેખર તમારી કારને બ્લોકની આસપાસ થોડી વાર ચલાવવા માંગુ છું!\n"
+    print(translate_to_english({"pdf_content": sample}).get("pdf_content_in_english", sample))
@@ -0,0 +1,143 @@
+"""
+Content-addressed on-disk storage for uploaded PDFs.
+
+Uploads are streamed to disk in chunks and hashed on the fly, so a PDF is never
+held in memory as a whole by the web process; workflows receive the file path.
+Blobs are named by their SHA-256, so re-uploads of the same FIR share one file.
+They must outlive a single job (continuing a workflow re-reads the PDF) and are
+swept once untouched for longer than the store TTL.
+
+With several hosts sharing STORE_BACKEND, UPLOAD_DIR must be a shared volume.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import BinaryIO, Tuple
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join("data", "uploads"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+SWEEP_INTERVAL_SECONDS = 3600
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+def _finalize(tmp_path: str, sha256: str) -> str:
+    """Move a fully written temp file to its content-addressed path."""
+    path = os.path.join(UPLOAD_DIR, f"{sha256}.pdf")
+    if os.path.exists(path):
+        os.remove(tmp_path)
+        os.utime(path)  # Keep the existing blob alive for the sweep
+    else:
+        os.replace(tmp_path, path)
+    return path
+
+
+async def save_upload(file: UploadFile, max_bytes: int) -> Tuple[str, str, int]:
+    """
+    Stream an upload to the blob directory, hashing it as it is written.
+
+    Args:
+        file: Uploaded file
+        max_bytes: Size limit; the upload is rejected as soon as it is exceeded
+
+    Returns:
+        (blob path, sha256 hex digest, size in bytes)
+
+    Raises:
+        UploadTooLarge: If the upload exceeds max_bytes
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return _finalize(tmp_path, digest.hexdigest()), digest.hexdigest(), size
+
+
+def save_stream(stream: BinaryIO, max_bytes: int) -> Tuple[str, str, int]:
+    """
+    Copy a readable file object (e.g. a ZIP entry) to the blob directory in chunks.
+
+    The limit is enforced on the bytes actually read, not on any size the
+    source declares.
+
+    Args:
+        stream: Binary file object
+        max_bytes: Size limit; the copy stops as soon as it is exceeded
+
+    Returns:
+        (blob path, sha256 hex digest, size in bytes)
+
+    Raises:
+        UploadTooLarge: If the stream yields more than max_bytes
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return _finalize(tmp_path, digest.hexdigest()), digest.hexdigest(), size
+
+
+def sweep_blobs(max_age_seconds: int) -> int:
+    """
+    Delete blobs (and abandoned partial uploads) untouched for max_age_seconds.
+
+    Runs at most once per SWEEP_INTERVAL_SECONDS per process.
+
+    Returns:
+        Number of files removed
+    """
+    global _last_sweep
+    with _sweep_lock:
+        if time.time() - _last_sweep < SWEEP_INTERVAL_SECONDS:
+            return 0
+        _last_sweep = time.time()
+
+    if not os.path.isdir(UPLOAD_DIR):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(UPLOAD_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    if removed:
+        logger.info(f"🧹 Removed {removed} expired upload blobs")
+    return removed
@@ -0,0 +1,203 @@
+"""
+Per-node wall-clock budgets for LangGraph nodes.
+
+Every node is wrapped with `with_deadline`, which runs it in a worker thread and
+stops waiting once the node's budget is spent. A node that overruns returns its
+fallback output (or whatever partial output it reported via `report_partial`)
+together with a `node_overruns` entry, so dependent nodes can still proceed.
+
+Budgets are in seconds and can be overridden per node with an environment
+variable named NODE_BUDGET_<NODE_NAME>, e.g. NODE_BUDGET_HISTORICAL_CASES=240.
+A budget of 0 disables the deadline for that node.
+"""
+
+import os
+import time
+import threading
+import contextvars
+import logging
+from concurrent.futures import Executor, Future
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NODE_BUDGET = float(os.getenv("NODE_BUDGET_DEFAULT", "300"))
+
+# Default budgets (seconds) per graph node
+NODE_BUDGETS: Dict[str, float] = {
+    "read_pdf": 120,
+    "translate_to_english": 180,
+    "segment_fir": 30,
+    "extract_fir_fact": 180,
+    "extract_fir_placeholders": 120,
+    "ndps_legal_mapping": 300,
+    "bns_legal_mapping": 300,
+    "bnss_legal_mapping": 300,
+    "bsa_legal_mapping": 300,
+    "investigation_and_legal_timeline": 300,
+    "historical_cases": 240,
+    "investigation_plan": 300,
+    "generate_evidence_checklist": 300,
+    "generate_dos_and_donts": 300,
+    "generate_potential_prosecution_weaknesses": 300,
+    "generate_defence_perspective_rebuttal": 300,
+    "generate_summary_for_the_court": 300,
+    "generate_chargesheet": 300,
+}
+
+_current_deadline: contextvars.ContextVar = contextvars.ContextVar("node_deadline", default=None)
+
+
+def get_node_budget(node_name: str) -> float:
+    """
+    Get the wall-clock budget for a node, honouring NODE_BUDGET_<NODE_NAME>.
+
+    Args:
+        node_name: Graph node name
+
+    Returns:
+        Budget in seconds (0 means no deadline)
+    """
+    override = os.getenv(f"NODE_BUDGET_{node_name.upper()}")
+    if override:
+        try:
+            return float(override)
+        except ValueError:
+            logger.warning(f"Ignoring invalid NODE_BUDGET_{node_name.upper()}={override!r}")
+    return float(NODE_BUDGETS.get(node_name, DEFAULT_NODE_BUDGET))
+
+
+class Deadline:
+    """Wall-clock budget for a single node run, visible to the node via `current_deadline()`."""
+
+    def __init__(self, node_name: str, budget: float):
+        self.node_name = node_name
+        self.budget = budget
+        self.started_at = time.monotonic()
+        self.truncated = False
+        self._partial = None
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.elapsed())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def report_partial(self, output: dict):
+        """Record the best output produced so far, returned if the node overruns."""
+        with self._lock:
+            self._partial = dict(output)
+
+    def partial(self) -> Optional[dict]:
+        with self._lock:
+            return dict(self._partial) if self._partial is not None else None
+
+    def mark_truncated(self):
+        """Called by a node that stopped early on its own because the budget ran out."""
+        self.truncated = True
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the node running in this thread, if any."""
+    return _current_deadline.get()
+
+
+def report_partial(output: dict):
+    """Record partial output for the current node (no-op outside a deadline)."""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.report_partial(output)
+
+
+def submit_with_deadline(executor: Executor, func: Callable, *args, **kwargs) -> Future:
+    """
+    Submit work to a thread pool so it runs under the caller's deadline.
+
+    Pool threads do not inherit context variables, so current_deadline() would
+    be None there and the work would ignore the node budget. Each submission
+    runs in its own copy of the caller's context (a context cannot be entered
+    by two threads at once).
+    """
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+def _overrun_record(deadline: Deadline, partial: bool) -> dict:
+    return {
+        "node": deadline.node_name,
+        "budget_seconds": deadline.budget,
+        "elapsed_seconds": round(deadline.elapsed(), 1),
+        "partial": partial,
+    }
+
+
+def with_deadline(node_name: str, func: Callable[[dict], dict], fallback: Optional[dict] = None) -> Callable[[dict], dict]:
+    """
+    Wrap a LangGraph node function with a wall-clock budget.
+
+    The node runs in a daemon thread. If it has not returned when the budget
+    runs out, the wrapper returns the node's last reported partial output, or
+    `fallback` when nothing was reported, plus a `node_overruns` entry. Nodes
+    without a fallback raise TimeoutError instead. The abandoned thread is left
+    to finish in the background; its output is discarded.
+
+    Args:
+        node_name: Graph node name (used for budget lookup and reporting)
+        func: Node function taking state and returning a state update
+        fallback: State update to return when the budget runs out
+
+    Returns:
+        Wrapped node function
+    """
+    @wraps(func)
+    def wrapper(state):
+        budget = get_node_budget(node_name)
+        if budget <= 0:
+            return func(state)
+
+        deadline = Deadline(node_name, budget)
+        outcome = {}
+        done = threading.Event()
+
+        def run():
+            _current_deadline.set(deadline)
+            try:
+                outcome["result"] = func(state)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(run,), name=f"node-{node_name}", daemon=True)
+        thread.start()
+
+        if done.wait(budget):
+            if "error" in outcome:
+                raise outcome["error"]
+            result = outcome["result"]
+            if deadline.truncated:
+                logger.warning(f"⏱️ [{node_name}] Stopped early at {deadline.elapsed():.1f}s (budget {budget:g}s), returning partial result")
+                result = dict(result or {})
+                result["node_overruns"] = [_overrun_record(deadline, partial=True)]
+            return result
+
+        partial = deadline.partial()
+        if partial is None and fallback is None:
+            raise TimeoutError(f"Node '{node_name}' exceeded its {budget:g}s budget")
+
+        logger.warning(
+            f"⏱️ [{node_name}] Exceeded {budget:g}s budget, "
+            f"returning {'partial' if partial is not None else 'empty'} result"
+        )
+        output = dict(fallback or {})
+        if partial is not None:
+            output.update(partial)
+        output["node_overruns"] = [_overrun_record(deadline, partial=partial is not None)]
+        return output
+
+    return wrapper
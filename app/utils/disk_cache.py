@@ -0,0 +1,154 @@
+"""
+Persistent on-disk cache for expensive external lookups (Indian Kanoon, LLM summaries).
+
+Entries live in one SQLite file, grouped by namespace, zlib-compressed. Reads
+can require an entry to be younger than a TTL; entries without a TTL never
+expire. When the file's payload grows past max_bytes, the least recently used
+entries are evicted across all namespaces. Hit/miss counters per namespace are
+kept in memory for logging (see DiskCache.stats).
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DISK_CACHE_PATH = os.getenv("DISK_CACHE_PATH", os.path.join("data", "cache.sqlite3"))
+DISK_CACHE_MAX_BYTES = int(os.getenv("DISK_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# Evict down to this share of max_bytes so eviction does not run on every write
+EVICTION_TARGET = 0.9
+
+
+class DiskCache:
+    """Namespaced, compressed, size-bounded LRU cache in a SQLite file."""
+
+    def __init__(self, path: str = DISK_CACHE_PATH, max_bytes: int = DISK_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value BLOB, size INTEGER, "
+            "created_at REAL, accessed_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, namespace: str, field: str):
+        with self._stats_lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "writes": 0})
+            counters[field] += 1
+
+    def get_bytes(self, namespace: str, key: str, ttl: Optional[float] = None) -> Optional[bytes]:
+        """
+        Return the cached value, or None if missing or older than ttl seconds.
+
+        Args:
+            namespace: Cache namespace (e.g. "kanoon_search")
+            key: Entry key within the namespace
+            ttl: Maximum age in seconds; None accepts any age
+        """
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None or (ttl is not None and time.time() - row[1] > ttl):
+            self._count(namespace, "misses")
+            return None
+        conn.execute(
+            "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?", (time.time(), namespace, key)
+        )
+        self._count(namespace, "hits")
+        return zlib.decompress(row[0])
+
+    def set_bytes(self, namespace: str, key: str, value: bytes):
+        """Store a value (compressed) and evict least recently used entries if over max_bytes."""
+        compressed = zlib.compress(value, 6)
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, compressed, len(compressed), now, now),
+        )
+        self._count(namespace, "writes")
+        self._evict()
+
+    def get(self, namespace: str, key: str, ttl: Optional[float] = None) -> Any:
+        """JSON value for key, or None (see get_bytes)."""
+        raw = self.get_bytes(namespace, key, ttl)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, namespace: str, key: str, value: Any):
+        """Store a JSON-serialisable value."""
+        self.set_bytes(namespace, key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def delete(self, namespace: str, key: str):
+        self._conn().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def _evict(self):
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * EVICTION_TARGET)
+        removed = 0
+        rows = conn.execute("SELECT namespace, key, size FROM entries ORDER BY accessed_at").fetchall()
+        for namespace, key, size in rows:
+            if total <= target:
+                break
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            total -= size
+            removed += 1
+        logger.info(f"🧹 Disk cache evicted {removed} entries ({total:,} bytes kept)")
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-namespace hits, misses, writes, hit_rate, entries and bytes."""
+        rows = self._conn().execute(
+            "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace"
+        ).fetchall()
+        sizes = {namespace: (count, size) for namespace, count, size in rows}
+        with self._stats_lock:
+            counters = {ns: dict(values) for ns, values in self._stats.items()}
+        result = {}
+        for namespace in set(sizes) | set(counters):
+            values = counters.get(namespace, {"hits": 0, "misses": 0, "writes": 0})
+            lookups = values["hits"] + values["misses"]
+            entries, size = sizes.get(namespace, (0, 0))
+            result[namespace] = {
+                **values,
+                "hit_rate": round(values["hits"] / lookups, 3) if lookups else None,
+                "entries": entries,
+                "bytes": size,
+            }
+        return result
+
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> DiskCache:
+    """Process-wide DiskCache, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache()
+        return _cache
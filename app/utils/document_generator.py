@@ -1,16 +1,31 @@
 """
 Document generation utility for creating Word documents from workflow state.
+
+Reports are composed rather than rebuilt: the template is prepared once (shared
+style changes applied, {{rest_content}} cleared), each section in
+REPORT_SECTIONS is rendered once into OOXML fragments cached on disk by a hash
+of that section's data, and a report is the prepared template with its
+placeholders filled and the fragments spliced in. Adding a section to a
+workflow renders only that section.
 """
 
 import os
+import json
+import hashlib
+import threading
+from io import BytesIO
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_BREAK
+from docx.oxml import parse_xml
 from docx.oxml.ns import qn
+from lxml import etree
 from pydantic import BaseModel, Field
 from app.models.openai import llm_model
+from app.utils.disk_cache import get_disk_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,6 +33,20 @@ logger = logging.getLogger(__name__)
 # Template path
 TEMPLATE_PATH = Path(__file__).parent.parent / "doc_geneation" / "Report.docx"
 
+# Bump when the report layout changes so cached documents (see app/routes/document.py) and
+# section fragments are rendered again
+DOCUMENT_VERSION = "2"
+
+# Characters from the start of the FIR sent to the LLM for placeholder extraction
+PLACEHOLDER_CONTEXT_CHARS = 2000
+
+# Disk cache namespace for rendered section fragments, keyed by a hash of the section's data
+FRAGMENT_CACHE = "docx_fragment"
+
+_template_lock = threading.Lock()
+_prepared_template = None  # (template mtime, prepared template bytes), see _prepare_template
+_scratch = threading.local()  # Per-thread scratch document fragments are rendered into
+
 
 class FIRPlaceholders(BaseModel):
     """Pydantic model for extracting FIR placeholders"""
@@ -27,6 +56,42 @@ class FIRPlaceholders(BaseModel):
     sections_invoked: str = Field(description="All sections invoked in FIR, formatted as: Section 8(c), Section 20(b)(ii)(B), Section 29")
 
 
+def request_fir_placeholders(fir_text: str) -> Dict[str, str]:
+    """
+    Ask the LLM for the report placeholders in a piece of FIR text.
+
+    Args:
+        fir_text: FIR content (the start of the FIR is enough)
+
+    Returns:
+        Dictionary with placeholder values
+
+    Raises:
+        Exception: Whatever the LLM call raises; callers choose their own fallback
+    """
+    prompt = f"""Extract the following information from the FIR content provided below:
+
+1. **name_of_accused**: Full name of the accused person as mentioned in FIR
+2. **case_title**: Format as "STATE OF GUJARAT vs. [ACCUSED NAME]" with qualifiers like "(JUVENILE)" if applicable
+3. **fir_date**: Date of FIR in format DD.MM.YYYY or DD/MM/YYYY
+4. **sections_invoked**: All sections invoked in FIR, formatted as: "Section 8(c), Section 20(b)(ii)(B), Section 29"
+
+FIR Content:
+{fir_text}
+
+Extract the information accurately from the FIR content above.
+"""
+    
+    result = llm_model.with_structured_output(FIRPlaceholders).invoke(prompt)
+    
+    return {
+        "name_of_accused": result.name_of_accused,
+        "case_title": result.case_title,
+        "fir_date": result.fir_date,
+        "sections_invoked": result.sections_invoked
+    }
+
+
 def extract_fir_placeholders(fir_facts: Dict[str, str], pdf_content: str = None) -> Dict[str, str]:
     """
     Extract placeholders from FIR facts using LLM with Pydantic model.
@@ -46,7 +111,7 @@ def extract_fir_placeholders(fir_facts: Dict[str, str], pdf_content: str = None)
                 fir_text += f"{key.replace('_', ' ').title()}: {value}\n"
         
         if pdf_content:
-            fir_text = pdf_content[:2000]  # Use first 2000 chars for context
+            fir_text = pdf_content[:PLACEHOLDER_CONTEXT_CHARS]  # Use the start of the FIR for context
         
         if not fir_text:
             return {
@@ -57,27 +122,7 @@ def extract_fir_placeholders(fir_facts: Dict[str, str], pdf_content: str = None)
             }
         
         # Use LLM to extract placeholders
-        prompt = f"""Extract the following information from the FIR content provided below:
-
-1. **name_of_accused**: Full name of the accused person as mentioned in FIR
-2. **case_title**: Format as "STATE OF GUJARAT vs. [ACCUSED NAME]" with qualifiers like "(JUVENILE)" if applicable
-3. **fir_date**: Date of FIR in format DD.MM.YYYY or DD/MM/YYYY
-4. **sections_invoked**: All sections invoked in FIR, formatted as: "Section 8(c), Section 20(b)(ii)(B), Section 29"
-
-FIR Content:
-{fir_text}
-
-Extract the information accurately from the FIR content above.
-"""
-        
-        result = llm_model.with_structured_output(FIRPlaceholders).invoke(prompt)
-        
-        return {
-            "name_of_accused": result.name_of_accused,
-            "case_title": result.case_title,
-            "fir_date": result.fir_date,
-            "sections_invoked": result.sections_invoked
-        }
+        return request_fir_placeholders(fir_text)
     except Exception as e:
         logger.error(f"Error extracting FIR placeholders: {e}", exc_info=True)
         # Fallback to basic extraction
@@ -121,68 +166,12 @@ def add_formatted_section(doc: Document, title: str, content: str, level: int =
         para.style.paragraph_format.space_after = Pt(6)
 
 
-def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
-    """
-    Format all available sections and add them to the document with proper formatting.
-    
-    Args:
-        doc: Document object
-        formatted_state: Already formatted state dictionary (from format_state_for_display)
-    """
-    """
-    Format all available sections into a formatted string for the document.
-    
-    Args:
-        formatted_state: Already formatted state dictionary (from format_state_for_display)
-        
-    Returns:
-        Formatted string with all sections
-    """
-    # FIR Facts
-    if formatted_state.get("fir_facts"):
-        heading = doc.add_heading("FIR FACTS", level=1)
-        heading.style.font.bold = True
-        for key, value in formatted_state["fir_facts"].items():
-            key_formatted = key.replace("_", " ").title()
-            para = doc.add_paragraph()
-            run1 = para.add_run(f"{key_formatted}: ")
-            run1.bold = True
-            run1.font.size = Pt(11)
-            run2 = para.add_run(value)
-            run2.font.size = Pt(11)
-        doc.add_paragraph()  # Add spacing
-    
-    # NDPS Sections
-    if formatted_state.get("ndps_sections"):
-        heading = doc.add_heading("NDPS ACT SECTIONS", level=1)
-        heading.style.font.bold = True
-        for section in formatted_state["ndps_sections"]:
-            if isinstance(section, dict):
-                section_num = section.get("section_number", "")
-                description = section.get("section_description", "")
-                relevance = section.get("why_section_is_relevant", "")
-                
-                para = doc.add_paragraph()
-                run1 = para.add_run(f"Section {section_num}: ")
-                run1.bold = True
-                run1.font.size = Pt(11)
-                run2 = para.add_run(description)
-                run2.font.size = Pt(11)
-                
-                if relevance:
-                    para2 = doc.add_paragraph()
-                    run3 = para2.add_run("  Relevance: ")
-                    run3.italic = True
-                    run3.font.size = Pt(10)
-                    run4 = para2.add_run(relevance)
-                    run4.font.size = Pt(10)
-        doc.add_paragraph()
-    
-    # BNS Sections
-    if formatted_state.get("bns_sections"):
-        heading = doc.add_heading("BHARATIYA NYAYA SANHITA (BNS) SECTIONS", level=1)
+def _render_act_sections(doc: Document, formatted_state: Dict[str, Any], key: str, title: str):
+    """One act's mapped sections (NDPS, BNS, BNSS or BSA): description plus relevance per section."""
+    if formatted_state.get(key):
+        heading = doc.add_heading(title, level=1)
         heading.style.font.bold = True
-        for section in formatted_state["bns_sections"]:
+        for section in formatted_state[key]:
             if isinstance(section, dict):
                 section_num = section.get("section_number", "")
                 description = section.get("section_description", "")
@@ -203,60 +192,26 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                     run4 = para2.add_run(relevance)
                     run4.font.size = Pt(10)
         doc.add_paragraph()
-    
-    # BNSS Sections
-    if formatted_state.get("bnss_sections"):
-        heading = doc.add_heading("BHARATIYA NAGARIK SURAKSHA SANHITA (BNSS) SECTIONS", level=1)
-        heading.style.font.bold = True
-        for section in formatted_state["bnss_sections"]:
-            if isinstance(section, dict):
-                section_num = section.get("section_number", "")
-                description = section.get("section_description", "")
-                relevance = section.get("why_section_is_relevant", "")
-                
-                para = doc.add_paragraph()
-                run1 = para.add_run(f"Section {section_num}: ")
-                run1.bold = True
-                run1.font.size = Pt(11)
-                run2 = para.add_run(description)
-                run2.font.size = Pt(11)
-                
-                if relevance:
-                    para2 = doc.add_paragraph()
-                    run3 = para2.add_run("  Relevance: ")
-                    run3.italic = True
-                    run3.font.size = Pt(10)
-                    run4 = para2.add_run(relevance)
-                    run4.font.size = Pt(10)
-        doc.add_paragraph()
-    
-    # BSA Sections
-    if formatted_state.get("bsa_sections"):
-        heading = doc.add_heading("BHARATIYA SAKSHYA ADHINIYAM (BSA) SECTIONS", level=1)
+
+
+def _render_fir_facts(doc: Document, formatted_state: Dict[str, Any]):
+    """FIR FACTS: one line per extracted fact."""
+    if formatted_state.get("fir_facts"):
+        heading = doc.add_heading("FIR FACTS", level=1)
         heading.style.font.bold = True
-        for section in formatted_state["bsa_sections"]:
-            if isinstance(section, dict):
-                section_num = section.get("section_number", "")
-                description = section.get("section_description", "")
-                relevance = section.get("why_section_is_relevant", "")
-                
-                para = doc.add_paragraph()
-                run1 = para.add_run(f"Section {section_num}: ")
-                run1.bold = True
-                run1.font.size = Pt(11)
-                run2 = para.add_run(description)
-                run2.font.size = Pt(11)
-                
-                if relevance:
-                    para2 = doc.add_paragraph()
-                    run3 = para2.add_run("  Relevance: ")
-                    run3.italic = True
-                    run3.font.size = Pt(10)
-                    run4 = para2.add_run(relevance)
-                    run4.font.size = Pt(10)
-        doc.add_paragraph()
-    
-    # Investigation Plan
+        for key, value in formatted_state["fir_facts"].items():
+            key_formatted = key.replace("_", " ").title()
+            para = doc.add_paragraph()
+            run1 = para.add_run(f"{key_formatted}: ")
+            run1.bold = True
+            run1.font.size = Pt(11)
+            run2 = para.add_run(value)
+            run2.font.size = Pt(11)
+        doc.add_paragraph()  # Add spacing
+
+
+def _render_investigation_plan(doc: Document, formatted_state: Dict[str, Any]):
+    """INVESTIGATION PLAN: titled, dated steps."""
     if formatted_state.get("investigation_plan"):
         heading = doc.add_heading("INVESTIGATION PLAN", level=1)
         heading.style.font.bold = True
@@ -285,8 +240,10 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                     para = doc.add_paragraph(item)
                     para.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Timeline
+
+
+def _render_timeline(doc: Document, formatted_state: Dict[str, Any]):
+    """INVESTIGATION & LEGAL TIMELINE."""
     if formatted_state.get("investigation_and_legal_timeline"):
         timeline = formatted_state["investigation_and_legal_timeline"]
         heading = doc.add_heading("INVESTIGATION & LEGAL TIMELINE", level=1)
@@ -305,16 +262,20 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
             para2 = doc.add_paragraph(timeline_str)
             para2.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Evidence Checklist
+
+
+def _render_evidence_checklist(doc: Document, formatted_state: Dict[str, Any]):
+    """EVIDENCE CHECKLIST."""
     if formatted_state.get("evidence_checklist"):
         heading = doc.add_heading("EVIDENCE CHECKLIST", level=1)
         heading.style.font.bold = True
         para = doc.add_paragraph(formatted_state['evidence_checklist'])
         para.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Do's and Don'ts
+
+
+def _render_dos_and_donts(doc: Document, formatted_state: Dict[str, Any]):
+    """DO'S AND DON'TS."""
     if formatted_state.get("dos") or formatted_state.get("donts"):
         heading = doc.add_heading("DO'S AND DON'TS", level=1)
         heading.style.font.bold = True
@@ -335,8 +296,10 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                 para2 = doc.add_paragraph(f"  • {item}")
                 para2.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Prosecution Weaknesses
+
+
+def _render_weaknesses(doc: Document, formatted_state: Dict[str, Any]):
+    """POTENTIAL PROSECUTION WEAKNESSES."""
     if formatted_state.get("potential_prosecution_weaknesses"):
         heading = doc.add_heading("POTENTIAL PROSECUTION WEAKNESSES", level=1)
         heading.style.font.bold = True
@@ -350,8 +313,10 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                 para2 = doc.add_paragraph(f"  {value}")
                 para2.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Historical Cases
+
+
+def _render_historical_cases(doc: Document, formatted_state: Dict[str, Any]):
+    """HISTORICAL CASES: title and summary per case."""
     if formatted_state.get("historical_cases"):
         heading = doc.add_heading("HISTORICAL CASES", level=1)
         heading.style.font.bold = True
@@ -368,8 +333,10 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                 para2 = doc.add_paragraph(f"  {summary}")
                 para2.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Defence Perspective & Rebuttal
+
+
+def _render_defence_rebuttal(doc: Document, formatted_state: Dict[str, Any]):
+    """DEFENCE PERSPECTIVE & PROSECUTION REBUTTAL."""
     if formatted_state.get("defence_perspective_rebuttal"):
         heading = doc.add_heading("DEFENCE PERSPECTIVE & PROSECUTION REBUTTAL", level=1)
         heading.style.font.bold = True
@@ -395,8 +362,10 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                         para2.style.font.size = Pt(11)
                 doc.add_paragraph()
         doc.add_paragraph()
-    
-    # Summary for the Court
+
+
+def _render_summary_for_the_court(doc: Document, formatted_state: Dict[str, Any]):
+    """SUMMARY FOR THE COURT."""
     if formatted_state.get("summary_for_the_court"):
         summary = formatted_state["summary_for_the_court"]
         heading = doc.add_heading("SUMMARY FOR THE COURT", level=1)
@@ -497,8 +466,10 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
                     para17 = doc.add_paragraph(f"  • {prayer}", )
                     para17.style.font.size = Pt(11)
         doc.add_paragraph()
-    
-    # Chargesheet
+
+
+def _render_chargesheet(doc: Document, formatted_state: Dict[str, Any]):
+    """CHARGESHEET."""
     if formatted_state.get("chargesheet"):
         chargesheet = formatted_state["chargesheet"]
         heading = doc.add_heading("CHARGESHEET", level=1)
@@ -611,10 +582,157 @@ def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
         doc.add_paragraph()
 
 
+# Report sections in document order: (name, formatted_state keys the section reads, renderer).
+# A section is rendered only when one of its keys has data; the keys also feed its fragment cache key.
+REPORT_SECTIONS = [
+    ("fir_facts", ("fir_facts",), _render_fir_facts),
+    ("ndps_sections", ("ndps_sections",), partial(_render_act_sections, key="ndps_sections", title="NDPS ACT SECTIONS")),
+    ("bns_sections", ("bns_sections",),
+     partial(_render_act_sections, key="bns_sections", title="BHARATIYA NYAYA SANHITA (BNS) SECTIONS")),
+    ("bnss_sections", ("bnss_sections",),
+     partial(_render_act_sections, key="bnss_sections", title="BHARATIYA NAGARIK SURAKSHA SANHITA (BNSS) SECTIONS")),
+    ("bsa_sections", ("bsa_sections",),
+     partial(_render_act_sections, key="bsa_sections", title="BHARATIYA SAKSHYA ADHINIYAM (BSA) SECTIONS")),
+    ("investigation_plan", ("investigation_plan",), _render_investigation_plan),
+    ("investigation_and_legal_timeline", ("investigation_and_legal_timeline",), _render_timeline),
+    ("evidence_checklist", ("evidence_checklist",), _render_evidence_checklist),
+    ("dos_and_donts", ("dos", "donts"), _render_dos_and_donts),
+    ("potential_prosecution_weaknesses", ("potential_prosecution_weaknesses",), _render_weaknesses),
+    ("historical_cases", ("historical_cases",), _render_historical_cases),
+    ("defence_perspective_rebuttal", ("defence_perspective_rebuttal",), _render_defence_rebuttal),
+    ("summary_for_the_court", ("summary_for_the_court",), _render_summary_for_the_court),
+    ("chargesheet", ("chargesheet",), _render_chargesheet),
+]
+
+
+def format_section_content(doc: Document, formatted_state: Dict[str, Any]):
+    """
+    Format all available sections and add them to the document with proper formatting.
+    
+    Args:
+        doc: Document object
+        formatted_state: Already formatted state dictionary (from format_state_for_display)
+    """
+    for _, _, render in REPORT_SECTIONS:
+        render(doc, formatted_state)
+
+
+def _iter_template_paragraphs(doc: Document):
+    """Body paragraphs, then paragraphs inside table cells."""
+    yield from doc.paragraphs
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                yield from cell.paragraphs
+
+
+def _replace_placeholders(doc: Document, placeholders: Dict[str, str]):
+    """Replace {{name_of_accused}}, {{case_title}}, {{fir_date}} and {{sections_invoked}} in paragraphs and tables."""
+    for paragraph in _iter_template_paragraphs(doc):
+        text = paragraph.text
+        if "{{" in text:
+            text = text.replace("{{name_of_accused}}", placeholders["name_of_accused"])
+            text = text.replace("{{case_title}}", placeholders["case_title"])
+            text = text.replace("{{fir_date}}", placeholders["fir_date"])
+            text = text.replace("{{sections_invoked}}", placeholders["sections_invoked"])
+            if text != paragraph.text:
+                paragraph.clear()
+                run = paragraph.add_run(text)
+                run.font.size = Pt(11)
+
+
+def _prepare_template() -> Tuple[float, bytes]:
+    """
+    The report template with everything that does not depend on the result done once.
+
+    Section renderers set fonts on shared styles (bold headings, 11pt Normal);
+    fragments are rendered in a scratch document, so those style changes are
+    applied to the template here. The {{rest_content}} paragraph is cleared, or
+    a page break added when the template has none, since sections follow it.
+
+    Returns:
+        (template file mtime, prepared template bytes); rebuilt when the file changes
+    """
+    global _prepared_template
+    if not TEMPLATE_PATH.exists():
+        raise FileNotFoundError(f"Template not found: {TEMPLATE_PATH}")
+    mtime = TEMPLATE_PATH.stat().st_mtime
+    with _template_lock:
+        if _prepared_template is None or _prepared_template[0] != mtime:
+            doc = Document(str(TEMPLATE_PATH))
+            for style_name in ("Heading 1", "Heading 2"):
+                if style_name in doc.styles:
+                    doc.styles[style_name].font.bold = True
+            doc.styles["Normal"].font.size = Pt(11)
+
+            rest_content_paragraph = next(
+                (p for p in _iter_template_paragraphs(doc) if "{{rest_content}}" in p.text), None
+            )
+            if rest_content_paragraph:
+                rest_content_paragraph.clear()
+            else:
+                # If placeholder not found, add content at the end
+                doc.add_page_break()
+
+            output = BytesIO()
+            doc.save(output)
+            _prepared_template = (mtime, output.getvalue())
+        return _prepared_template
+
+
+def _scratch_document(template: bytes) -> Document:
+    """Empty per-thread copy of the prepared template, so fragments use the report's style ids."""
+    doc = getattr(_scratch, "doc", None)
+    if doc is None or _scratch.template is not template:
+        doc = Document(BytesIO(template))
+        _scratch.doc = doc
+        _scratch.template = template
+    body = doc.element.body
+    for child in list(body):
+        if child.tag != qn("w:sectPr"):
+            body.remove(child)
+    return doc
+
+
+def render_section_fragment(name: str, keys: Tuple[str, ...], render, formatted_state: Dict[str, Any],
+                            template: Tuple[float, bytes]) -> List[str]:
+    """
+    OOXML body elements for one report section, rendered once per distinct section data.
+
+    Args:
+        name: Section name from REPORT_SECTIONS
+        keys: formatted_state keys the section reads
+        render: Section renderer
+        formatted_state: Output of format_state_for_display
+        template: Result of _prepare_template
+
+    Returns:
+        Serialized <w:p>/<w:tbl> elements, in order
+    """
+    data = [formatted_state.get(key) for key in keys]
+    payload = json.dumps([DOCUMENT_VERSION, template[0], name, data], sort_keys=True, ensure_ascii=False, default=str)
+    cache_key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    cache = get_disk_cache()
+    fragment = cache.get(FRAGMENT_CACHE, cache_key)
+    if fragment is None:
+        doc = _scratch_document(template[1])
+        render(doc, formatted_state)
+        fragment = [
+            etree.tostring(element, encoding="unicode")
+            for element in doc.element.body if element.tag != qn("w:sectPr")
+        ]
+        cache.set(FRAGMENT_CACHE, cache_key, fragment)
+    return fragment
+
+
 def generate_document(workflow_state: Dict[str, Any]) -> bytes:
     """
     Generate a Word document from workflow state.
-    
+
+    Each section is spliced in as a cached OOXML fragment (see
+    render_section_fragment), so only sections whose data changed since an
+    earlier render are rendered again.
+
     Args:
         workflow_state: Complete workflow state dictionary
         
@@ -622,95 +740,38 @@ def generate_document(workflow_state: Dict[str, Any]) -> bytes:
         Bytes of the generated document
     """
     try:
-        # Load template
-        if not TEMPLATE_PATH.exists():
-            raise FileNotFoundError(f"Template not found: {TEMPLATE_PATH}")
-        
-        doc = Document(str(TEMPLATE_PATH))
+        template = _prepare_template()
+        doc = Document(BytesIO(template[1]))
         
-        # Extract FIR placeholders using LLM
-        fir_facts = workflow_state.get("fir_facts", {})
-        pdf_content = workflow_state.get("pdf_content_in_english", "")
-        placeholders = extract_fir_placeholders(fir_facts, pdf_content)
+        # FIR placeholders are extracted during the workflow; older results still need the LLM call
+        placeholders = workflow_state.get("fir_placeholders")
+        if not placeholders:
+            fir_facts = workflow_state.get("fir_facts", {})
+            pdf_content = workflow_state.get("pdf_content_in_english", "")
+            placeholders = extract_fir_placeholders(fir_facts, pdf_content)
+        _replace_placeholders(doc, placeholders)
         
-        # Replace placeholders in all paragraphs
-        for paragraph in doc.paragraphs:
-            text = paragraph.text
-            if "{{" in text:
-                text = text.replace("{{name_of_accused}}", placeholders["name_of_accused"])
-                text = text.replace("{{case_title}}", placeholders["case_title"])
-                text = text.replace("{{fir_date}}", placeholders["fir_date"])
-                text = text.replace("{{sections_invoked}}", placeholders["sections_invoked"])
-                if text != paragraph.text:
-                    paragraph.clear()
-                    run = paragraph.add_run(text)
-                    run.font.size = Pt(11)
-        
-        # Replace placeholders in tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        text = paragraph.text
-                        if "{{" in text:
-                            text = text.replace("{{name_of_accused}}", placeholders["name_of_accused"])
-                            text = text.replace("{{case_title}}", placeholders["case_title"])
-                            text = text.replace("{{fir_date}}", placeholders["fir_date"])
-                            text = text.replace("{{sections_invoked}}", placeholders["sections_invoked"])
-                            if text != paragraph.text:
-                                paragraph.clear()
-                                run = paragraph.add_run(text)
-                                run.font.size = Pt(11)
-        
-        # Find and replace {{rest_content}} placeholder
-        rest_content_found = False
-        rest_content_paragraph = None
-        for paragraph in doc.paragraphs:
-            if "{{rest_content}}" in paragraph.text:
-                rest_content_paragraph = paragraph
-                rest_content_found = True
-                break
-        
-        # Also check in tables
-        if not rest_content_found:
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            if "{{rest_content}}" in paragraph.text:
-                                rest_content_paragraph = paragraph
-                                rest_content_found = True
-                                break
-                        if rest_content_found:
-                            break
-                    if rest_content_found:
-                        break
-                if rest_content_found:
-                    break
-        
-        # Format and add all sections
+        # Format and add all sections after the template content
         from ..routes.utils import format_state_for_display
         formatted_state = format_state_for_display(workflow_state)
         
-        if rest_content_paragraph:
-            # Clear the placeholder paragraph
-            rest_content_paragraph.clear()
-            # Add formatted content starting from this paragraph
-            format_section_content(doc, formatted_state)
-        else:
-            # If placeholder not found, add content at the end
-            doc.add_page_break()
-            format_section_content(doc, formatted_state)
+        body = doc.element.body
+        sect_pr = body.find(qn("w:sectPr"))
+        for name, keys, render in REPORT_SECTIONS:
+            if not any(formatted_state.get(key) for key in keys):
+                continue
+            for xml in render_section_fragment(name, keys, render, formatted_state, template):
+                element = parse_xml(xml)
+                if sect_pr is not None:
+                    sect_pr.addprevious(element)
+                else:
+                    body.append(element)
         
         # Save to bytes
-        from io import BytesIO
         output = BytesIO()
         doc.save(output)
-        output.seek(0)
-        return output.read()
+        return output.getvalue()
         
     except Exception as e:
         logger.error(f"Error generating document: {e}", exc_info=True)
         raise
-
-
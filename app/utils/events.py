@@ -0,0 +1,121 @@
+"""
+Per-job progress event channel.
+
+Events are appended to a list in the shared store backend, so a subscriber on
+any worker sees every event. Subscribers in the publishing process are woken
+immediately; subscribers in other processes pick events up within
+EVENT_POLL_INTERVAL seconds.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", "0.5"))
+
+# Event types
+NODE_STARTED = "node_started"
+NODE_COMPLETED = "node_completed"
+STATUS = "status"
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobEvents:
+    """Append-only event log per job with async subscription."""
+
+    def __init__(self, backend, ttl: Optional[int] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self._listeners: Dict[str, Set[Callable[[], None]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"ndps:events:{job_id}"
+
+    def publish(self, job_id: str, event_type: str, **data) -> dict:
+        """
+        Append an event to the job's log and wake local subscribers.
+
+        Args:
+            job_id: Job identifier
+            event_type: NODE_STARTED, NODE_COMPLETED or STATUS
+            **data: Event payload (node, progress, status, ...)
+
+        Returns:
+            The published event
+        """
+        event = {"type": event_type, "job_id": job_id, "timestamp": time.time(), **data}
+        try:
+            key = self._key(job_id)
+            self.backend.rpush(key, json.dumps(event, default=str).encode())
+            if self.ttl:
+                self.backend.expire(key, self.ttl)
+        except Exception as e:
+            # Progress events must never break the workflow itself
+            logger.warning(f"Could not publish event for job {job_id}: {e}")
+            return event
+
+        with self._lock:
+            listeners = list(self._listeners.get(job_id, ()))
+        for notify in listeners:
+            notify()
+        return event
+
+    def read(self, job_id: str, start: int = 0) -> List[dict]:
+        """Return events from index `start` onwards."""
+        return [json.loads(raw) for raw in self.backend.lrange(self._key(job_id), start, -1)]
+
+    async def subscribe(self, job_id: str, start: int = 0, heartbeat: float = 15.0) -> AsyncIterator[Tuple[int, Optional[dict]]]:
+        """
+        Yield (index, event) pairs as they are published, ending after a terminal status event.
+
+        Yields (index, None) when nothing arrived for `heartbeat` seconds so callers can keep
+        the connection alive.
+
+        Args:
+            job_id: Job identifier
+            start: Index of the first event to deliver (for resuming)
+            heartbeat: Idle seconds between keep-alive yields
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+
+        def notify():
+            loop.call_soon_threadsafe(wakeup.set)
+
+        with self._lock:
+            self._listeners.setdefault(job_id, set()).add(notify)
+        try:
+            index = start
+            last_sent = time.monotonic()
+            while True:
+                wakeup.clear()
+                events = await asyncio.to_thread(self.read, job_id, index)
+                for event in events:
+                    index += 1
+                    last_sent = time.monotonic()
+                    yield index, event
+                    if event["type"] == STATUS and event.get("status") in TERMINAL_STATUSES:
+                        return
+                if time.monotonic() - last_sent >= heartbeat:
+                    last_sent = time.monotonic()
+                    yield index, None
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=EVENT_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                listeners = self._listeners.get(job_id)
+                if listeners is not None:
+                    listeners.discard(notify)
+                    if not listeners:
+                        del self._listeners[job_id]
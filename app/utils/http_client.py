@@ -0,0 +1,203 @@
+"""
+Shared HTTP clients for external APIs (Indian Kanoon).
+
+One keep-alive connection pool per process instead of a fresh TCP+TLS
+handshake per call, a per-host concurrency limit shared by every workflow
+running in the process, and configurable connect/read timeouts. Both the
+sync client (requests) and the async client (httpx) record per-host call
+counts, errors and latency; the sync client also counts new connections, so
+connection reuse is visible in stats().
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+from typing import Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+# Concurrent requests allowed per host across all jobs in this process
+HTTP_HOST_CONCURRENCY = int(os.getenv("HTTP_HOST_CONCURRENCY", "8"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", str(HTTP_HOST_CONCURRENCY)))
+
+# Latency samples kept per host for percentiles
+LATENCY_WINDOW = 500
+
+
+class _HostStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float, error: bool):
+        with self._lock:
+            self.requests += 1
+            self.errors += error
+            self.latencies.append(latency)
+
+    def record_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+        percentile = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reused_connections": max(0, self.requests - self.new_connections),
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+        }
+
+
+class HttpClient:
+    """Pooled sync/async HTTP client with per-host concurrency limits and metrics."""
+
+    def __init__(self, host_concurrency: int = HTTP_HOST_CONCURRENCY, pool_size: int = HTTP_POOL_SIZE,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, read_timeout: float = HTTP_READ_TIMEOUT):
+        self.host_concurrency = host_concurrency
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _HostStats] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_semaphores: Dict[Tuple[int, str], asyncio.Semaphore] = {}
+        self._async_clients: Dict[int, httpx.AsyncClient] = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self._instrument(adapter)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _host_stats(self, host: str) -> _HostStats:
+        with self._lock:
+            return self._stats.setdefault(host, _HostStats())
+
+    def _instrument(self, adapter: HTTPAdapter):
+        """Count connections opened by the adapter's pools (requests made minus these were reused)."""
+        client = self
+
+        def counting(pool_class):
+            class CountingPool(pool_class):
+                def _new_conn(self):
+                    client._host_stats(self.host).record_connection()
+                    return super()._new_conn()
+            return CountingPool
+
+        adapter.poolmanager.pool_classes_by_scheme = {
+            "http": counting(HTTPConnectionPool),
+            "https": counting(HTTPSConnectionPool),
+        }
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.host_concurrency)
+            return self._semaphores[host]
+
+    def _timeout(self, timeout: Optional[float]) -> Tuple[float, float]:
+        read = self.read_timeout if timeout is None else timeout
+        return min(self.connect_timeout, read), read
+
+    def request(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared pool, waiting for a per-host slot first.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            timeout: Read timeout in seconds (default HTTP_READ_TIMEOUT); connect timeout is HTTP_CONNECT_TIMEOUT
+            **kwargs: Passed to requests.Session.request (headers, json, params, ...)
+        """
+        host = urlsplit(url).hostname or ""
+        stats = self._host_stats(host)
+        with self._semaphore(host):
+            start = time.perf_counter()
+            error = True
+            try:
+                response = self.session.request(method, url, timeout=self._timeout(timeout), **kwargs)
+                error = False
+                return response
+            finally:
+                stats.record(time.perf_counter() - start, error)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # httpx clients and asyncio semaphores are bound to the event loop that created them
+        loop_id = id(asyncio.get_running_loop())
+        with self._lock:
+            if loop_id not in self._async_clients:
+                self._async_clients[loop_id] = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=self.host_concurrency * 4,
+                                        max_keepalive_connections=self.host_concurrency),
+                    timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                )
+            return self._async_clients[loop_id]
+
+    def _async_semaphore(self, host: str) -> asyncio.Semaphore:
+        key = (id(asyncio.get_running_loop()), host)
+        with self._lock:
+            if key not in self._async_semaphores:
+                self._async_semaphores[key] = asyncio.Semaphore(self.host_concurrency)
+            return self._async_semaphores[key]
+
+    async def arequest(self, method: str, url: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Async variant of request() using a pooled httpx.AsyncClient."""
+        host = urlsplit(url).hostname or ""
+        stats = self._host_stats(host)
+        client = self._async_client()
+        connect, read = self._timeout(timeout)
+        async with self._async_semaphore(host):
+            start = time.perf_counter()
+            error = True
+            try:
+                response = await client.request(method, url, timeout=httpx.Timeout(read, connect=connect), **kwargs)
+                error = False
+                return response
+            finally:
+                stats.record(time.perf_counter() - start, error)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-host requests, errors, new/reused connections and latency percentiles (seconds)."""
+        with self._lock:
+            hosts = dict(self._stats)
+        return {host: stats.snapshot() for host, stats in hosts.items()}
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Process-wide HttpClient, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
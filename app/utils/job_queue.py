@@ -0,0 +1,177 @@
+"""
+Bounded job queue and worker pool for workflow processing.
+
+Jobs are ordered by priority, then round-robin across sessions within the same
+priority (so one session submitting many jobs cannot starve the others), then
+FIFO within a session. A fixed number of worker threads drain the queue.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Priority levels (lower runs first)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Duration assumed for ETA estimates until real jobs have completed
+DEFAULT_JOB_DURATION = 180.0
+
+
+class _QueuedJob:
+    __slots__ = ("job_id", "session_id", "priority", "func", "args", "kwargs", "enqueued_at")
+
+    def __init__(self, job_id, session_id, priority, func, args, kwargs):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueued_at = time.time()
+
+
+class JobQueue:
+    """
+    Priority queue with per-session fairness drained by a fixed worker pool.
+
+    Workers are started lazily on the first submission.
+    """
+
+    def __init__(self, worker_count: int = 2, name: str = "workflow"):
+        self.worker_count = max(1, worker_count)
+        self.name = name
+        self._cond = threading.Condition()
+        # priority -> OrderedDict(session_id -> deque of jobs); session order is the round-robin order
+        self._pending: Dict[int, "OrderedDict[str, deque]"] = {}
+        self._running: Dict[str, float] = {}  # job_id -> start time
+        self._workers: List[threading.Thread] = []
+        self._avg_duration = DEFAULT_JOB_DURATION
+        self._completed = 0
+
+    def submit(self, job_id: str, session_id: str, func: Callable, *args: Any,
+               priority: int = PRIORITY_NORMAL, **kwargs: Any):
+        """
+        Queue a job for execution.
+
+        Args:
+            job_id: Unique job identifier
+            session_id: Session the job belongs to (fairness key)
+            func: Callable to run
+            priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        job = _QueuedJob(job_id, session_id, priority, func, args, kwargs)
+        with self._cond:
+            sessions = self._pending.setdefault(priority, OrderedDict())
+            sessions.setdefault(session_id, deque()).append(job)
+            self._ensure_workers()
+            self._cond.notify()
+        logger.info(f"📥 [{self.name}] Queued job {job_id} (session: {session_id}, priority: {priority})")
+
+    def _ensure_workers(self):
+        self._workers = [t for t in self._workers if t.is_alive()]
+        while len(self._workers) < self.worker_count:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"{self.name}-worker-{len(self._workers)}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _pop_next(self) -> Optional[_QueuedJob]:
+        for priority in sorted(self._pending):
+            sessions = self._pending[priority]
+            if not sessions:
+                continue
+            session_id, jobs = next(iter(sessions.items()))
+            job = jobs.popleft()
+            # Rotate the session to the back so other sessions go next
+            del sessions[session_id]
+            if jobs:
+                sessions[session_id] = jobs
+            if not sessions:
+                del self._pending[priority]
+            return job
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                job = self._pop_next()
+                while job is None:
+                    self._cond.wait()
+                    job = self._pop_next()
+                started_at = time.time()
+                self._running[job.job_id] = started_at
+
+            try:
+                job.func(*job.args, **job.kwargs)
+            except Exception as e:
+                logger.error(f"❌ [{self.name}] Job {job.job_id} raised: {e}", exc_info=True)
+            finally:
+                duration = time.time() - started_at
+                with self._cond:
+                    self._running.pop(job.job_id, None)
+                    # Exponential moving average of job duration for ETA estimates
+                    self._completed += 1
+                    weight = 0.2 if self._completed > 1 else 1.0
+                    self._avg_duration = (1 - weight) * self._avg_duration + weight * duration
+
+    def _dispatch_order(self) -> List[str]:
+        """Job ids in the order workers will pick them up."""
+        order = []
+        for priority in sorted(self._pending):
+            queues = [list(jobs) for jobs in self._pending[priority].values()]
+            depth = 0
+            while any(depth < len(q) for q in queues):
+                for q in queues:
+                    if depth < len(q):
+                        order.append(q[depth].job_id)
+                depth += 1
+        return order
+
+    def position(self, job_id: str) -> Optional[dict]:
+        """
+        Get queue position and estimated start time for a queued job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            {"queue_position": int (1 = next to start), "estimated_start_at": epoch seconds}
+            or None if the job is not waiting in this queue
+        """
+        with self._cond:
+            order = self._dispatch_order()
+            if job_id not in order:
+                return None
+            index = order.index(job_id)
+            now = time.time()
+            avg = self._avg_duration
+            # Simulate workers becoming free: running jobs finish after ~avg, queued jobs ahead take avg each
+            free_at = [now + max(0.0, avg - (now - start)) for start in self._running.values()]
+            free_at += [now] * (self.worker_count - len(free_at))
+            heapq.heapify(free_at)
+            for _ in range(index):
+                heapq.heappush(free_at, heapq.heappop(free_at) + avg)
+            return {
+                "queue_position": index + 1,
+                "estimated_start_at": free_at[0],
+            }
+
+    def stats(self) -> dict:
+        """Current queue depth, running job count and average job duration."""
+        with self._cond:
+            return {
+                "queued": len(self._dispatch_order()),
+                "running": len(self._running),
+                "workers": self.worker_count,
+                "avg_job_seconds": round(self._avg_duration, 1),
+            }
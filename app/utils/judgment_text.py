@@ -0,0 +1,151 @@
+"""
+Local (no LLM) text handling for Indian Kanoon judgments.
+
+Judgments are cleaned with paragraph breaks kept (blank line between
+paragraphs), so they can be split into paragraphs and packed into chunks for
+map-reduce summarization without cutting a paragraph in half.
+
+select_key_passages is an extractive pre-pass: paragraphs are scored for
+signals that matter to NDPS prosecution analysis and only the best ones, up
+to a token budget, are sent to the summarizer. Recitals and citation lists
+score low and are dropped first.
+"""
+
+import os
+import re
+import math
+from typing import List
+
+# Roughly 8K tokens of legal text per chunk (1 token ≈ 2.5-3 characters)
+SUMMARY_CHUNK_CHARS = 24000
+
+# Same conservative estimate as limit_content_for_llm
+CHARS_PER_TOKEN = 2.5
+
+# Summarizer input budget for extractive selection; 0 sends the full judgment
+KEY_PASSAGE_TOKEN_BUDGET = int(os.getenv("KEY_PASSAGE_TOKEN_BUDGET", "6000"))
+
+# (weight, pattern); a paragraph scores weight per match, counting at most 3 matches per signal
+NDPS_SIGNALS = [
+    (3, re.compile(r"\b(section|sec\.?|u/s\.?|s\.)\s*(50|52-?a|37|42|43|57)\b", re.I)),
+    (3, re.compile(r"conscious(ly)?\s+possess", re.I)),
+    (2, re.compile(r"(commercial|small|intermediate)\s+quantity|\b\d+(\.\d+)?\s*(kg|kgs|kilograms?|grams?|gms?)\b", re.I)),
+    (2, re.compile(r"\bbail\b|twin conditions|enlarged on", re.I)),
+    (2, re.compile(r"acquit|convict|sentence|rigorous imprisonment|\bfine of", re.I)),
+    (2, re.compile(r"sampl(e|es|ing)\b|\bf\.?s\.?l\b|chemical examiner|forensic", re.I)),
+    (2, re.compile(r"search|seiz(ed|ure)|recover(ed|y)|panchnama|gazetted officer|magistrate", re.I)),
+    (1, re.compile(r"contraband|narcotic|psychotropic|ganja|charas|heroin|opium|poppy|cannabis|smack|mephedrone", re.I)),
+]
+# The court's decision: always wanted, wherever it appears
+OPERATIVE_ORDER = re.compile(
+    r"\b(appeal|petition|application|revision)\s+(is|stands|are)\s+(hereby\s+)?(allowed|dismissed|rejected|disposed)"
+    r"|in the result|for the (foregoing|aforesaid|reasons)|ordered accordingly|we (hold|direct)|it is (hereby )?ordered",
+    re.I,
+)
+CITATION = re.compile(r"\b(SCC|AIR|Cri\s*\.?\s*L\.?\s*J|SCR|SCALE|Crl\.?\s*A\.?)\b|\bv(s|/s)?\.\s", re.I)
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_BREAK = re.compile(r"(?<=[.;:])\s+(?=[A-Z(\"'0-9])")
+
+
+def split_paragraphs(text: str, max_chars: int = SUMMARY_CHUNK_CHARS) -> List[str]:
+    """
+    Split a cleaned judgment into paragraphs.
+
+    Text cached before paragraph breaks were kept is a single line; it (and any
+    paragraph longer than max_chars) is split at sentence boundaries instead.
+    """
+    paragraphs = []
+    for paragraph in PARAGRAPH_BREAK.split(text or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            paragraphs.append(paragraph)
+            continue
+        current = ""
+        for sentence in SENTENCE_BREAK.split(paragraph):
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                paragraphs.append(current)
+                current = ""
+            current = f"{current} {sentence}" if current else sentence
+            while len(current) > max_chars:  # A single run-on "sentence"
+                paragraphs.append(current[:max_chars])
+                current = current[max_chars:]
+        if current:
+            paragraphs.append(current)
+    return paragraphs
+
+
+def chunk_paragraphs(paragraphs: List[str], max_chars: int = SUMMARY_CHUNK_CHARS) -> List[str]:
+    """Pack consecutive paragraphs into chunks of at most max_chars, keeping their order."""
+    chunks = []
+    current = []
+    size = 0
+    for paragraph in paragraphs:
+        if current and size + len(paragraph) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current = []
+            size = 0
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _score_paragraph(paragraph: str) -> float:
+    score = sum(weight * min(len(pattern.findall(paragraph)), 3) for weight, pattern in NDPS_SIGNALS)
+    if OPERATIVE_ORDER.search(paragraph):
+        score += 6
+    # Citation lists and recitals of precedents are long and say little about this case
+    score -= min(len(CITATION.findall(paragraph)), 6)
+    # Density, so long paragraphs do not win on length alone
+    return score / math.sqrt(max(len(paragraph), 200) / 500)
+
+
+def select_key_passages(text: str, token_budget: int = KEY_PASSAGE_TOKEN_BUDGET) -> str:
+    """
+    Keep the highest-scoring paragraphs of a judgment up to token_budget, in original order.
+
+    The first paragraph (court, parties' roles, case number) and the last two
+    (usually the operative order) are always kept. Gaps between kept
+    paragraphs are marked with "[...]".
+
+    Args:
+        text: Cleaned judgment text (paragraphs separated by blank lines)
+        token_budget: Approximate token limit for the selection; 0 or less disables selection
+
+    Returns:
+        The selected passages, or the text unchanged if it already fits the budget
+    """
+    max_chars = int(token_budget * CHARS_PER_TOKEN)
+    if token_budget <= 0 or len(text) <= max_chars:
+        return text
+
+    paragraphs = split_paragraphs(text, max_chars=2000)
+    last = len(paragraphs) - 1
+    pinned = {0, last - 1, last} if last >= 2 else set(range(len(paragraphs)))
+    ranked = sorted(range(len(paragraphs)), key=lambda i: (i not in pinned, -_score_paragraph(paragraphs[i])))
+
+    kept = set()
+    size = 0
+    for index in ranked:
+        if index not in pinned and _score_paragraph(paragraphs[index]) <= 0:
+            break  # Ranked by score, so the rest carry no signal either
+        length = len(paragraphs[index]) + 2
+        if size + length > max_chars:
+            continue  # A shorter, lower-ranked paragraph may still fit
+        kept.add(index)
+        size += length
+
+    parts = []
+    previous = -1
+    for index in sorted(kept):
+        if index != previous + 1:
+            parts.append("[...]")
+        parts.append(paragraphs[index])
+        previous = index
+    if previous != last:
+        parts.append("[...]")
+    return "\n\n".join(parts)
@@ -1,39 +1,226 @@
 import fitz  # pip install pymupdf
+import os
+import hashlib
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Documents with at least this many pages are extracted in page ranges across worker processes
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "40"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PAGES_PER_RANGE = int(os.getenv("PDF_PAGES_PER_RANGE", "16"))
+
+# Pages whose text layer has fewer characters than this are treated as scans and OCR'd (needs a local Tesseract)
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() == "true"
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "50"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", os.path.join("data", "ocr_cache"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all extractions, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process can deadlock the children
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _tesseract_available() -> bool:
+    """True when PyMuPDF can locate Tesseract language data."""
+    try:
+        fitz.get_tessdata()
+        return True
+    except Exception:
+        return False
+
+
+def _needs_ocr(text: str) -> bool:
+    return len(text.strip()) < OCR_MIN_CHARS
+
+
+def _ocr_page(page) -> str | None:
+    """
+    OCR a single page, caching the text on disk by a hash of the rendered page image.
+
+    Returns:
+        OCR text, or None if OCR failed
+    """
+    pix = page.get_pixmap(dpi=OCR_DPI)
+    digest = hashlib.sha256(f"{OCR_LANGUAGE}:{OCR_DPI}:{pix.width}x{pix.height}:{pix.n}:".encode())
+    digest.update(pix.samples)
+    cache_path = os.path.join(OCR_CACHE_DIR, f"{digest.hexdigest()}.txt")
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    try:
+        ocr_doc = fitz.open("pdf", pix.pdfocr_tobytes(language=OCR_LANGUAGE))
+        text = ocr_doc[0].get_text()
+        ocr_doc.close()
+    except Exception as e:
+        logger.warning(f"⚠️ [read_pdf] OCR failed for page {page.number + 1}: {e}")
+        return None
+
+    os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, cache_path)
+    return text
+
+
+def _best_text(text: str, ocr_text: str | None) -> str:
+    """Keep the OCR text only when it recovered more than the text layer had."""
+    if ocr_text and len(ocr_text.strip()) > len(text.strip()):
+        return ocr_text
+    return text
+
+
+def _open(pdf_bytes: bytes | None, pdf_path: str | None):
+    if pdf_bytes is not None:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    return fitz.open(pdf_path)
+
+
+def _extract_page_range(pdf_bytes: bytes | None, pdf_path: str | None, start: int, end: int, ocr: bool) -> List[str]:
+    """Extract text for pages [start, end) with the worker's own document handle, OCR'ing scanned pages."""
+    doc = _open(pdf_bytes, pdf_path)
+    try:
+        texts = []
+        for i in range(start, end):
+            text = doc[i].get_text()
+            if ocr and _needs_ocr(text):
+                text = _best_text(text, _ocr_page(doc[i]))
+            texts.append(text)
+        return texts
+    finally:
+        doc.close()
+
+
+def _ocr_pages(pdf_bytes: bytes | None, pdf_path: str | None, page_numbers: List[int]) -> dict:
+    """OCR the given pages with the worker's own document handle. Returns {page_number: text or None}."""
+    doc = _open(pdf_bytes, pdf_path)
+    try:
+        return {i: _ocr_page(doc[i]) for i in page_numbers}
+    finally:
+        doc.close()
+
+
+def iter_pdf_pages(pdf_bytes: bytes | None = None, pdf_path: str | None = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) in page order as pages are extracted.
+
+    Small documents are read in-process page by page. Large documents are split
+    into page ranges that worker processes extract in parallel; ranges are yielded
+    in order as soon as each one (and all before it) is done, so callers can start
+    on the first pages before the last page is parsed.
+
+    Pages with less than OCR_MIN_CHARS of text (scans) are OCR'd on the process
+    pool when Tesseract is available; everything else skips OCR entirely.
+
+    Args:
+        pdf_bytes: PDF content (preferred when both are given)
+        pdf_path: Path to the PDF on disk
+
+    Returns:
+        Iterator of (0-based page number, page text)
+    """
+    if pdf_bytes is None and not pdf_path:
+        raise ValueError("Either pdf_bytes or pdf_path is required in state.")
+
+    ocr = OCR_ENABLED and _tesseract_available()
+    if OCR_ENABLED and not ocr:
+        logger.warning("⚠️ [read_pdf] Tesseract not found - scanned pages will not be OCR'd")
+
+    # Workers re-open the file from disk when possible instead of receiving a copy of the bytes
+    source_bytes = None if pdf_path and pdf_bytes is None else pdf_bytes
+
+    doc = _open(pdf_bytes, pdf_path)
+    page_count = doc.page_count
+    if page_count < PARALLEL_PAGE_THRESHOLD or PDF_WORKERS <= 1:
+        try:
+            texts = [doc[i].get_text() for i in range(page_count)]
+        finally:
+            doc.close()
+        scanned = [i for i, text in enumerate(texts) if _needs_ocr(text)] if ocr else []
+        if not scanned:
+            yield from enumerate(texts)
+            return
+
+        logger.info(f"🔍 [read_pdf] OCR'ing {len(scanned)} of {page_count} pages with little or no text layer")
+        pool = _get_pool()
+        batches = [scanned[i::PDF_WORKERS] for i in range(min(PDF_WORKERS, len(scanned)))]
+        futures = {}
+        for batch in batches:
+            future = pool.submit(_ocr_pages, source_bytes, pdf_path, batch)
+            futures.update({i: future for i in batch})
+        for i, text in enumerate(texts):
+            if i in futures:
+                text = _best_text(text, futures[i].result()[i])
+            yield i, text
+        return
+    doc.close()
+
+    ranges = [(start, min(start + PAGES_PER_RANGE, page_count)) for start in range(0, page_count, PAGES_PER_RANGE)]
+    logger.info(f"📑 [read_pdf] Extracting {page_count} pages in {len(ranges)} ranges across {PDF_WORKERS} workers")
+    pool = _get_pool()
+    futures = [pool.submit(_extract_page_range, source_bytes, pdf_path, start, end, ocr) for start, end in ranges]
+    try:
+        for (start, _), future in zip(ranges, futures):
+            for offset, text in enumerate(future.result()):
+                yield start + offset, text
+    finally:
+        for future in futures:
+            future.cancel()
+
 
 def read_pdf(state: dict) -> dict:
     """
-    Read PDF from state (pdf_bytes or pdf_path) and return {"pdf_content_in_english": text}.
-    Assumes PDF is already in English - no translation needed.
-    No files are written to disk.
+    Read PDF from state (pdf_bytes or pdf_path) and return {"pdf_content": text, "pdf_content_in_english": text}.
+    translate_to_english replaces pdf_content_in_english when the FIR has vernacular text.
+    The PDF itself is never written to disk; only OCR text is cached (OCR_CACHE_DIR).
+
+    Also returns "pdf_pages": [{"page", "start", "end"}] character offsets of every
+    page within the joined text, so downstream citations can point at a page.
     """
     import sys
     logger.info("📖 [read_pdf] Starting PDF reading...")
     sys.stdout.flush()  # Force flush to see logs immediately
-    
+
     pdf_bytes = state.get("pdf_bytes")
     pdf_path = state.get("pdf_path")
 
     if pdf_bytes is not None:
         logger.debug(f"📄 [read_pdf] Reading from pdf_bytes (size: {len(pdf_bytes)} bytes)")
-        sys.stdout.flush()
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     elif pdf_path:
         logger.debug(f"📄 [read_pdf] Reading from pdf_path: {pdf_path}")
-        sys.stdout.flush()
-        doc = fitz.open(pdf_path)
     else:
         logger.error("❌ [read_pdf] Neither pdf_bytes nor pdf_path found in state")
         sys.stdout.flush()
         raise ValueError("Either pdf_bytes or pdf_path is required in state.")
+    sys.stdout.flush()
 
-    text = [page.get_text() for page in doc]
-    doc.close()
+    text = []
+    pages = []
+    offset = 0
+    for page_number, page_text in iter_pdf_pages(pdf_bytes, pdf_path):
+        if text:
+            offset += 1  # "\n" separator
+        pages.append({"page": page_number + 1, "start": offset, "end": offset + len(page_text)})
+        text.append(page_text)
+        offset += len(page_text)
     final_text = "\n".join(text)
     logger.info(f"✅ [read_pdf] PDF read successfully. Extracted {len(final_text)} characters from {len(text)} pages")
     sys.stdout.flush()  # Force flush to see logs immediately
-    # Return as pdf_content_in_english since PDF is already in English
-    return {"pdf_content_in_english": final_text}
+    # English until translate_to_english finds vernacular text to replace
+    return {"pdf_content": final_text, "pdf_content_in_english": final_text, "pdf_pages": pages}
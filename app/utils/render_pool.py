@@ -0,0 +1,90 @@
+"""
+Bounded worker pool for rendering reports off the event loop.
+
+Document rendering is synchronous python-docx work (plus an LLM call for
+results that predate stored placeholders), so async routes hand it to this
+pool instead of running it on the uvicorn event loop. Renders are
+single-flight per key: a download that arrives while the same report is
+already rendering (for example the pre-render started when its workflow
+completed) waits for that render instead of starting another. At most
+max_pending renders are queued or running; further submissions are refused
+with RenderPoolFull.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPoolFull(Exception):
+    """Raised when the render pool already has max_pending renders queued or running."""
+
+
+class RenderPool:
+    """Thread pool with a pending-work limit and per-key single-flight."""
+
+    def __init__(self, worker_count: int = 2, max_pending: int = 16, name: str = "render"):
+        self.worker_count = max(1, worker_count)
+        self.max_pending = max(self.worker_count, max_pending)
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, key: str, func: Callable, *args: Any, **kwargs: Any) -> Future:
+        """
+        Run func(*args, **kwargs) on the pool, or join the in-flight render with the same key.
+
+        Args:
+            key: Identifies the render (e.g. workflow id plus ETag)
+            func: Callable to run
+
+        Returns:
+            concurrent.futures.Future with the result
+
+        Raises:
+            RenderPoolFull: If max_pending renders are already queued or running
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if len(self._inflight) >= self.max_pending:
+                raise RenderPoolFull(f"{len(self._inflight)} renders already pending")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.worker_count, thread_name_prefix=self.name)
+            future = self._executor.submit(func, *args, **kwargs)
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return future
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"❌ [{self.name}] Render {key} raised: {future.exception()}")
+
+    async def run(self, key: str, func: Callable, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Await a render from async code without blocking the event loop.
+
+        When the timeout expires the render keeps running in the pool (its
+        result is still cached by func), so a retry usually finds it done.
+
+        Raises:
+            RenderPoolFull: See submit
+            asyncio.TimeoutError: If the render does not finish within timeout seconds
+        """
+        future = self.submit(key, func, *args, **kwargs)
+        # shield: a timed-out or disconnected request must not cancel a render others may be waiting on
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+
+    def stats(self) -> dict:
+        """Renders queued or running."""
+        with self._lock:
+            return {"workers": self.worker_count, "pending": len(self._inflight), "max_pending": self.max_pending}
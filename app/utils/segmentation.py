@@ -0,0 +1,211 @@
+"""
+Layout-aware segmentation of FIR bundles.
+
+An FIR bundle usually contains several documents one after another: the FIR
+form and complaint narrative, seizure memo/panchnama, Section 50 notice,
+sampling memo, arrest memo and sometimes an FSL report. `segment_fir` labels
+those spans using headings and keywords (no LLM call), and `get_node_content`
+gives each node only the segments it declares in NODE_SEGMENTS.
+
+Headings must start their line and look like one (short, upper or title
+case); the FIR span opens only once, so per-page "FIR No." headers do not
+relabel the rest of the bundle. When no headings are found (a plain
+single-document FIR), segmentation yields mostly tiny spans, or the selected
+segments are too short to be useful, nodes get the full text as before.
+"""
+
+import re
+import bisect
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Segment types
+FIR = "fir"
+COMPLAINT = "complaint"
+SEIZURE_MEMO = "seizure_memo"
+SECTION_50_NOTICE = "section_50_notice"
+SAMPLING_MEMO = "sampling_memo"
+ARREST_MEMO = "arrest_memo"
+FSL_REPORT = "fsl_report"
+
+SEGMENT_LABELS = {
+    FIR: "FIR",
+    COMPLAINT: "Complaint / narrative",
+    SEIZURE_MEMO: "Seizure memo / panchnama",
+    SECTION_50_NOTICE: "Section 50 notice",
+    SAMPLING_MEMO: "Sampling memo",
+    ARREST_MEMO: "Arrest memo",
+    FSL_REPORT: "FSL report",
+}
+
+# Optional numbering or annexure label before a heading ("3.", "(b)", "Annexure-II:")
+HEADING_PREFIX = r"^\s*(?:(?:annexure|exhibit|enclosure)\s*[-\w]{0,6}\s*[:.\-]?\s*|\(?\w{1,3}[.)]\s+)?"
+
+# Heading patterns, most specific first ("sampling panchnama" must not be taken for a seizure panchnama).
+# Each must match at the start of the line (after HEADING_PREFIX).
+HEADING_PATTERNS = [(segment_type, re.compile(HEADING_PREFIX + f"(?:{pattern})", re.I)) for segment_type, pattern in [
+    (SECTION_50_NOTICE, r"(notice|intimation|option).{0,40}(section|sec\.?|u/s\.?)\s*50\b|(section|sec\.?|u/s\.?)\s*50\b.{0,40}(notice|ndps)"),
+    (SAMPLING_MEMO, r"sampl(e|ing)\s*(memo|panchnama|mahazar|seal)|memo of sampl|test\s*memo|form\s*(no\.?)?\s*95"),
+    (ARREST_MEMO, r"arrest\s*(memo|panchnama|mahazar)|memo of arrest|grounds of arrest|intimation of arrest"),
+    (FSL_REPORT, r"(f\.?s\.?l\.?|forensic science laboratory|chemical examiner).{0,40}(report|result|opinion)"
+                 r"|(examination )?report of (the )?(f\.?s\.?l|forensic|chemical)|examination report"),
+    (SEIZURE_MEMO, r"(seizure|recovery)\s*(memo|panchnama|mahazar|list)|panchnama|mahazar|memo of seizure"),
+    (COMPLAINT, r"complaint|statement of (the )?(complainant|informant)|first information contents|fariyad|brief facts|facts of the case"),
+    (FIR, r"first information report|f\.?\s?i\.?\s?r\.?\s*(no|number)\b"),
+]]
+
+# Headings are short lines shaped like a title; PDF text is hard-wrapped, so a narrative
+# line that happens to start with "panchnama ..." is not a heading
+MAX_HEADING_LENGTH = 80
+MAX_HEADING_WORDS = 12
+MIN_HEADING_CAPITALIZED = 0.5  # Share of words (4+ letters) that must be capitalized
+
+# Below this many characters the selected segments are not trusted and the full text is used
+MIN_SEGMENT_CHARS = 300
+
+# Segmentation with more than half of its spans shorter than this (and at least
+# MIN_SPANS_FOR_TINY_CHECK spans) is treated as noise: the text stays one span
+TINY_SPAN_CHARS = 200
+MIN_SPANS_FOR_TINY_CHECK = 4
+
+# Segments each node needs; nodes not listed (or mapped to None) receive the full text.
+# FIR is always included: text before the first recognised heading (often the whole
+# narrative, including seizure and sampling details) is labelled FIR.
+NODE_SEGMENTS: Dict[str, Optional[List[str]]] = {
+    "ndps_legal_mapping": [FIR, COMPLAINT, SEIZURE_MEMO, SAMPLING_MEMO, FSL_REPORT],
+    "bns_legal_mapping": [FIR, COMPLAINT, ARREST_MEMO],
+    "bnss_legal_mapping": [FIR, COMPLAINT, SEIZURE_MEMO, SECTION_50_NOTICE, SAMPLING_MEMO, ARREST_MEMO],
+    "bsa_legal_mapping": [FIR, COMPLAINT, SEIZURE_MEMO, SECTION_50_NOTICE, SAMPLING_MEMO, ARREST_MEMO, FSL_REPORT],
+    "generate_evidence_checklist": [FIR, COMPLAINT, SEIZURE_MEMO, SAMPLING_MEMO, SECTION_50_NOTICE, FSL_REPORT],
+    "investigation_plan": [FIR, COMPLAINT, SEIZURE_MEMO, SECTION_50_NOTICE, SAMPLING_MEMO, ARREST_MEMO, FSL_REPORT],
+}
+
+
+def _looks_like_heading(line: str) -> bool:
+    """Short, title-shaped line: mostly uppercase or title case, no sentence body."""
+    if not line or len(line) > MAX_HEADING_LENGTH or line[-1] in ",;":
+        return False
+    words = line.split()
+    if len(words) > MAX_HEADING_WORDS:
+        return False
+    letters = [c for c in line if c.isalpha()]
+    if not letters:
+        return False
+    if sum(c.isupper() for c in letters) >= 0.6 * len(letters):
+        return True
+    long_words = [w for w in (re.sub(r"[^A-Za-z]", "", word) for word in words) if len(w) >= 4]
+    if not long_words:
+        return False
+    return sum(w[0].isupper() for w in long_words) >= MIN_HEADING_CAPITALIZED * len(long_words)
+
+
+def _classify_heading(line: str) -> Optional[str]:
+    stripped = line.strip()
+    if not _looks_like_heading(stripped):
+        return None
+    for segment_type, pattern in HEADING_PATTERNS:
+        if pattern.match(stripped):
+            return segment_type
+    return None
+
+
+def _page_at(offset: int, page_starts: List[int]) -> Optional[int]:
+    if not page_starts:
+        return None
+    return max(bisect.bisect_right(page_starts, offset), 1)
+
+
+def segment_text(text: str, pages: Optional[List[dict]] = None) -> List[dict]:
+    """
+    Split FIR text into labelled spans at recognised headings.
+
+    Args:
+        text: Full FIR text
+        pages: Optional [{"page", "start", "end"}] offsets from read_pdf
+
+    Returns:
+        [{"type", "heading", "start", "end", "page_start", "page_end"}] covering the whole text;
+        text before the first heading is labelled "fir". A single "fir" span is returned
+        when segmentation finds mostly tiny spans.
+    """
+    page_starts = [p["start"] for p in pages or []]
+    spans = []
+    current = {"type": FIR, "heading": None, "start": 0}
+    offset = 0
+    fir_closed = False
+    for line in text.splitlines(keepends=True):
+        segment_type = _classify_heading(line)
+        # The FIR comes first; later "FIR No. .../2024" lines are page headers of the other documents
+        if segment_type == FIR and fir_closed:
+            segment_type = None
+        if segment_type and segment_type != current["type"]:
+            if offset > current["start"]:
+                spans.append({**current, "end": offset})
+            current = {"type": segment_type, "heading": line.strip(), "start": offset}
+            fir_closed = fir_closed or segment_type != FIR
+        offset += len(line)
+    spans.append({**current, "end": len(text)})
+
+    tiny = sum(1 for span in spans if span["end"] - span["start"] < TINY_SPAN_CHARS)
+    if len(spans) >= MIN_SPANS_FOR_TINY_CHECK and tiny * 2 > len(spans):
+        logger.warning(f"[segment_fir] {tiny} of {len(spans)} segments are tiny, keeping the text as one segment")
+        spans = [{"type": FIR, "heading": None, "start": 0, "end": len(text)}]
+
+    for span in spans:
+        span["page_start"] = _page_at(span["start"], page_starts)
+        span["page_end"] = _page_at(max(span["end"] - 1, span["start"]), page_starts)
+    return spans
+
+
+def segment_fir(state: dict) -> dict:
+    """
+    Graph node: label the segments of the FIR bundle read by read_pdf.
+
+    Returns:
+        {"fir_segments": [...]} (see segment_text)
+    """
+    text = state.get("pdf_content_in_english") or ""
+    segments = segment_text(text, state.get("pdf_pages"))
+    summary = ", ".join(f"{s['type']}({s['end'] - s['start']})" for s in segments)
+    logger.info(f"✅ [segment_fir] {len(segments)} segments: {summary}")
+    return {"fir_segments": segments}
+
+
+def get_node_content(state: dict, node_name: str) -> str:
+    """
+    FIR text restricted to the segments a node declares in NODE_SEGMENTS.
+
+    Each included span is prefixed with its label and page range so the model
+    can still cite pages. Falls back to the full text when the node needs
+    everything, no segmentation is available, or the selection is too small.
+
+    Args:
+        state: Workflow state with pdf_content_in_english and fir_segments
+        node_name: Graph node name
+
+    Returns:
+        Text to put in the node's prompt
+    """
+    text = state.get("pdf_content_in_english") or ""
+    wanted = NODE_SEGMENTS.get(node_name)
+    segments = state.get("fir_segments") or []
+    if not wanted or len(segments) < 2:
+        return text
+
+    parts = []
+    for segment in segments:
+        if segment["type"] not in wanted:
+            continue
+        pages = ""
+        if segment.get("page_start"):
+            pages = f", page {segment['page_start']}" if segment["page_start"] == segment["page_end"] \
+                else f", pages {segment['page_start']}-{segment['page_end']}"
+        parts.append(f"[{SEGMENT_LABELS[segment['type']]}{pages}]\n{text[segment['start']:segment['end']].strip()}")
+    selected = "\n\n".join(parts)
+
+    if len(selected) < MIN_SEGMENT_CHARS:
+        return text
+    logger.debug(f"[{node_name}] Using {len(selected)} of {len(text)} FIR characters from segments {wanted}")
+    return selected
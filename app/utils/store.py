@@ -0,0 +1,436 @@
+"""
+Pluggable key-value store backends for job, result and checkpoint state.
+
+Backends expose a small Redis-shaped interface (get/set/delete/exists/keys/incr,
+an atomic read-modify-write `modify`, and list rpush/lrange) over bytes, so the same code runs against process memory,
+a local SQLite file shared by several uvicorn workers, or a Redis server shared
+by several hosts. Select one with environment variables:
+
+    STORE_BACKEND=memory | sqlite | redis   (default: memory)
+    STORE_URL=<sqlite file path> | <redis URL>
+
+`KeyValueStore` wraps a backend with a dict-like API over pickled Python values.
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import fnmatch
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STORE_BACKEND = os.getenv("STORE_BACKEND", "memory").lower()
+STORE_URL = os.getenv("STORE_URL", "")
+DEFAULT_SQLITE_PATH = Path("data") / "store.sqlite3"
+KEY_PREFIX = "ndps"
+
+
+class MemoryBackend:
+    """Process-local backend (single worker only)."""
+
+    def __init__(self):
+        self._data = {}  # key -> (value, expires_at)
+        self._lists = {}  # key -> list of values
+        self._list_expiry = {}  # key -> expires_at
+        self._lock = threading.RLock()
+
+    def _live(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def _live_list(self, key: str):
+        expires_at = self._list_expiry.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._lists.pop(key, None)
+            self._list_expiry.pop(key, None)
+        return self._lists.get(key)
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> bool:
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return False
+            self._data[key] = (value, time.time() + ex if ex else None)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                removed += self._data.pop(key, None) is not None
+                removed += self._lists.pop(key, None) is not None
+                self._list_expiry.pop(key, None)
+            return removed
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return self._live(key) is not None or self._live_list(key) is not None
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        with self._lock:
+            names = [k for k in list(self._data) if self._live(k) is not None]
+            names += [k for k in list(self._lists) if self._live_list(k) is not None]
+            return [k for k in names if fnmatch.fnmatchcase(k, pattern)]
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self._live(key)
+            value = int(entry[0]) + 1 if entry else 1
+            self._data[key] = (str(value).encode(), entry[1] if entry else None)
+            return value
+
+    def modify(self, key: str, func: Callable[[Optional[bytes]], bytes], ex: Optional[int] = None) -> bytes:
+        with self._lock:
+            entry = self._live(key)
+            value = func(entry[0] if entry else None)
+            self._data[key] = (value, time.time() + ex if ex else None)
+            return value
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            if self._live_list(key) is not None:
+                self._list_expiry[key] = time.time() + seconds
+                return True
+            entry = self._live(key)
+            if entry is None:
+                return False
+            self._data[key] = (entry[0], time.time() + seconds)
+            return True
+
+    def rpush(self, key: str, *values: bytes) -> int:
+        with self._lock:
+            items = self._live_list(key)
+            if items is None:
+                items = self._lists[key] = []
+            items.extend(values)
+            return len(items)
+
+    def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        with self._lock:
+            items = self._live_list(key) or []
+            return list(items[start:] if end == -1 else items[start:end + 1])
+
+
+class SQLiteBackend:
+    """
+    File-backed backend shared by all worker processes on one host.
+
+    Uses one connection per thread and WAL mode so readers never block the writer.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS list (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, value BLOB)")
+            conn.execute("CREATE INDEX IF NOT EXISTS list_key ON list (key, id)")
+            conn.execute("CREATE TABLE IF NOT EXISTS list_expiry (key TEXT PRIMARY KEY, expires_at REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _purge_list(self, key: str):
+        conn = self._conn()
+        row = conn.execute("SELECT expires_at FROM list_expiry WHERE key = ?", (key,)).fetchone()
+        if row and row[0] <= time.time():
+            conn.execute("DELETE FROM list WHERE key = ?", (key,))
+            conn.execute("DELETE FROM list_expiry WHERE key = ?", (key,))
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> bool:
+        expires_at = time.time() + ex if ex else None
+        conn = self._conn()
+        if nx:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self.get(key) is not None:
+                    conn.execute("ROLLBACK")
+                    return False
+                conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, expires_at))
+                conn.execute("COMMIT")
+                return True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, expires_at))
+        return True
+
+    def delete(self, *keys: str) -> int:
+        conn = self._conn()
+        removed = 0
+        for key in keys:
+            removed += conn.execute("DELETE FROM kv WHERE key = ?", (key,)).rowcount
+            removed += conn.execute("DELETE FROM list WHERE key = ?", (key,)).rowcount > 0
+            conn.execute("DELETE FROM list_expiry WHERE key = ?", (key,))
+        return removed
+
+    def exists(self, key: str) -> bool:
+        if self.get(key) is not None:
+            return True
+        self._purge_list(key)
+        return self._conn().execute("SELECT 1 FROM list WHERE key = ? LIMIT 1", (key,)).fetchone() is not None
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        conn = self._conn()
+        names = [r[0] for r in conn.execute(
+            "SELECT key FROM kv WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+        )]
+        names += [r[0] for r in conn.execute(
+            "SELECT DISTINCT l.key FROM list l LEFT JOIN list_expiry e ON e.key = l.key "
+            "WHERE e.expires_at IS NULL OR e.expires_at > ?", (time.time(),)
+        )]
+        return [k for k in names if fnmatch.fnmatchcase(k, pattern)]
+
+    def incr(self, key: str) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = self.get(key)
+            value = int(current) + 1 if current is not None else 1
+            conn.execute(
+                "INSERT INTO kv VALUES (?, ?, NULL) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value).encode()),
+            )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def modify(self, key: str, func: Callable[[Optional[bytes]], bytes], ex: Optional[int] = None) -> bytes:
+        # BEGIN IMMEDIATE takes the write lock before the read, so no other
+        # process can write the key between the read and the write back
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            value = func(self.get(key))
+            conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, time.time() + ex if ex else None))
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def expire(self, key: str, seconds: int) -> bool:
+        conn = self._conn()
+        expires_at = time.time() + seconds
+        if conn.execute("UPDATE kv SET expires_at = ? WHERE key = ?", (expires_at, key)).rowcount > 0:
+            return True
+        if conn.execute("SELECT 1 FROM list WHERE key = ? LIMIT 1", (key,)).fetchone() is None:
+            return False
+        conn.execute("INSERT OR REPLACE INTO list_expiry VALUES (?, ?)", (key, expires_at))
+        return True
+
+    def rpush(self, key: str, *values: bytes) -> int:
+        self._purge_list(key)
+        conn = self._conn()
+        conn.executemany("INSERT INTO list (key, value) VALUES (?, ?)", [(key, v) for v in values])
+        return conn.execute("SELECT COUNT(*) FROM list WHERE key = ?", (key,)).fetchone()[0]
+
+    def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        self._purge_list(key)
+        limit = -1 if end == -1 else max(0, end - start + 1)
+        rows = self._conn().execute(
+            "SELECT value FROM list WHERE key = ? ORDER BY id LIMIT ? OFFSET ?", (key, limit, start)
+        )
+        return [r[0] for r in rows]
+
+
+class RedisBackend:
+    """Redis backend shared by workers across hosts (requires the `redis` package)."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("STORE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None, nx: bool = False) -> bool:
+        return bool(self.client.set(key, value, ex=ex, nx=nx))
+
+    def delete(self, *keys: str) -> int:
+        return self.client.delete(*keys) if keys else 0
+
+    def exists(self, key: str) -> bool:
+        return bool(self.client.exists(key))
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        return [k.decode() if isinstance(k, bytes) else k for k in self.client.scan_iter(match=pattern)]
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def modify(self, key: str, func: Callable[[Optional[bytes]], bytes], ex: Optional[int] = None) -> bytes:
+        # WATCH/MULTI: the write is discarded and retried if the key changed after the read
+        def apply(pipe) -> bytes:
+            value = func(pipe.get(key))
+            pipe.multi()
+            pipe.set(key, value, ex=ex)
+            return value
+
+        return self.client.transaction(apply, key, value_from_callable=True)
+
+    def expire(self, key: str, seconds: int) -> bool:
+        return bool(self.client.expire(key, seconds))
+
+    def rpush(self, key: str, *values: bytes) -> int:
+        return int(self.client.rpush(key, *values))
+
+    def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        return self.client.lrange(key, start, end)
+
+
+def create_store_backend(backend: str = STORE_BACKEND, url: str = STORE_URL):
+    """
+    Create the configured store backend.
+
+    Args:
+        backend: "memory", "sqlite" or "redis"
+        url: SQLite file path or Redis URL
+
+    Returns:
+        Backend instance
+    """
+    if backend == "memory":
+        return MemoryBackend()
+    if backend == "sqlite":
+        return SQLiteBackend(Path(url) if url else DEFAULT_SQLITE_PATH)
+    if backend == "redis":
+        return RedisBackend(url or "redis://localhost:6379/0")
+    raise ValueError(f"Unknown STORE_BACKEND: {backend}")
+
+
+def create_checkpointer(backend: str = STORE_BACKEND, url: str = STORE_URL):
+    """
+    Create a LangGraph checkpointer matching the store backend.
+
+    sqlite and redis need the langgraph-checkpoint-sqlite / langgraph-checkpoint-redis
+    packages; without them workflows could not be continued from another worker.
+    """
+    if backend == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+    if backend == "sqlite":
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError as e:
+            raise ImportError("STORE_BACKEND=sqlite requires langgraph-checkpoint-sqlite") from e
+        path = Path(url) if url else DEFAULT_SQLITE_PATH
+        path = path.with_name(path.stem + "_checkpoints" + path.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return SqliteSaver(conn)
+    if backend == "redis":
+        try:
+            from langgraph.checkpoint.redis import RedisSaver
+        except ImportError as e:
+            raise ImportError("STORE_BACKEND=redis requires langgraph-checkpoint-redis") from e
+        saver = RedisSaver(redis_url=url or "redis://localhost:6379/0")
+        saver.setup()
+        return saver
+    raise ValueError(f"Unknown STORE_BACKEND: {backend}")
+
+
+class KeyValueStore:
+    """
+    Dict-like view over one namespace of a store backend.
+
+    Values are pickled, so mutating a value returned by `store[key]` does not
+    write it back; use `store[key] = value` or `store.update(key, **fields)`.
+    """
+
+    def __init__(self, backend, namespace: str, ttl: Optional[int] = None):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl or None
+
+    def _key(self, key: str) -> str:
+        return f"{KEY_PREFIX}:{self.namespace}:{key}"
+
+    def __getitem__(self, key: str) -> Any:
+        raw = self.backend.get(self._key(key))
+        if raw is None:
+            raise KeyError(key)
+        return pickle.loads(raw)
+
+    def __setitem__(self, key: str, value: Any):
+        self.backend.set(self._key(key), pickle.dumps(value), ex=self.ttl)
+
+    def __delitem__(self, key: str):
+        if not self.backend.delete(self._key(key)):
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.backend.exists(self._key(key))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        self.backend.delete(self._key(key))
+        return value
+
+    def setdefault(self, key: str, value: Any) -> Any:
+        """Store `value` only if `key` is absent (atomic); return the stored value."""
+        if self.backend.set(self._key(key), pickle.dumps(value), ex=self.ttl, nx=True):
+            return value
+        return self[key]
+
+    def update(self, key: str, **fields: Any) -> dict:
+        """
+        Merge fields into a stored dict value and write it back.
+
+        The read-modify-write is atomic per backend (lock, SQLite write
+        transaction, Redis WATCH/MULTI), so concurrent updates of different
+        fields from several workers do not overwrite each other.
+        """
+        def merge(raw: Optional[bytes]) -> bytes:
+            value = pickle.loads(raw) if raw is not None else {}
+            value.update(fields)
+            return pickle.dumps(value)
+
+        return pickle.loads(self.backend.modify(self._key(key), merge, ex=self.ttl))
+
+    def keys(self) -> List[str]:
+        prefix = self._key("")
+        return [k[len(prefix):] for k in self.backend.keys(prefix + "*")]
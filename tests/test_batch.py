@@ -0,0 +1,133 @@
+"""
+Batch upload limits and the batch ZIP download.
+"""
+
+import io
+import os
+import json
+import struct
+import time
+import threading
+import zipfile
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import batch, document
+from app.routes.config import batch_store, job_store, results_store
+from app.utils import blob_store
+from app.utils.render_pool import RenderPool
+
+SECTIONS = {"sections": json.dumps(["fir_facts"])}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(batch.job_queue, "submit", lambda *args, **kwargs: None)
+    app = FastAPI()
+    app.include_router(batch.router)
+    return TestClient(app)
+
+
+def zip_bytes(entries):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def post_batch(client, files):
+    return client.post("/api/batch", data=SECTIONS, files=[("files", file) for file in files])
+
+
+def test_zip_and_pdf_uploads_are_stored_as_blobs(client, tmp_path):
+    archive = zip_bytes([("nested/one.pdf", b"%PDF-1 one"), ("two.pdf", b"%PDF-1 two"), ("notes.txt", b"x"),
+                         ("__MACOSX/._one.pdf", b"junk")])
+    response = post_batch(client, [("firs.zip", archive, "application/zip"), ("three.pdf", b"%PDF-1 three", "application/pdf")])
+    assert response.status_code == 200, response.text
+    items = batch_store[response.json()["batch_id"]]["items"]
+    assert [item["filename"] for item in items] == ["one.pdf", "two.pdf", "three.pdf"]
+    assert len(os.listdir(tmp_path / "uploads")) == 3
+
+
+def test_oversized_entries_are_rejected_before_extraction(client, monkeypatch):
+    monkeypatch.setattr(batch, "MAX_UPLOAD_BYTES", 1000)
+    response = post_batch(client, [("firs.zip", zip_bytes([("big.pdf", b"0" * 5000)]), "application/zip")])
+    assert response.status_code == 413
+    response = post_batch(client, [("big.pdf", b"0" * 5000, "application/pdf")])
+    assert response.status_code == 413
+
+
+def test_batch_total_limit_counts_uncompressed_sizes(client, monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_MAX_TOTAL_BYTES", 2500)
+    archive = zip_bytes([(f"{i}.pdf", b"0" * 900) for i in range(3)])  # Compresses to almost nothing
+    assert post_batch(client, [("firs.zip", archive, "application/zip")]).status_code == 413
+
+
+def test_understated_entry_size_stops_at_the_declared_size(client, monkeypatch):
+    monkeypatch.setattr(batch, "MAX_UPLOAD_BYTES", 1000)
+    archive = bytearray(zip_bytes([("bomb.pdf", b"0" * 50000)]))
+    # Claim 10 bytes in both the local and the central directory header
+    struct.pack_into("<I", archive, 22, 10)
+    struct.pack_into("<I", archive, archive.rfind(b"PK\x01\x02") + 24, 10)
+    response = post_batch(client, [("firs.zip", bytes(archive), "application/zip")])
+    assert response.status_code == 400
+
+
+def completed_batch(count):
+    batch_id = f"test-{time.monotonic_ns()}"
+    items = []
+    for index in range(count):
+        job_id, workflow_id = f"{batch_id}-job-{index}", f"{batch_id}-wf-{index}"
+        job_store[job_id] = {"status": "completed", "progress": 100}
+        results_store[workflow_id] = {"workflow_id": workflow_id, "result_version": 1, "sections": ["fir_facts"]}
+        items.append({"index": index, "filename": f"fir{index}.pdf", "job_id": job_id, "workflow_id": workflow_id})
+    batch_store[batch_id] = {"batch_id": batch_id, "sections": ["fir_facts"], "items": items, "created_at": time.time()}
+    return batch_id
+
+
+def test_download_renders_on_the_pool_and_streams_the_zip(client, monkeypatch):
+    render_threads = set()
+
+    def fake_render(workflow_id, state):
+        render_threads.add(threading.current_thread().name)
+        return f"docx for {workflow_id}".encode(), "etag"
+
+    monkeypatch.setattr(document, "get_document_bytes", fake_render)
+    monkeypatch.setattr(document, "render_pool", RenderPool(worker_count=2, max_pending=8, name="test-render"))
+    monkeypatch.setattr(batch, "BATCH_ZIP_SPOOL_BYTES", 256)  # Spill the ZIP to disk
+    batch_id = completed_batch(3)
+
+    response = client.get(f"/api/batch/{batch_id}/download")
+    assert response.status_code == 200, response.text
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert render_threads and all(name.startswith("test-render") for name in render_threads)
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = archive.namelist()
+        assert names == ["000_fir0.json", "000_fir0.docx", "001_fir1.json", "001_fir1.docx",
+                         "002_fir2.json", "002_fir2.docx", "batch_summary.json"]
+        assert archive.read("001_fir1.docx") == f"docx for {batch_id}-wf-1".encode()
+
+
+def test_download_is_refused_while_the_render_pool_is_full(client, monkeypatch):
+    release = threading.Event()
+
+    def slow_render(workflow_id, state):
+        release.wait(10)
+        return b"docx", "etag"
+
+    pool = RenderPool(worker_count=1, max_pending=1, name="test-full")
+    monkeypatch.setattr(document, "get_document_bytes", slow_render)
+    monkeypatch.setattr(document, "render_pool", pool)
+    monkeypatch.setattr(document, "RENDER_TIMEOUT_SECONDS", 0.2)
+    try:
+        response = client.get(f"/api/batch/{completed_batch(2)}/download")
+    finally:
+        release.set()
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
@@ -0,0 +1,34 @@
+"""
+Node deadlines must reach work the node hands to shared thread pools.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.deadline import current_deadline, submit_with_deadline, with_deadline
+
+
+def test_pool_work_sees_the_node_deadline():
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def nested():
+        return current_deadline()
+
+    def pool_work():
+        # Chunk summaries are submitted from inside fetch workers
+        inner = submit_with_deadline(executor, nested).result()
+        return current_deadline(), inner
+
+    def node(state):
+        plain = executor.submit(current_deadline).result()
+        outer, inner = submit_with_deadline(executor, pool_work).result()
+        return {"node": current_deadline(), "plain": plain, "outer": outer, "inner": inner}
+
+    try:
+        result = with_deadline("historical_cases", node)({})
+    finally:
+        executor.shutdown()
+
+    assert result["node"] is not None
+    assert result["plain"] is None
+    assert result["outer"] is result["node"]
+    assert result["inner"] is result["node"]
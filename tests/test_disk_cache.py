@@ -0,0 +1,50 @@
+"""
+Disk cache: TTL reads and least-recently-used eviction.
+"""
+
+import os
+
+from app.utils.disk_cache import DiskCache, EVICTION_TARGET
+
+
+def incompressible(size):
+    return os.urandom(size)
+
+
+def test_ttl_and_stats(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("ns", "key", {"value": 1})
+    assert cache.get("ns", "key") == {"value": 1}
+    assert cache.get("ns", "key", ttl=-1) is None
+    assert cache.get("ns", "missing") is None
+    stats = cache.stats()["ns"]
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 2, 1, 1)
+
+
+def test_evicts_least_recently_used_across_namespaces(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=3500)
+    cache.set_bytes("search", "old", incompressible(1000))
+    cache.set_bytes("summary", "older", incompressible(1000))
+    cache.set_bytes("search", "recent", incompressible(1000))
+    # Reading "old" makes "older" the least recently used entry
+    assert cache.get_bytes("search", "old") is not None
+
+    cache.set_bytes("summary", "new", incompressible(1000))
+
+    assert cache.get_bytes("summary", "older") is None
+    for namespace, key in (("search", "old"), ("search", "recent"), ("summary", "new")):
+        assert cache.get_bytes(namespace, key) is not None
+    total = sum(ns["bytes"] for ns in cache.stats().values())
+    assert total <= cache.max_bytes
+
+
+def test_evicts_down_to_the_target_share(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_bytes=10_000)
+    # The tenth entry takes the cache just past max_bytes
+    for i in range(10):
+        cache.set_bytes("ns", f"key-{i}", incompressible(1000))
+    stats = cache.stats()["ns"]
+    assert stats["bytes"] <= 10_000 * EVICTION_TARGET
+    # The newest entry always survives
+    assert cache.get_bytes("ns", "key-9") is not None
+    assert cache.get_bytes("ns", "key-0") is None
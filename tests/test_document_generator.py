@@ -0,0 +1,66 @@
+"""
+Report composition from cached section fragments.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from app.utils import document_generator
+from app.utils.disk_cache import DiskCache
+
+PLACEHOLDERS = {"name_of_accused": "Ram Singh", "case_title": "STATE OF PUNJAB vs. RAM SINGH",
+                "fir_date": "01.01.2024", "sections_invoked": "Section 8(c), Section 21"}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(document_generator, "get_disk_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Names of the sections actually rendered (not served from the fragment cache)."""
+    names = []
+    sections = []
+    for name, keys, render in document_generator.REPORT_SECTIONS:
+        def counting(doc, state, name=name, render=render):
+            names.append(name)
+            render(doc, state)
+        sections.append((name, keys, counting))
+    monkeypatch.setattr(document_generator, "REPORT_SECTIONS", sections)
+    return names
+
+
+def text_of(docx_bytes):
+    return "\n".join(p.text for p in Document(BytesIO(docx_bytes)).paragraphs)
+
+
+def test_adding_a_section_renders_only_that_section(cache, rendered):
+    state = {"fir_placeholders": PLACEHOLDERS, "fir_facts": {"place_of_occurrence": "Amritsar"}}
+    first = text_of(document_generator.generate_document(state))
+    assert rendered == ["fir_facts"]
+    assert "Place Of Occurrence: Amritsar" in first and "Ram Singh" in first
+
+    state["dos"] = ["Record the seizure on video"]
+    second = text_of(document_generator.generate_document(state))
+    assert rendered == ["fir_facts", "dos_and_donts"]
+    assert "Place Of Occurrence: Amritsar" in second and "Record the seizure on video" in second
+    # Sections appear in report order, after the template content
+    assert second.index("FIR FACTS") < second.index("Record the seizure on video")
+
+
+def test_changed_section_data_is_rendered_again(cache, rendered):
+    state = {"fir_placeholders": PLACEHOLDERS, "fir_facts": {"place_of_occurrence": "Amritsar"}}
+    document_generator.generate_document(state)
+    state["fir_facts"] = {"place_of_occurrence": "Jalandhar"}
+    text = text_of(document_generator.generate_document(state))
+    assert rendered == ["fir_facts", "fir_facts"]
+    assert "Jalandhar" in text and "Amritsar" not in text
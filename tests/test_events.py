@@ -0,0 +1,79 @@
+"""
+Job progress events: SSE streaming and resuming with Last-Event-ID.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import upload
+from app.routes.config import job_store
+from app.utils.events import JobEvents, NODE_COMPLETED, NODE_STARTED, STATUS
+from app.utils.store import MemoryBackend
+
+
+@pytest.fixture
+def events(monkeypatch):
+    job_events = JobEvents(MemoryBackend())
+    monkeypatch.setattr(upload, "job_events", job_events)
+    return job_events
+
+
+def parse_sse(body):
+    messages = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            messages.append({"id": int(fields["id"]), "event": fields["event"], "data": json.loads(fields["data"])})
+    return messages
+
+
+def publish_run(job_events, job_id):
+    job_events.publish(job_id, STATUS, status="processing", progress=5)
+    job_events.publish(job_id, NODE_STARTED, node="read_pdf", progress=5)
+    job_events.publish(job_id, NODE_COMPLETED, node="read_pdf", progress=20)
+    job_events.publish(job_id, STATUS, status="completed", progress=100)
+
+
+def test_stream_resumes_after_last_event_id(events):
+    job_store["job-sse"] = {"status": "completed", "progress": 100}
+    publish_run(events, "job-sse")
+    app = FastAPI()
+    app.include_router(upload.router)
+    client = TestClient(app)
+
+    full = parse_sse(client.get("/status/job-sse/events").text)
+    assert [m["id"] for m in full] == [1, 2, 3, 4]
+    assert [m["event"] for m in full] == [STATUS, NODE_STARTED, NODE_COMPLETED, STATUS]
+
+    resumed = parse_sse(client.get("/status/job-sse/events", headers={"Last-Event-ID": "2"}).text)
+    assert [m["id"] for m in resumed] == [3, 4]
+    assert resumed[0]["data"]["node"] == "read_pdf" and resumed[0]["event"] == NODE_COMPLETED
+
+    # A malformed header replays from the start
+    assert len(parse_sse(client.get("/status/job-sse/events", headers={"Last-Event-ID": "x"}).text)) == 4
+
+
+def test_subscriber_receives_events_published_later(events):
+    async def collect():
+        received = []
+
+        async def consume():
+            async for index, event in events.subscribe("job-live", heartbeat=60):
+                received.append((index, event["type"]))
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(publish_run, events, "job-live")
+        await asyncio.wait_for(task, timeout=5)
+        return received
+
+    received = asyncio.run(collect())
+    assert received == [(1, STATUS), (2, NODE_STARTED), (3, NODE_COMPLETED), (4, STATUS)]
@@ -0,0 +1,93 @@
+"""
+Indian Kanoon fetch accounting in summarize_hits.
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import types
+
+import numpy as np
+import pytest
+
+from app.components import historical_cases as hc
+from app.utils.disk_cache import DiskCache
+
+
+class FakeKanoon:
+    """Stands in for the shared HTTP client; counts document downloads."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def post(self, url, **kwargs):
+        self.requests += 1
+        return types.SimpleNamespace(status_code=200, json=lambda: {"doc": "<p>Judgment text</p>", "docsource": "Supreme Court"})
+
+
+@pytest.fixture
+def kanoon(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    client = FakeKanoon()
+    monkeypatch.setattr(hc, "get_disk_cache", lambda: cache)
+    monkeypatch.setattr(hc, "get_http_client", lambda: client)
+    monkeypatch.setattr(hc, "enqueue_judgement", lambda judgement: None)
+    monkeypatch.setattr(hc, "get_embedding", lambda text, normalize=True: np.array([1.0, 0.0]))
+    return client
+
+
+def summarize(doc_ids):
+    stats = {}
+    results = hc.summarize_hits([{"tid": doc_id, "title": f"Case {doc_id}"} for doc_id in doc_ids], "ganja bail",
+                                query_vector=np.array([1.0, 0.0]), stats=stats)
+    return results, stats
+
+
+def test_failed_summary_counts_its_download_once(kanoon, monkeypatch):
+    def failing_summary(*args, **kwargs):
+        raise RuntimeError("LLM unavailable")
+
+    monkeypatch.setattr(hc, "summarize_judgment", failing_summary)
+    results, stats = summarize(["101"])
+    assert len(results) == 1  # Fallback preview from the (cached) document
+    assert kanoon.requests == 1
+    assert stats["documents_fetched"] == 1
+
+
+def test_cached_documents_and_summaries_are_not_counted(kanoon, monkeypatch):
+    summary = types.SimpleNamespace(model_dump=lambda: {"case_relevant": True, "case_title": "Ganja bail",
+                                                         "case_summary": "Bail granted.", "case_number": "12",
+                                                         "year": "2018"})
+    monkeypatch.setattr(hc, "summarize_judgment", lambda *args, **kwargs: summary)
+    _, first = summarize(["201", "202"])
+    _, second = summarize(["201", "202"])
+    assert first["documents_fetched"] == 2
+    assert second["documents_fetched"] == 0
+    assert kanoon.requests == 2
+
+
+def test_search_candidates_cancels_searches_it_no_longer_needs(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    searched = []
+    release = threading.Event()
+
+    def fake_collect(query, max_results, **kwargs):
+        searched.append(query)
+        if query != "primary":
+            release.wait(10)  # A slow fallback search
+        return [{"tid": f"{query}-{i}"} for i in range(max_results)]
+
+    executor = ThreadPoolExecutor(max_workers=1)  # Fallback searches queue behind the primary
+    monkeypatch.setattr(hc, "_search_executor", executor)
+    monkeypatch.setattr(hc, "collect_search_hits", fake_collect)
+    try:
+        hits = hc.search_candidates(["primary", "fallback-1", "fallback-2"], needed=3)
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+    assert [hit["tid"] for hit in hits] == ["primary-0", "primary-1", "primary-2"]
+    # fallback-1 may already have started; the still-queued fallback-2 never runs
+    assert "fallback-2" not in searched
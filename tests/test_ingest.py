@@ -0,0 +1,112 @@
+"""
+Concurrent ingestion into the grown ndps_judgements index.
+
+Two processes ingest different judgments at the same time; afterwards every
+vector position must still map to the chunk (and doc_id) it was embedded from.
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import hashlib
+import multiprocessing
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import faiss
+import numpy as np
+import pytest
+
+from app.rag import ingest, query_all
+
+DIMENSION = 16
+
+
+def fake_embed(texts):
+    """Deterministic unit vectors derived from the text, standing in for the embeddings API."""
+    if len(texts) > 1:
+        time.sleep(0.2)  # API latency, so concurrent ingests overlap
+    rows = []
+    for text in texts:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+        rows.append(np.random.default_rng(seed).standard_normal(DIMENSION))
+    vectors = np.array(rows, dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def judgement(doc_id: str) -> dict:
+    return {
+        "doc_id": doc_id,
+        "title": f"State vs Accused {doc_id}",
+        "summary": f"Summary of judgment {doc_id}: recovery of ganja, Section 50 complied with.",
+        "text": f"Judgment {doc_id}.\n\nThe accused was found in conscious possession of 2 kg of ganja.",
+        "case_number": f"CRA {doc_id}",
+        "year": "2019",
+    }
+
+
+def ingest_in_child(doc_ids):
+    ingest.ingest_judgements([judgement(doc_id) for doc_id in doc_ids])
+
+
+@pytest.fixture
+def judgements_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(query_all, "NDPS_JUDGEMENTS_DIR", tmp_path)
+    monkeypatch.setattr(ingest, "NDPS_JUDGEMENTS_DIR", tmp_path)
+    monkeypatch.setattr(ingest, "_embed", fake_embed)
+    monkeypatch.setattr(query_all, "_index_cache", {})
+
+    seed_chunks = [{"doc_id": "seed", "content": "seed judgment", "chunk_id": 0}]
+    index = faiss.IndexFlatIP(DIMENSION)
+    index.add(fake_embed([chunk["content"] for chunk in seed_chunks]))
+    faiss.write_index(index, str(tmp_path / "legal_index.faiss"))
+    with open(tmp_path / "chunks.json", "w", encoding="utf-8") as f:
+        json.dump(seed_chunks, f)
+    return tmp_path
+
+
+def test_concurrent_ingests_keep_vectors_aligned_with_doc_ids(judgements_dir):
+    # fork: the children inherit the monkeypatched directory and embedder
+    context = multiprocessing.get_context("fork")
+    batches = [[f"a{i}" for i in range(20)], [f"b{i}" for i in range(20)]]
+    workers = [context.Process(target=ingest_in_child, args=(batch,)) for batch in batches]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    index = faiss.read_index(str(judgements_dir / "legal_index.faiss"))
+    with open(judgements_dir / "chunks.json", "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+
+    assert index.ntotal == len(chunks)
+    # No batch was lost
+    assert {chunk["doc_id"] for chunk in chunks} == {"seed"} | set(batches[0]) | set(batches[1])
+    for position, chunk in enumerate(chunks):
+        assert chunk["chunk_id"] == position
+        expected = fake_embed([chunk["content"]])[0]
+        assert np.allclose(index.reconstruct(position), expected, atol=1e-5), chunk["doc_id"]
+        if chunk["doc_id"] != "seed":
+            assert chunk["doc_id"] in chunk["content"]
+
+
+def test_reingesting_a_judgement_adds_nothing(judgements_dir):
+    assert ingest.ingest_judgements([judgement("c1")]) > 0
+    assert ingest.ingest_judgements([judgement("c1")]) == 0
+
+
+def test_ingest_without_fcntl_uses_msvcrt(judgements_dir, monkeypatch):
+    calls = []
+    fake_msvcrt = types.SimpleNamespace(
+        LK_LOCK=1, LK_UNLCK=0,
+        locking=lambda fd, mode, nbytes: calls.append(mode),
+    )
+    monkeypatch.setitem(sys.modules, "fcntl", None)  # import fcntl raises ImportError, as on Windows
+    monkeypatch.setitem(sys.modules, "msvcrt", fake_msvcrt)
+
+    assert ingest.ingest_judgements([judgement("w1")]) > 0
+    assert calls == [fake_msvcrt.LK_LOCK, fake_msvcrt.LK_UNLCK]
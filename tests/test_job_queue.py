@@ -0,0 +1,77 @@
+"""
+Job queue ordering: priority first, then round-robin across sessions, then FIFO within a session.
+"""
+
+import threading
+import time
+
+from app.utils.job_queue import JobQueue, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def blocked_queue():
+    """Single-worker queue whose worker is busy until the returned event is set."""
+    queue = JobQueue(worker_count=1, name="test")
+    release = threading.Event()
+    queue.submit("blocker", "setup", release.wait, 10)
+    wait_until(lambda: queue.stats()["running"] == 1)
+    return queue, release
+
+
+def test_priority_then_round_robin_then_fifo():
+    queue, release = blocked_queue()
+    ran = []
+    jobs = [("a1", "A", PRIORITY_NORMAL), ("a2", "A", PRIORITY_NORMAL), ("a3", "A", PRIORITY_NORMAL),
+            ("b1", "B", PRIORITY_NORMAL), ("b2", "B", PRIORITY_NORMAL),
+            ("l1", "C", PRIORITY_LOW), ("h1", "D", PRIORITY_HIGH)]
+    for job_id, session_id, priority in jobs:
+        queue.submit(job_id, session_id, ran.append, job_id, priority=priority)
+
+    expected = ["h1", "a1", "b1", "a2", "b2", "a3", "l1"]
+    assert [queue.position(job_id)["queue_position"] for job_id in expected] == list(range(1, 8))
+    assert queue.stats()["queued"] == 7
+
+    release.set()
+    wait_until(lambda: len(ran) == 7)
+    assert ran == expected
+    assert queue.position("a1") is None
+
+
+def test_one_busy_session_cannot_starve_another():
+    queue, release = blocked_queue()
+    ran = []
+    for i in range(10):
+        queue.submit(f"batch-{i}", "batch", ran.append, f"batch-{i}")
+    queue.submit("interactive", "user", ran.append, "interactive")
+    assert queue.position("interactive")["queue_position"] == 2
+
+    release.set()
+    wait_until(lambda: len(ran) == 11)
+    assert ran.index("interactive") == 1
+
+
+def test_failing_job_does_not_stop_the_worker():
+    queue = JobQueue(worker_count=1, name="test")
+    ran = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    queue.submit("bad", "A", fail)
+    queue.submit("good", "A", ran.append, "good")
+    wait_until(lambda: ran == ["good"])
+
+
+def test_estimated_start_grows_with_queue_position():
+    queue, release = blocked_queue()
+    for i in range(3):
+        queue.submit(f"job-{i}", f"S{i}", lambda: None)
+    starts = [queue.position(f"job-{i}")["estimated_start_at"] for i in range(3)]
+    release.set()
+    assert starts == sorted(starts) and starts[0] < starts[-1]
@@ -0,0 +1,47 @@
+"""
+Key-passage selection for long judgments.
+"""
+
+from app.utils.judgment_text import CHARS_PER_TOKEN, select_key_passages
+
+
+def paragraph(label, body, size=400):
+    text = f"{label}. {body} "
+    return (text * (size // len(text) + 1))[:size].strip()
+
+
+def judgment(middle):
+    head = paragraph("HEAD", "In the High Court of Punjab and Haryana at Chandigarh, CRM-M 1234 of 2021")
+    tail = [paragraph("TAIL1", "The petition is accordingly dismissed"),
+            paragraph("TAIL2", "Pending applications, if any, stand disposed of")]
+    return "\n\n".join([head, *middle, *tail])
+
+
+def test_text_within_budget_is_unchanged():
+    text = judgment([paragraph("BODY", "Short judgment")])
+    assert select_key_passages(text, token_budget=10_000) == text
+    assert select_key_passages(text, token_budget=0) == text
+
+
+def test_keeps_pinned_and_relevant_paragraphs_in_order_with_gaps():
+    middle = [
+        paragraph("CITES", "See State v. Kumar (2019) 3 SCC 45; AIR 2001 SC 12; 2004 Cri LJ 99"),
+        paragraph("SEIZURE", "Recovery of commercial quantity of heroin; Section 50 NDPS compliance and "
+                             "the FSL report on the sample were questioned"),
+        paragraph("FILLER", "The counsel were heard at length on the dates fixed"),
+        paragraph("BAIL", "Section 37 of the NDPS Act bars bail unless the twin conditions are satisfied"),
+        paragraph("FILLER2", "The matter was adjourned on several occasions"),
+    ]
+    text = judgment(middle)
+    budget = 2600 / CHARS_PER_TOKEN
+    selected = select_key_passages(text, token_budget=int(budget))
+
+    assert len(selected) < len(text)
+    assert len(selected.replace("\n\n[...]", "")) <= budget * CHARS_PER_TOKEN
+    labels = [part if part == "[...]" else part.split(".")[0] for part in selected.split("\n\n")]
+    assert labels[0] == "HEAD" and labels[-2:] == ["TAIL1", "TAIL2"]
+    kept = [label for label in labels if label != "[...]"]
+    assert kept == sorted(kept, key=["HEAD", "CITES", "SEIZURE", "FILLER", "BAIL", "FILLER2", "TAIL1", "TAIL2"].index)
+    assert "SEIZURE" in kept and "BAIL" in kept
+    assert "CITES" not in kept and "FILLER" not in kept
+    assert labels[1] == "[...]"
@@ -0,0 +1,95 @@
+"""
+Segmentation of a hard-wrapped, multi-document FIR bundle.
+"""
+
+from app.utils import segmentation
+from app.utils.segmentation import (
+    FIR, COMPLAINT, SEIZURE_MEMO, SECTION_50_NOTICE, SAMPLING_MEMO, ARREST_MEMO,
+    segment_text, get_node_content,
+)
+
+NARRATIVE = (
+    "On receiving secret information the raiding party reached the bus stand where\n"
+    "the accused was found carrying a white plastic bag containing a green leafy\n"
+    "substance which smelled like ganja. Independent witnesses were called and\n"
+    "panchnama of the recovered bag was drawn in their presence at the spot, after\n"
+    "which the accused was then taken for panchnama\n"
+    "formalities to the police station along with the seized contraband.\n"
+)
+
+BUNDLE = (
+    "FIRST INFORMATION REPORT\n"
+    "FIR No. 112/2024 P.S. Navrangpura Date 12-03-2024\n"
+    + NARRATIVE
+    + "Brief Facts of the Case\n"
+    + NARRATIVE
+    + "FIR No. 112/2024 P.S. Navrangpura\n"  # Page header
+    + "NOTICE UNDER SECTION 50 OF THE NDPS ACT\n"
+    + "The accused was informed of his right to be searched before a Gazetted Officer\n"
+    "or a Magistrate and he declined the offer in writing in the presence of witnesses.\n" * 3
+    + "FIR No. 112/2024 P.S. Navrangpura\n"  # Page header
+    + "SEIZURE PANCHNAMA\n"
+    + NARRATIVE
+    + "FIR No. 112/2024 P.S. Navrangpura\n"  # Page header
+    + "Sampling Memo\n"
+    + "Two samples of 50 grams each were drawn, marked S-1 and S-2, sealed with the\n"
+    "seal of the station and handed over with Form 95 for dispatch to the FSL.\n" * 3
+    + "ARREST MEMO\n"
+    + "The accused was arrested at 18:40 hrs and the grounds of arrest were explained\n"
+    "to him; his brother was informed of the arrest by telephone.\n" * 3
+)
+
+
+def types(spans):
+    return [span["type"] for span in spans]
+
+
+def test_bundle_is_split_at_headings_only():
+    spans = segment_text(BUNDLE)
+    assert types(spans) == [FIR, COMPLAINT, SECTION_50_NOTICE, SEIZURE_MEMO, SAMPLING_MEMO, ARREST_MEMO]
+    assert spans[0]["end"] == spans[1]["start"]
+    assert spans[-1]["end"] == len(BUNDLE)
+
+
+def test_wrapped_narrative_lines_are_not_headings():
+    # "...was then taken for panchnama" and "panchnama of the recovered bag ..." are narrative
+    spans = segment_text("FIRST INFORMATION REPORT\n" + NARRATIVE * 3)
+    assert types(spans) == [FIR]
+
+
+def test_repeated_fir_page_header_does_not_reopen_the_fir():
+    seizure = next(span for span in segment_text(BUNDLE) if span["type"] == SEIZURE_MEMO)
+    # The page header before "Sampling Memo" stays inside the seizure memo
+    assert "FIR No. 112/2024" in BUNDLE[seizure["start"]:seizure["end"]]
+
+
+def test_mostly_tiny_spans_fall_back_to_one_segment():
+    noisy = "".join(f"{heading}\nshort line\n" for heading in
+                    ["SEIZURE MEMO", "ARREST MEMO", "SAMPLING MEMO", "SEIZURE MEMO", "ARREST MEMO"]) + NARRATIVE
+    spans = segment_text(noisy)
+    assert spans == [{"type": FIR, "heading": None, "start": 0, "end": len(noisy),
+                      "page_start": None, "page_end": None}]
+    state = {"pdf_content_in_english": noisy, "fir_segments": spans}
+    assert get_node_content(state, "generate_evidence_checklist") == noisy
+
+
+def test_pages_and_node_content():
+    half = BUNDLE.index("SEIZURE PANCHNAMA")
+    pages = [{"page": 1, "start": 0, "end": half}, {"page": 2, "start": half, "end": len(BUNDLE)}]
+    spans = segment_text(BUNDLE, pages)
+    assert (spans[0]["page_start"], spans[0]["page_end"]) == (1, 1)
+    assert (spans[-1]["page_start"], spans[-1]["page_end"]) == (2, 2)
+
+    state = {"pdf_content_in_english": BUNDLE, "fir_segments": spans}
+    checklist = get_node_content(state, "generate_evidence_checklist")
+    assert checklist.startswith("[FIR, page 1]\nFIRST INFORMATION REPORT")
+    assert "[Section 50 notice, page 1]" in checklist
+    assert "[Seizure memo / panchnama, page 2]" in checklist
+    assert "grounds of arrest" not in checklist  # Arrest memo is not needed for the checklist
+    # Nodes without a segment list get everything
+    assert get_node_content(state, "extract_fir_fact") == BUNDLE
+
+
+def test_every_node_with_a_selection_keeps_the_fir():
+    for node_name, wanted in segmentation.NODE_SEGMENTS.items():
+        assert wanted is None or FIR in wanted, node_name
@@ -0,0 +1,60 @@
+"""
+KeyValueStore.update from several workers at once.
+
+Each worker writes its own field; a non-atomic read-modify-write lets one
+worker's write back drop fields another worker set in between.
+"""
+
+import multiprocessing
+import threading
+
+import pytest
+
+from app.utils.store import KeyValueStore, MemoryBackend, SQLiteBackend
+
+WORKERS = 4
+UPDATES = 50
+
+
+def update_fields(backend, worker):
+    store = KeyValueStore(backend, "jobs")
+    for step in range(UPDATES):
+        store.update("job", **{f"w{worker}_{step}": step})
+
+
+def update_fields_in_child(path, worker):
+    update_fields(SQLiteBackend(path), worker)
+
+
+def test_memory_updates_keep_every_field():
+    backend = MemoryBackend()
+    threads = [threading.Thread(target=update_fields, args=(backend, worker)) for worker in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(KeyValueStore(backend, "jobs")["job"]) == WORKERS * UPDATES
+
+
+def test_sqlite_updates_from_several_processes_keep_every_field(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    SQLiteBackend(path)  # Creates the tables before the workers race
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=update_fields_in_child, args=(path, worker)) for worker in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    job = KeyValueStore(SQLiteBackend(path), "jobs")["job"]
+    assert len(job) == WORKERS * UPDATES
+
+
+def test_update_failure_leaves_value_unchanged(tmp_path):
+    store = KeyValueStore(SQLiteBackend(tmp_path / "store.sqlite3"), "jobs")
+    store["job"] = {"status": "queued"}
+    with pytest.raises(TypeError):
+        store.update("job", lock=threading.Lock())  # Not picklable
+    assert store["job"] == {"status": "queued"}
+    assert store.update("job", status="processing") == {"status": "processing"}
@@ -0,0 +1,78 @@
+"""
+Vernacular FIR translation with the offline mock backend: splitting,
+reassembly and page offsets.
+"""
+
+import pytest
+
+from app.translator import translator
+from app.translator.translator import split_for_translation, translate_pages, translate_to_english
+
+GUJARATI = "આરોપી પાસેથી ગાંજો મળી આવ્યો હતો. પંચો હાજર હતા।"
+HINDI = "आरोपी के पास से गांजा बरामद हुआ।"
+
+
+@pytest.fixture
+def mock_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRANSLATOR_BACKEND", "mock")
+    monkeypatch.setattr(translator, "TRANSLATION_CACHE_DIR", str(tmp_path))
+
+
+def test_backend_is_resolved_when_translating(monkeypatch):
+    # Keys loaded from .env after this module was imported must still be seen
+    monkeypatch.delenv("TRANSLATOR_BACKEND", raising=False)
+    monkeypatch.delenv("AZURE_TRANSLATOR_KEY", raising=False)
+    assert translator.translator_backend() == "none"
+    monkeypatch.setenv("AZURE_TRANSLATOR_KEY", "key")
+    assert translator.translator_backend() == "azure"
+
+
+def test_without_a_backend_vernacular_text_is_left_alone(monkeypatch):
+    monkeypatch.setenv("TRANSLATOR_BACKEND", "none")
+    assert translate_to_english({"pdf_content": GUJARATI}) == {}
+
+
+def test_split_keeps_text_and_respects_the_limit():
+    text = (GUJARATI + " ") * 20 + "\n" + HINDI * 10
+    chunks = split_for_translation(text, max_chars=120)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    # Sentence boundaries (including the danda) are preferred over word boundaries
+    assert chunks[0].rstrip().endswith((".", "।"))
+
+
+def test_long_sentence_is_split_at_whitespace():
+    text = "શબ્દ " * 100
+    chunks = split_for_translation(text, max_chars=50)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= 50 and chunk.endswith(" ") for chunk in chunks)
+
+
+def test_english_runs_are_kept_and_vernacular_runs_translated_in_order(mock_backend):
+    page = f"FIR No. 12/2024 P.S. Navrangpura\n{GUJARATI}\n12/03/2024\nSEIZURE MEMO\n{HINDI}\n"
+    [translated], chunk_count = translate_pages([page])
+    assert chunk_count == 2
+    assert translated == (f"FIR No. 12/2024 P.S. Navrangpura\n[gu->en] {GUJARATI}\n12/03/2024\n"
+                          f"SEIZURE MEMO\n[hi->en] {HINDI}\n")
+
+
+def test_page_offsets_are_recomputed(mock_backend):
+    pages = ["FIR No. 12/2024\n" + GUJARATI + "\n", "Panchnama\n" + HINDI, "Signed\n"]
+    content = "\n".join(pages)
+    offsets = []
+    start = 0
+    for number, page in enumerate(pages, start=1):
+        offsets.append({"page": number, "start": start, "end": start + len(page)})
+        start += len(page) + 1
+
+    update = translate_to_english({"pdf_content": content, "pdf_pages": offsets})
+    text, new_offsets = update["pdf_content_in_english"], update["pdf_pages"]
+    assert [p["page"] for p in new_offsets] == [1, 2, 3]
+    assert text[new_offsets[0]["start"]:new_offsets[0]["end"]] == f"FIR No. 12/2024\n[gu->en] {GUJARATI}\n"
+    assert text[new_offsets[1]["start"]:new_offsets[1]["end"]] == f"Panchnama\n[hi->en] {HINDI}"
+    assert text[new_offsets[2]["start"]:new_offsets[2]["end"]] == "Signed\n"
+    assert new_offsets[-1]["end"] == len(text)
+
+
+def test_english_fir_is_not_translated(mock_backend):
+    assert translate_to_english({"pdf_content": "FIR No. 12/2024\nThe accused was found with ganja.\n"}) == {}
@@ -0,0 +1,129 @@
+"""
+Uploads: the size cap, deduplicating repeated uploads, and continuing a workflow with more sections.
+"""
+
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+
+from app.langgraph.state import WorkflowState
+from starlette.middleware.sessions import SessionMiddleware
+
+from app.routes import upload
+from app.routes.config import job_store, results_store
+from app.utils import blob_store
+
+
+def overrunning_node(state):
+    """Stands in for a node that ran out of its budget and returned its fallback."""
+    return {"fir_facts": {"sections": state.get("sections")},
+            "node_overruns": [{"node": "extract_fir_fact", "budget_seconds": 1, "elapsed_seconds": 1, "partial": False}]}
+
+
+@pytest.fixture
+def fake_graph(monkeypatch):
+    builder = StateGraph(WorkflowState)
+    builder.add_node("extract_fir_fact", overrunning_node)
+    builder.add_edge(START, "extract_fir_fact")
+    builder.add_edge("extract_fir_fact", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    monkeypatch.setattr(upload, "graph", graph)
+    monkeypatch.setattr(upload, "prerender_document", lambda *args: None)
+    return graph
+
+
+def run(job_id, workflow_id, sections, is_new_workflow):
+    job_store[job_id] = {"status": "queued", "progress": 0}
+    upload.process_workflow_background(job_id, workflow_id, "fir.pdf", "fir.pdf", sections, is_new_workflow)
+    assert job_store[job_id]["status"] == "completed", job_store[job_id].get("error")
+
+
+def test_continuing_a_workflow_does_not_repeat_earlier_overruns(fake_graph):
+    run("job-1", "wf-overruns", ["fir_facts"], is_new_workflow=True)
+    run("job-2", "wf-overruns", ["investigation_plan"], is_new_workflow=False)
+    run("job-3", "wf-overruns", ["chargesheet"], is_new_workflow=False)
+
+    # One overrun per run, not a doubling list
+    state = fake_graph.get_state({"configurable": {"thread_id": "wf-overruns"}}).values
+    assert len(state["node_overruns"]) == 3
+    assert len(results_store["wf-overruns"]["node_overruns"]) == 3
+    # Each job reports only the overruns of its own run
+    assert len(job_store["job-3"]["overruns"]) == 1
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, fake_graph):
+    """Upload router behind session middleware; queued jobs are recorded rather than run."""
+    monkeypatch.setattr(blob_store, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    submitted = []
+    monkeypatch.setattr(upload.job_queue, "submit", lambda job_id, session_id, func, *args, **kwargs:
+                        submitted.append((job_id, func, args)))
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware, secret_key="test")
+    app.include_router(upload.router)
+    app.state.submitted = submitted
+    return app
+
+
+def post_pdf(client, pdf, sections=("fir_facts",)):
+    return client.post("/upload", files={"file": ("fir.pdf", pdf, "application/pdf")},
+                       data={"sections": json.dumps(list(sections))})
+
+
+def unique_pdf():
+    return b"%PDF-1.4 " + uuid.uuid4().bytes
+
+
+def test_duplicate_of_a_running_upload_follows_it_read_only(app):
+    pdf = unique_pdf()
+    first = post_pdf(TestClient(app), pdf).json()
+    second = post_pdf(TestClient(app), pdf).json()
+
+    assert len(app.state.submitted) == 1
+    assert second["read_only"] and second["deduplicated"]
+    assert second["job_id"] == first["job_id"]
+    assert second["workflow_id"] == job_store[first["job_id"]]["workflow_id"]
+
+
+def test_duplicate_of_a_finished_upload_gets_its_own_copy(app, fake_graph):
+    pdf = unique_pdf()
+    first = post_pdf(TestClient(app), pdf).json()
+    job_id, func, args = app.state.submitted[0]
+    func(*args)
+    source_id = job_store[first["job_id"]]["workflow_id"]
+    assert job_store[job_id]["status"] == "completed"
+
+    second = post_pdf(TestClient(app), pdf).json()
+    target_id = second["workflow_id"]
+    assert len(app.state.submitted) == 1
+    assert second["deduplicated"] and not second.get("read_only")
+    assert target_id != source_id
+    assert job_store[second["job_id"]]["status"] == "completed"
+    assert results_store[target_id]["workflow_id"] == target_id
+    copied = fake_graph.get_state({"configurable": {"thread_id": target_id}}).values
+    assert copied["fir_facts"] == {"sections": ["fir_facts"]}
+
+
+def test_different_sections_are_not_deduplicated(app):
+    pdf = unique_pdf()
+    post_pdf(TestClient(app), pdf, ["fir_facts"])
+    second = post_pdf(TestClient(app), pdf, ["fir_facts", "investigation_plan"]).json()
+    assert "deduplicated" not in second
+    assert len(app.state.submitted) == 2
+
+
+def test_upload_over_the_size_cap_is_rejected(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(upload, "MAX_UPLOAD_BYTES", 1000)
+    response = post_pdf(TestClient(app), b"%PDF-1.4 " + b"x" * 2000)
+    assert response.status_code == 413
+    assert app.state.submitted == []
+    assert not any(name.endswith(".pdf") for name in os.listdir(tmp_path / "uploads"))